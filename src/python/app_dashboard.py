@@ -1,9 +1,15 @@
+import startup_timing
+from database.connection import get_session, warm_up
+
+# Abre a conexão com o banco em segundo plano enquanto os imports pesados carregam
+warm_up()
+
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime
 import seaborn as sns
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 from services.climate_service import ClimateService
 from services.component_service import ComponentService
@@ -11,9 +17,10 @@ from services.sensor_service import SensorRecordService
 from services.application_service import ApplicationService
 from services.crops_service import CropService
 from services.producer_service import ProducerService
-from prediction_model import IrrigationPredictor, get_future_irrigation_schedule, get_irrigation_prediction
-from database.oracle import get_session
+from services.cache import cache, figures
+from prediction_model import get_predictor, get_future_irrigation_schedule, get_irrigation_prediction
 
+startup_timing.mark('imports')
 session = get_session()
 
 application_service = ApplicationService(session)
@@ -24,6 +31,43 @@ sensor_service = SensorRecordService(session)
 climate_service = ClimateService(session)
 
 
+# Leituras via cache compartilhado (services/cache.py): as reexecuções do script e os
+# demais usuários reaproveitam o resultado até uma escrita pelos serviços ou o TTL
+def sensor_records_columns():
+    return cache.get('sensor_records_columns', ['sensor_records'], sensor_service.sensor_records_columns)
+
+
+def climate_data():
+    return cache.get('climate_data', ['climate_data'], climate_service.list_climate_data)
+
+
+def components_columns():
+    return cache.get('components_columns', ['components'], component_service.components_columns)
+
+
+def show_figure(chart, params, tables, render):
+    # Gráfico renderizado uma vez por combinação de parâmetros e versão dos dados
+    st.image(figures.png(chart, params, tables, render), use_container_width=True)
+
+
+def sensor_states():
+    return cache.get('sensor_states', ['sensor_latest_state'], sensor_service.get_current_states)
+
+
+def crop_states():
+    return cache.get('crop_states', ['sensor_latest_state', 'components', 'crops'], sensor_service.get_crop_states)
+
+
+def sensor_chart_series(start, points):
+    return cache.get(('sensor_chart_series', start, points), ['sensor_records'],
+                     lambda: sensor_service.get_chart_series(start, points=points))
+
+
+def climate_chart_series(start, points):
+    return cache.get(('climate_chart_series', start, points), ['climate_data'],
+                     lambda: climate_service.get_chart_series(start, points=points))
+
+
 # from weasyprint import HTML
 
 
@@ -32,15 +76,34 @@ st.title("FarmTech Solutions - Dashboard de Irrigação Inteligente")
 
 aba = st.sidebar.radio("Selecione a tabela para gerenciar:", ["Visão Geral", "Dados Climáticos", "Registros de Sensores", "Componentes"])
 
+# Os gráficos pedem ao servidor só a janela escolhida, já reduzida a `pontos` pontos
+JANELAS = {
+    "Últimas 24 horas": timedelta(days=1),
+    "Últimos 7 dias": timedelta(days=7),
+    "Últimos 30 dias": timedelta(days=30),
+    "Todo o histórico": None
+}
+janela = st.sidebar.selectbox("Janela dos gráficos", list(JANELAS), index=1)
+pontos = st.sidebar.slider("Pontos por gráfico", 200, 5000, 1000, step=100)
+
+
+def window_start():
+    if JANELAS[janela] is None:
+        return None
+    # Em UTC sem fuso, como os timestamps gravados; arredondado ao minuto para que as
+    # reexecuções reaproveitem o cache
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return (now - JANELAS[janela]).replace(second=0, microsecond=0)
+
 # ---------------------- VISÃO GERAL --------------------------
 if aba == "Visão Geral":
-        sensor_df = pd.DataFrame(sensor_service.list_sensor_records())
+        # Estado atual de cada sensor (tabela sensor_latest_state): sem carregar o histórico
+        states = sensor_states()
 
-        if sensor_df.empty:
+        if not states:
             st.info("Nenhum dado de sensor disponível para mostrar a situação atual da safra.")
         else:
-            sensor_df["timestamp"] = pd.to_datetime(sensor_df["timestamp"])
-            latest = sensor_df.sort_values("timestamp", ascending=False).iloc[0]
+            latest = max(states, key=lambda state: state["timestamp"])
 
             st.subheader("🌾 Estado Atual da Safra")
 
@@ -66,10 +129,15 @@ if aba == "Visão Geral":
                 emoji = "💧" if status == "ATIVADA" else "⛔"
                 st.metric("Irrigação", f"{emoji} {status}")
 
+            crops = crop_states()
+            if crops:
+                st.subheader("Situação por cultura")
+                st.dataframe(pd.DataFrame(crops), use_container_width=True)
+
 # ---------------------- CLIMATE DATA -------------------------
 if aba == "Dados Climáticos":
     st.header("🌤️ Dados Climáticos")
-    df = pd.DataFrame(climate_service.list_climate_data())
+    df = pd.DataFrame(climate_data())
 
     if df.empty:
         st.info("Nenhum dado climático disponível.")
@@ -78,40 +146,52 @@ if aba == "Dados Climáticos":
         st.dataframe(df, use_container_width=True)
 
         st.subheader("📊 Visualização de tendências climáticas")
+        start = window_start()
+        series = climate_chart_series(start, pontos)
+        st.caption(f"{series['count']} registros na janela ({janela.lower()}), até {pontos} pontos por gráfico.")
 
         # Temperatura ao longo do tempo
-        fig_temp, ax_temp = plt.subplots()
-        ax_temp.plot(df["timestamp"], df["temperature"], marker='o', linestyle='-', color='orange')
-        ax_temp.set_title("Temperatura ao longo do tempo")
-        ax_temp.set_xlabel("Data")
-        ax_temp.set_ylabel("Temperatura (°C)")
-        ax_temp.grid(True)
-        st.pyplot(fig_temp)
+        def temperature_chart():
+            fig_temp, ax_temp = plt.subplots()
+            ax_temp.plot(series["temperature"]["timestamp"], series["temperature"]["temperature"], marker='o', linestyle='-', color='orange')
+            ax_temp.set_title("Temperatura ao longo do tempo")
+            ax_temp.set_xlabel("Data")
+            ax_temp.set_ylabel("Temperatura (°C)")
+            ax_temp.grid(True)
+            return fig_temp
+        show_figure('climate_temperature', (start, pontos), ['climate_data'], temperature_chart)
 
         # Umidade ao longo do tempo
-        fig_hum, ax_hum = plt.subplots()
-        ax_hum.plot(df["timestamp"], df["air_humidity"], marker='s', linestyle='-', color='blue')
-        ax_hum.set_title("Umidade do ar ao longo do tempo")
-        ax_hum.set_xlabel("Data")
-        ax_hum.set_ylabel("Umidade (%)")
-        ax_hum.grid(True)
-        st.pyplot(fig_hum)
+        def humidity_chart():
+            fig_hum, ax_hum = plt.subplots()
+            ax_hum.plot(series["air_humidity"]["timestamp"], series["air_humidity"]["air_humidity"], marker='s', linestyle='-', color='blue')
+            ax_hum.set_title("Umidade do ar ao longo do tempo")
+            ax_hum.set_xlabel("Data")
+            ax_hum.set_ylabel("Umidade (%)")
+            ax_hum.grid(True)
+            return fig_hum
+        show_figure('climate_humidity', (start, pontos), ['climate_data'], humidity_chart)
 
         # Histograma
-        fig, ax = plt.subplots()
-        ax.hist(df["temperature"], bins=10, color="skyblue")
-        ax.set_title("Distribuição da temperatura ambiente")
-        ax.set_xlabel("Temperatura (°C)")
-        ax.set_ylabel("Frequência")
-        st.pyplot(fig)
+        def temperature_histogram_chart():
+            fig, ax = plt.subplots()
+            histogram = series["temperature_histogram"]
+            ax.stairs(histogram["counts"], histogram["edges"], fill=True, color="skyblue")
+            ax.set_title("Distribuição da temperatura ambiente")
+            ax.set_xlabel("Temperatura (°C)")
+            ax.set_ylabel("Frequência")
+            return fig
+        show_figure('climate_temperature_histogram', (start, pontos), ['climate_data'], temperature_histogram_chart)
 
         # Dispersão temperatura x umidade
-        fig2, ax2 = plt.subplots()
-        ax2.scatter(df["temperature"], df["air_humidity"], color="green")
-        ax2.set_xlabel("Temperatura (°C)")
-        ax2.set_ylabel("Umidade do Ar (%)")
-        ax2.set_title("Correlação entre temperatura e umidade")
-        st.pyplot(fig2)
+        def scatter_chart():
+            fig2, ax2 = plt.subplots()
+            ax2.scatter(series["scatter"]["temperature"], series["scatter"]["air_humidity"], color="green")
+            ax2.set_xlabel("Temperatura (°C)")
+            ax2.set_ylabel("Umidade do Ar (%)")
+            ax2.set_title("Correlação entre temperatura e umidade")
+            return fig2
+        show_figure('climate_scatter', (start, pontos), ['climate_data'], scatter_chart)
 
         csv = df.to_csv(index=False).encode('utf-8')
         st.download_button(
@@ -155,7 +235,7 @@ if aba == "Dados Climáticos":
             st.rerun()
 
     with st.expander("Editar ou remover registro climático"):
-        ids = [r["id"] for r in climate_service.list_climate_data()]
+        ids = [r["id"] for r in climate_data()]
         selected_id = st.selectbox("Selecione o registro:", ids)
         if selected_id:
             registro = climate_service.get_climate_data(selected_id)
@@ -174,7 +254,7 @@ if aba == "Dados Climáticos":
 # ---------------------- SENSOR RECORDS -------------------------
 elif aba == "Registros de Sensores":
     st.header("🧪 Registros dos Sensores")
-    df = pd.DataFrame(sensor_service.list_sensor_records())
+    df = pd.DataFrame(sensor_records_columns())
 
     if df.empty:
         st.info("Nenhum registro de sensor disponível.")
@@ -183,30 +263,35 @@ elif aba == "Registros de Sensores":
         st.dataframe(df, use_container_width=True)
 
         with st.expander("Visualização de Nutrientes e Irrigação"):
-            fig_nutri, ax_nutri = plt.subplots()
-            df['phosphorus_present'] = df['phosphorus_present'].astype(bool)
-            df['potassium_present'] = df['potassium_present'].astype(bool)
-            nutrient_counts = pd.DataFrame({
-                "Fósforo": df['phosphorus_present'].value_counts(),
-                "Potássio": df['potassium_present'].value_counts()
-            })
-            nutrient_counts.plot(kind='bar', ax=ax_nutri, color=['purple', 'green'])
-            ax_nutri.set_title("Presença de Nutrientes (P e K)")
-            ax_nutri.set_xlabel("Presença")
-            ax_nutri.set_ylabel("Quantidade")
-            st.pyplot(fig_nutri)
-
-            fig_irrig, ax_irrig = plt.subplots()
-            df_sorted = df.sort_values(by="timestamp")
-            df_sorted['status_numeric'] = df_sorted['irrigation_status'].apply(lambda x: 1 if x == "ATIVADA" else 0)
-            ax_irrig.step(df_sorted["timestamp"], df_sorted['status_numeric'], where='post')
-            ax_irrig.set_yticks([0, 1])
-            ax_irrig.set_yticklabels(["DESLIGADA", "ATIVADA"])
-            ax_irrig.set_title("Status da Irrigação ao Longo do Tempo")
-            ax_irrig.set_xlabel("Data/Hora")
-            ax_irrig.set_ylabel("Status")
-            ax_irrig.grid(True)
-            st.pyplot(fig_irrig)
+            start = window_start()
+            series = sensor_chart_series(start, pontos)
+            st.caption(f"{series['count']} registros na janela ({janela.lower()}), até {pontos} pontos por gráfico.")
+
+            def nutrients_chart():
+                fig_nutri, ax_nutri = plt.subplots()
+                nutrient_counts = pd.DataFrame({
+                    "Fósforo": pd.Series(series['nutrients']['phosphorus_present'], dtype=int),
+                    "Potássio": pd.Series(series['nutrients']['potassium_present'], dtype=int)
+                }).fillna(0)
+                nutrient_counts.plot(kind='bar', ax=ax_nutri, color=['purple', 'green'])
+                ax_nutri.set_title("Presença de Nutrientes (P e K)")
+                ax_nutri.set_xlabel("Presença")
+                ax_nutri.set_ylabel("Quantidade")
+                return fig_nutri
+            show_figure('sensor_nutrients', (start, pontos), ['sensor_records'], nutrients_chart)
+
+            def irrigation_chart():
+                fig_irrig, ax_irrig = plt.subplots()
+                irrigation = series['irrigation']
+                ax_irrig.step(irrigation["timestamp"], irrigation['irrigation_active'], where='post')
+                ax_irrig.set_yticks([0, 1])
+                ax_irrig.set_yticklabels(["DESLIGADA", "ATIVADA"])
+                ax_irrig.set_title("Status da Irrigação ao Longo do Tempo")
+                ax_irrig.set_xlabel("Data/Hora")
+                ax_irrig.set_ylabel("Status")
+                ax_irrig.grid(True)
+                return fig_irrig
+            show_figure('sensor_irrigation', (start, pontos), ['sensor_records'], irrigation_chart)
 
     with st.expander("Novo registro de sensor"):
         umidade = st.number_input("Umidade do solo", format="%.2f")
@@ -227,7 +312,7 @@ elif aba == "Registros de Sensores":
             st.rerun()
 
     with st.expander("Editar ou remover registro existente"):
-        df = pd.DataFrame(sensor_service.list_sensor_records())
+        df = pd.DataFrame(sensor_records_columns())
 
         if df.empty:
             st.info("Nenhum registro disponível.")
@@ -270,7 +355,7 @@ elif aba == "Registros de Sensores":
 # ---------------------- COMPONENTS -------------------------
 elif aba == "Componentes":
     st.header("🔧 Componentes")
-    df = pd.DataFrame(component_service.list_components())
+    df = pd.DataFrame(components_columns())
     if df.empty:
         st.info("Nenhum componente disponível.")
     else:
@@ -285,8 +370,7 @@ elif aba == "Componentes":
             st.rerun()
 
     with st.expander("Editar ou remover componente"):
-        componentes = component_service.list_components()
-        ids = [r["id"] for r in componentes if r is not None]
+        ids = components_columns()["id"]
 
         if not ids:
             st.info("Nenhum componente disponível.")
@@ -327,9 +411,9 @@ aba = st.sidebar.radio("Selecione a tabela para gerenciar:",
 if aba == "Predição de Irrigação":
     st.header("🔮 Predição Inteligente de Irrigação")
     
-    # Carregar preditor
-    predictor = IrrigationPredictor()
-    model_loaded = predictor.load_model()
+    # Preditor compartilhado pelo processo, com o modelo já carregado
+    predictor = get_predictor()
+    model_loaded = predictor.model is not None
     
     if not model_loaded:
         st.warning("O modelo de predição não está disponível. Treinando um novo modelo...")
@@ -341,7 +425,7 @@ if aba == "Predição de Irrigação":
                 else:
                     st.error("Não foi possível treinar o modelo. Verifique os dados disponíveis.")
     else:
-        st.success("Modelo de predição carregado com sucesso!")
+        st.success(f"Modelo de predição carregado com sucesso! (versão {predictor.version})")
         
         # Interface dividida em duas seções
         col1, col2 = st.columns(2)
@@ -417,27 +501,28 @@ if aba == "Predição de Irrigação":
                     st.dataframe(schedule_df)
                     
                     # Gráfico de programação
-                    fig, ax = plt.subplots(figsize=(10, 6))
+                    def schedule_chart():
+                        fig, ax = plt.subplots(figsize=(10, 6))
                     
-                    times = [item["time"] for item in schedule]
-                    moistures = [item["predicted_moisture"] for item in schedule]
-                    confidences = [item["confidence"] for item in schedule]
+                        times = [item["time"] for item in schedule]
+                        moistures = [item["predicted_moisture"] for item in schedule]
+                        confidences = [item["confidence"] for item in schedule]
                     
-                    # Plotar umidade prevista
-                    ax.plot(times, moistures, 'b-', label="Umidade Prevista")
-                    ax.set_ylabel("Umidade do Solo (%)")
-                    ax.set_ylim(0, 100)
+                        # Plotar umidade prevista
+                        ax.plot(times, moistures, 'b-', label="Umidade Prevista")
+                        ax.set_ylabel("Umidade do Solo (%)")
+                        ax.set_ylim(0, 100)
                     
-                    # Destacar pontos de irrigação
-                    ax.scatter(times, moistures, c='red', s=100, alpha=0.7)
+                        # Destacar pontos de irrigação
+                        ax.scatter(times, moistures, c='red', s=100, alpha=0.7)
                     
-                    # Formatação do gráfico
-                    ax.set_title("Programação de Irrigação para as Próximas Horas")
-                    ax.set_xlabel("Data/Hora")
-                    ax.grid(True, linestyle='--', alpha=0.7)
-                    fig.autofmt_xdate()
-                    
-                    st.pyplot(fig)
+                        # Formatação do gráfico
+                        ax.set_title("Programação de Irrigação para as Próximas Horas")
+                        ax.set_xlabel("Data/Hora")
+                        ax.grid(True, linestyle='--', alpha=0.7)
+                        fig.autofmt_xdate()
+                        return fig
+                    show_figure('irrigation_schedule', tuple((item["time"], item["predicted_moisture"]) for item in schedule), [], schedule_chart)
                     
                     # Exportação da programação
                     csv = schedule_df.to_csv(index=False).encode("utf-8")
@@ -464,21 +549,22 @@ if aba == "Predição de Irrigação":
         "Previsão de Chuva": 0.05
     }
     
-    fig, ax = plt.subplots(figsize=(10, 6))
-    features = list(importance.keys())
-    values = list(importance.values())
-    
-    bars = ax.barh(features, values, color=sns.color_palette("viridis", len(features)))
-    ax.set_title("Importância das Variáveis para a Decisão de Irrigação")
-    ax.set_xlabel("Importância Relativa")
+    def importance_chart():
+        fig, ax = plt.subplots(figsize=(10, 6))
+        features = list(importance.keys())
+        values = list(importance.values())
     
-    # Adicionar valores nas barras
-    for bar in bars:
-        width = bar.get_width()
-        ax.text(width + 0.01, bar.get_y() + bar.get_height()/2, 
-                f"{width*100:.1f}%", ha='left', va='center')
+        bars = ax.barh(features, values, color=sns.color_palette("viridis", len(features)))
+        ax.set_title("Importância das Variáveis para a Decisão de Irrigação")
+        ax.set_xlabel("Importância Relativa")
     
-    st.pyplot(fig)
+        # Adicionar valores nas barras
+        for bar in bars:
+            width = bar.get_width()
+            ax.text(width + 0.01, bar.get_y() + bar.get_height()/2, 
+                    f"{width*100:.1f}%", ha='left', va='center')
+        return fig
+    show_figure('feature_importance', tuple(importance.items()), [], importance_chart)
     
     # Informações adicionais sobre o modelo
     with st.expander("Sobre o Modelo de Machine Learning"):
@@ -499,3 +585,5 @@ if aba == "Predição de Irrigação":
         3. Usa o modelo treinado para prever se a irrigação é necessária
         4. Programa horários ótimos para irrigação automática
         """)
+
+startup_timing.report('app_dashboard')
@@ -0,0 +1,93 @@
+"""
+Benchmark da junção sensor x clima usada no treinamento: implementação original
+(iterrows + min, O(N x M)) contra a junção as-of vetorizada e a versão em blocos.
+
+Uso (na pasta src/python):
+    python -m benchmarks.bench_prepare_data --sizes 1000 10000 100000 1000000 --naive-max 4000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from training_data import FEATURES, TARGET, sensor_frame, climate_frame, join_nearest_climate, iter_joined_chunks
+
+
+def make_frames(n_sensor: int, seed: int = 42):
+    """
+    Leituras a cada 10 minutos (com jitter) e um registro climático por hora.
+    """
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2024-01-01", tz="UTC")
+    n_climate = max(1, n_sensor // 6)
+    sensor_times = start + pd.to_timedelta(np.arange(n_sensor) * 600 + rng.integers(0, 60, n_sensor), unit="s")
+    climate_times = start + pd.to_timedelta(np.arange(n_climate) * 3600, unit="s")
+    sensor_df = sensor_frame(zip(
+        sensor_times,
+        rng.uniform(0, 100, n_sensor),
+        rng.random(n_sensor) > 0.5,
+        rng.random(n_sensor) > 0.5,
+        rng.uniform(3, 10, n_sensor),
+        np.where(rng.random(n_sensor) > 0.5, "ATIVADA", "DESLIGADA")
+    ))
+    climate_df = climate_frame(zip(
+        climate_times,
+        rng.uniform(10, 35, n_climate),
+        rng.uniform(20, 90, n_climate),
+        rng.random(n_climate) > 0.5
+    ))
+    return sensor_df, climate_df
+
+
+def naive_join(sensor_df: pd.DataFrame, climate_df: pd.DataFrame) -> pd.DataFrame:
+    merged = []
+    for _, sensor_row in sensor_df.iterrows():
+        sensor_time = sensor_row['timestamp']
+        closest = min(climate_df.iterrows(), key=lambda x: abs((x[1]['timestamp'] - sensor_time).total_seconds()))
+        if abs((closest[1]['timestamp'] - sensor_time).total_seconds()) <= 3600:
+            merged.append({
+                **{feature: sensor_row[feature] for feature in FEATURES[:4]},
+                'temperature': closest[1]['temperature'],
+                'air_humidity': closest[1]['air_humidity'],
+                'rain_forecast': closest[1]['rain_forecast'],
+                TARGET: sensor_row[TARGET]
+            })
+    return pd.DataFrame(merged)
+
+
+def chunked_join(sensor_df: pd.DataFrame, climate_df: pd.DataFrame, chunk_size: int) -> pd.DataFrame:
+    timestamps = climate_df['timestamp']
+
+    def climate_lookup(start, end):
+        # Equivalente a uma consulta por intervalo no banco
+        return climate_df.iloc[timestamps.searchsorted(start, side='left'):timestamps.searchsorted(end, side='right')]
+
+    chunks = (sensor_df.iloc[i:i + chunk_size] for i in range(0, len(sensor_df), chunk_size))
+    return pd.concat(iter_joined_chunks(chunks, climate_lookup), ignore_index=True)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--naive-max', type=int, default=4000, help='Maior N executado na implementação original')
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    args = parser.parse_args()
+
+    print(f"{'N sensores':>11} {'M clima':>8} {'original (s)':>13} {'as-of (s)':>10} {'blocos (s)':>11} {'linhas':>9}")
+    for n in args.sizes:
+        sensor_df, climate_df = make_frames(n)
+        naive = f"{timed(naive_join, sensor_df, climate_df)[0]:>13.3f}" if n <= args.naive_max else f"{'-':>13}"
+        vectorized, rows = timed(join_nearest_climate, sensor_df, climate_df)
+        chunked, _ = timed(chunked_join, sensor_df, climate_df, args.chunk_size)
+        print(f"{n:>11} {len(climate_df):>8} {naive} {vectorized:>10.3f} {chunked:>11.3f} {rows:>9}")
+
+
+if __name__ == "__main__":
+    main()
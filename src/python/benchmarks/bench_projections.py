@@ -0,0 +1,104 @@
+"""
+Benchmark das formas de listagem de leituras de sensores: memória de pico (tracemalloc)
+e tempo para montar N registros como objetos ORM, dicionários, linhas compactas
+(`__slots__`) e formato colunar.
+
+Cria e remove as próprias tabelas: use um banco dedicado (por padrão, um arquivo SQLite).
+
+Uso (na pasta src/python):
+    python -m benchmarks.bench_projections --rows 200000
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+import uuid
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+from database.models import Base, Producer, Crop, Component, SensorRecord
+from database.projections import entity_dict
+from database.repositories import SensorRecordRepository
+
+START = datetime(2024, 1, 1)
+
+
+def load(engine, rows: int, sensors: int):
+    rng = random.Random(42)
+    producer_id, crop_id = str(uuid.uuid4()), str(uuid.uuid4())
+    sensor_ids = [str(uuid.uuid4()) for _ in range(sensors)]
+    with engine.begin() as conn:
+        conn.execute(insert(Producer), [{'id': producer_id, 'name': "Benchmark", 'email': "bench@example.com", 'phone': "0"}])
+        conn.execute(insert(Crop), [{'id': crop_id, 'name': "Benchmark", 'type': "Grão", 'start_date': date(2024, 1, 1), 'producer_id': producer_id}])
+        conn.execute(insert(Component), [
+            {'id': sensor_id, 'name': "Sensor", 'type': "Sensor", 'crop_id': crop_id} for sensor_id in sensor_ids
+        ])
+        conn.execute(insert(SensorRecord), [
+            {
+                'id': str(uuid.uuid4()),
+                'sensor_id': sensor_ids[i % sensors],
+                'timestamp': START + timedelta(minutes=i),
+                'soil_moisture': rng.uniform(0, 100),
+                'phosphorus_present': rng.random() > 0.3,
+                'potassium_present': rng.random() > 0.3,
+                'soil_ph': rng.uniform(3, 10),
+                'irrigation_status': "ATIVADA" if rng.random() > 0.5 else "DESLIGADA"
+            } for i in range(rows)
+        ])
+
+
+def strategies(session: Session) -> dict:
+    repo = SensorRecordRepository(session)
+    return {
+        'objetos ORM': lambda: repo.get_all(),
+        'ORM -> dict': lambda: [entity_dict(record) for record in repo.get_all()],
+        'dicts (Core)': lambda: repo.list_dicts(),
+        'linhas __slots__': lambda: repo.list_rows(),
+        'colunar': lambda: repo.list_columns(),
+    }
+
+
+def measure(session: Session, run) -> tuple:
+    session.expunge_all()
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    session.expunge_all()
+    return elapsed * 1000, peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='sqlite:///bench_projections.db', help='URL SQLAlchemy do banco dedicado')
+    parser.add_argument('--rows', type=int, default=200000, help='Leituras de sensores')
+    parser.add_argument('--sensors', type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        if session.scalar(select(func.count()).select_from(SensorRecord)):
+            raise SystemExit("O banco já possui registros de sensores; use um banco dedicado ao benchmark.")
+
+    try:
+        load(engine, args.rows, args.sensors)
+        with Session(engine) as session:
+            print(f"{'forma':<18} {'tempo (ms)':>12} {'pico (MiB)':>12}")
+            for name, run in strategies(session).items():
+                elapsed, peak = measure(session, run)
+                print(f"{name:<18} {elapsed:>12.0f} {peak:>12.1f}")
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
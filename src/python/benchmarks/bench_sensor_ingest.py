@@ -0,0 +1,78 @@
+"""
+Benchmark de ingestão de registros de sensores: caminho linha a linha
+(`create_sensor_record`) contra o caminho em lote (`ingest_batch`).
+
+Uso (na pasta src/python):
+    python -m benchmarks.bench_sensor_ingest --rows 5000 --batch-size 1000
+"""
+import argparse
+import random
+import time
+from datetime import date
+
+from sqlalchemy import delete
+
+from database.models import SensorRecord
+from database.connection import get_session, close_session
+from database.repositories import ProducerRepository, CropRepository, ComponentRepository
+from services.sensor_service import SensorRecordService
+
+
+def make_readings(sensor_id: str, rows: int) -> list:
+    rng = random.Random(42)
+    return [
+        {
+            'sensor_id': sensor_id,
+            'soil_moisture': rng.uniform(0, 100),
+            'phosphorus_present': rng.random() > 0.3,
+            'potassium_present': rng.random() > 0.3,
+            'soil_ph': rng.uniform(3, 10)
+        } for _ in range(rows)
+    ]
+
+
+def bench_per_row(service: SensorRecordService, readings: list) -> float:
+    start = time.perf_counter()
+    for reading in readings:
+        service.create_sensor_record(reading)
+    return time.perf_counter() - start
+
+
+def bench_batch(service: SensorRecordService, readings: list, batch_size: int) -> float:
+    start = time.perf_counter()
+    for offset in range(0, len(readings), batch_size):
+        service.ingest_batch(readings[offset:offset + batch_size])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000, help='Leituras por cenário')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Tamanho do lote no caminho em lote')
+    args = parser.parse_args()
+
+    session = get_session()
+    producer = ProducerRepository(session).create(name="Benchmark", email="bench@example.com", phone="0")
+    crop = CropRepository(session).create(name="Benchmark", type="Grão", start_date=date.today(), producer_id=producer.id)
+    sensor = ComponentRepository(session).create(name="Sensor Benchmark", type="Sensor", crop_id=crop.id)
+    service = SensorRecordService(session)
+
+    try:
+        readings = make_readings(sensor.id, args.rows)
+        per_row = bench_per_row(service, readings)
+        batch = bench_batch(service, readings, args.batch_size)
+
+        print(f"{'caminho':<12} {'linhas':>8} {'segundos':>10} {'linhas/s':>12}")
+        print(f"{'por linha':<12} {args.rows:>8} {per_row:>10.3f} {args.rows / per_row:>12.0f}")
+        print(f"{'lote':<12} {args.rows:>8} {batch:>10.3f} {args.rows / batch:>12.0f}")
+        print(f"Ganho: {per_row / batch:.1f}x")
+    finally:
+        session.rollback()
+        session.execute(delete(SensorRecord).where(SensorRecord.sensor_id == sensor.id))
+        session.commit()
+        ProducerRepository(session).delete(producer.id)
+        close_session()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,12 @@ from .models import (
     ClimateData,
     Producer,
     Crop,
-    Application
+    Application,
+    SensorRecordHourly,
+    SensorRecordDaily,
+    RollupWatermark,
+    SensorLatestState,
+    IrrigationPrediction
 )
 from .repositories import (
     ProducerRepository,
@@ -15,9 +20,13 @@ from .repositories import (
     ComponentRepository,
     SensorRecordRepository,
     ApplicationRepository,
-    ClimateDataRepository
+    ClimateDataRepository,
+    SensorRollupRepository,
+    SensorStateRepository,
+    IrrigationPredictionRepository
 )
-from .oracle import get_session, close_session, engine
+from .connection import get_session, close_session, get_engine, warm_up
+from .unit_of_work import UnitOfWork, unit_of_work
 
 __all__ = [
     'Component',
@@ -26,13 +35,32 @@ __all__ = [
     'Producer',
     'Crop',
     'Application',
+    'SensorRecordHourly',
+    'SensorRecordDaily',
+    'RollupWatermark',
+    'SensorLatestState',
+    'IrrigationPrediction',
     'ProducerRepository',
     'CropRepository',
     'ComponentRepository',
     'SensorRecordRepository',
     'ApplicationRepository',
     'ClimateDataRepository',
+    'SensorRollupRepository',
+    'SensorStateRepository',
+    'IrrigationPredictionRepository',
     'get_session',
     'close_session',
+    'get_engine',
+    'warm_up',
+    'UnitOfWork',
+    'unit_of_work',
     'engine'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    # O engine é criado no primeiro acesso (ver `connection.get_engine`)
+    if name == 'engine':
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
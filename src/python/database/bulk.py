@@ -0,0 +1,116 @@
+"""
+Inserção em massa com o caminho mais rápido de cada backend:
+- PostgreSQL (psycopg2): `COPY ... FROM STDIN`;
+- Oracle (python-oracledb): `executemany` com array binding em blocos;
+- demais (SQLite etc.): `INSERT` executemany do SQLAlchemy.
+
+Todos executam na transação corrente da sessão; o commit fica com quem chama.
+"""
+import csv
+import io
+from datetime import date, datetime
+from typing import List, Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+ORACLE_ARRAY_SIZE = 10000
+
+
+def apply_defaults(model, rows: Sequence[dict]) -> List[dict]:
+    """
+    Completa as linhas com os defaults Python das colunas (ids, timestamps, status),
+    necessários quando o INSERT não passa pelo SQLAlchemy.
+    """
+    defaults = [
+        column for column in model.__table__.columns
+        if column.default is not None and (column.default.is_scalar or column.default.is_callable)
+    ]
+    completed = []
+    for row in rows:
+        row = dict(row)
+        for column in defaults:
+            if row.get(column.key) is None:
+                default = column.default
+                row[column.key] = default.arg if default.is_scalar else default.arg(None)
+        completed.append(row)
+    return completed
+
+
+def bulk_insert(session: Session, model, rows: Sequence[dict]) -> int:
+    """
+    Insere `rows` (dicts com os nomes das colunas) na tabela do model.
+    Retorna a quantidade de linhas inseridas.
+    """
+    if not rows:
+        return 0
+    rows = apply_defaults(model, rows)
+    dialect = session.get_bind().dialect
+    if dialect.name == 'postgresql' and dialect.driver == 'psycopg2':
+        _copy_postgresql(session, model, rows)
+    elif dialect.name == 'oracle':
+        _array_insert_oracle(session, model, rows)
+    else:
+        session.execute(insert(model), rows)
+    return len(rows)
+
+
+def _columns(model, rows: Sequence[dict]) -> List[str]:
+    keys = set().union(*rows)
+    return [column.key for column in model.__table__.columns if column.key in keys]
+
+
+def _quoted(session: Session, model, columns: Sequence[str]):
+    preparer = session.get_bind().dialect.identifier_preparer
+    table = model.__table__
+    return preparer.format_table(table), ', '.join(preparer.format_column(table.columns[c]) for c in columns)
+
+
+def _copy_value(value):
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _copy_postgresql(session: Session, model, rows: Sequence[dict]):
+    columns = _columns(model, rows)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # Campos vazios sem aspas são lidos como NULL pelo COPY em CSV
+        writer.writerow(['' if value is None else value for value in (_copy_value(row.get(c)) for c in columns)])
+    buffer.seek(0)
+    table, column_list = _quoted(session, model, columns)
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def _oracle_value(value):
+    # Booleanos são colunas SMALLINT no Oracle; o tipo BOOLEAN só existe em SQL a partir da 23ai
+    return int(value) if isinstance(value, bool) else value
+
+
+def _array_insert_oracle(session: Session, model, rows: Sequence[dict]):
+    columns = _columns(model, rows)
+    table, column_list = _quoted(session, model, columns)
+    sql = (
+        f"INSERT INTO {table} ({column_list}) "
+        f"VALUES ({', '.join(f':{i + 1}' for i in range(len(columns)))})"
+    )
+    cursor = session.connection().connection.cursor()
+    try:
+        for offset in range(0, len(rows), ORACLE_ARRAY_SIZE):
+            batch = [
+                tuple(_oracle_value(row.get(column)) for column in columns)
+                for row in rows[offset:offset + ORACLE_ARRAY_SIZE]
+            ]
+            cursor.executemany(sql, batch)
+    finally:
+        cursor.close()
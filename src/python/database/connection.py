@@ -0,0 +1,219 @@
+"""
+Configuração da conexão com o banco de dados.
+
+O backend é escolhido por variáveis de ambiente:
+- `DATABASE_URL`: URL SQLAlchemy completa (tem precedência sobre as demais);
+- `DB_BACKEND`: `oracle` (padrão), `postgresql` ou `sqlite`, montando a URL a partir de
+  `ORACLE_*`, `POSTGRES_*` ou `SQLITE_PATH`.
+"""
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.orm import sessionmaker, scoped_session
+from typing import Optional
+import os
+from dotenv import load_dotenv
+import threading
+import time
+import logging
+
+import startup_timing
+from database import instrumentation
+from database.sql_functions import ping_statement
+
+logger = logging.getLogger(__name__)
+
+# Carrega variáveis de ambiente
+load_dotenv()
+
+BACKENDS = ('oracle', 'postgresql', 'sqlite')
+
+_REQUIRED_VARS = {
+    'oracle': ["ORACLE_USER", "ORACLE_PASSWORD", "ORACLE_HOST", "ORACLE_PORT", "ORACLE_SERVICE"],
+    'postgresql': ["POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_HOST", "POSTGRES_DB"],
+    'sqlite': []
+}
+
+
+def database_url() -> URL:
+    """
+    Monta a URL de conexão a partir do ambiente.
+    """
+    if os.getenv('DATABASE_URL'):
+        return make_url(os.getenv('DATABASE_URL'))
+
+    backend = os.getenv('DB_BACKEND', 'oracle').lower()
+    if backend not in BACKENDS:
+        raise EnvironmentError(f"Erro: DB_BACKEND inválido - {backend}. Use um de {', '.join(BACKENDS)}.")
+    missing_vars = [var for var in _REQUIRED_VARS[backend] if not os.getenv(var)]
+    if missing_vars:
+        raise EnvironmentError(f"Erro: Variáveis de ambiente ausentes - {', '.join(missing_vars)}.\nVerifique se o arquivo .env contém todas as configurações necessárias.")
+
+    if backend == 'oracle':
+        return URL.create(
+            "oracle+oracledb",
+            username=os.getenv('ORACLE_USER'),
+            password=os.getenv('ORACLE_PASSWORD'),
+            host=os.getenv('ORACLE_HOST'),
+            port=int(os.getenv('ORACLE_PORT')),
+            database=os.getenv('ORACLE_SERVICE')
+        )
+    if backend == 'postgresql':
+        return URL.create(
+            "postgresql+psycopg2",
+            username=os.getenv('POSTGRES_USER'),
+            password=os.getenv('POSTGRES_PASSWORD'),
+            host=os.getenv('POSTGRES_HOST'),
+            port=int(os.getenv('POSTGRES_PORT', '5432')),
+            database=os.getenv('POSTGRES_DB')
+        )
+    return URL.create("sqlite", database=os.getenv('SQLITE_PATH', 'agro.db'))
+
+
+# Configurações do engine para bancos cliente/servidor
+ENGINE_CONFIG = {
+    'pool_size': 5,
+    'max_overflow': 10,
+    'pool_timeout': 30,
+    'pool_recycle': 1800,  # Recicla conexões a cada 30 minutos
+    'pool_pre_ping': True,  # Verifica conexão antes de usar
+    # Log de cada comando (síncrono, no caminho crítico): só para depuração.
+    # Latências e consultas lentas ficam em database.instrumentation.
+    'echo': os.getenv('DB_ECHO', '0') == '1'
+}
+
+
+def engine_options(url: URL) -> dict:
+    if url.get_backend_name() == 'sqlite':
+        # Arquivo local: sem limites de pool; a conexão pode ser usada por outras threads
+        return {
+            'pool_pre_ping': ENGINE_CONFIG['pool_pre_ping'],
+            'echo': ENGINE_CONFIG['echo'],
+            'connect_args': {'check_same_thread': False}
+        }
+    return dict(ENGINE_CONFIG)
+
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    """
+    WAL permite leituras concorrentes com um escritor (dashboard + ingestão);
+    synchronous=NORMAL é seguro com WAL e evita um fsync por commit.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")  # ON DELETE CASCADE declarado nos models
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+def create_engine_with_retry(url: URL = None, max_retries=3, retry_delay=5):
+    """Cria o engine com retry logic."""
+    url = url or database_url()
+    for attempt in range(max_retries):
+        try:
+            logger.info(f"Tentativa {attempt + 1} de {max_retries} para criar engine ({url.get_backend_name()})")
+            engine = create_engine(url, **engine_options(url))
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, "connect", _configure_sqlite)
+            # Testa a conexão
+            with engine.connect() as conn:
+                conn.execute(text(ping_statement(engine.dialect.name)))
+            logger.info("Engine criado com sucesso")
+            return engine
+        except Exception as e:
+            logger.error(f"Erro ao criar engine (tentativa {attempt + 1}): {str(e)}")
+            if attempt < max_retries - 1:
+                logger.info(f"Aguardando {retry_delay} segundos antes da próxima tentativa...")
+                time.sleep(retry_delay)
+            else:
+                raise
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """
+    Retorna o engine, criando-o no primeiro uso. Importar o pacote `database` não
+    abre conexões: a espera pelo banco só acontece quando ele é de fato necessário.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = create_engine_with_retry()
+                if instrumentation.enabled():
+                    instrumentation.install(engine)
+                startup_timing.mark('engine')
+                startup_timing.watch_first_query(engine)
+                _engine = engine
+    return _engine
+
+
+def warm_up(background: bool = True) -> Optional[threading.Thread]:
+    """
+    Cria o engine e abre a primeira conexão do pool antecipadamente, por padrão em uma
+    thread, para que a latência do banco se sobreponha aos imports e à montagem da tela.
+    """
+    def run():
+        try:
+            with get_engine().connect() as conn:
+                conn.execute(text(ping_statement(conn.dialect.name)))
+        except Exception as e:
+            logger.error(f"Erro no aquecimento da conexão: {str(e)}")
+
+    if _engine is not None:
+        return None
+    if not background:
+        run()
+        return None
+    thread = threading.Thread(target=run, name="db-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def __getattr__(name):
+    # `engine` continua disponível como atributo do módulo, criado sob demanda
+    if name == 'engine':
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Cria a sessão; o engine é associado quando a primeira sessão é aberta
+session_factory = sessionmaker()
+Session = scoped_session(lambda: session_factory(bind=get_engine()))
+
+def get_session():
+    # Sem consulta de teste: o pool já valida a conexão no checkout (pool_pre_ping)
+    try:
+        return Session()
+    except Exception as e:
+        logger.error(f"Erro ao obter sessão: {str(e)}")
+        Session.remove()
+        raise
+
+def reset_after_fork():
+    """
+    Para processos filhos criados com fork (ex.: pools de treino): descarta, sem fechar, o
+    pool de conexões e a sessão herdados do processo pai, que continua usando-os. O filho
+    abre as próprias conexões no primeiro acesso.
+    """
+    if _engine is not None:
+        _engine.dispose(close=False)
+    Session.registry.clear()
+
+def close_session():
+    try:
+        Session.remove()
+    except Exception as e:
+        logger.error(f"Erro ao fechar sessão: {str(e)}")
+
+class DB:
+    session = Session
+
+    @property
+    def engine(self):
+        return get_engine()
+
+db = DB()
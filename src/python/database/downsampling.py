@@ -0,0 +1,108 @@
+"""
+Redução de séries temporais para gráficos, com custo de renderização limitado pela
+quantidade de pontos pedida e não pelo tamanho do histórico:
+
+- LTTB (Largest-Triangle-Three-Buckets, Steinarsson 2013) para séries em linha: mantém,
+  em cada bucket, o ponto que forma o maior triângulo com os vizinhos, preservando picos
+  e a forma visual da curva;
+- mínimo/máximo por bucket para gráficos em degraus (status de irrigação), em que
+  nenhuma transição pode sumir.
+
+As funções retornam índices das linhas escolhidas, em ordem crescente, para que as
+demais colunas da mesma linha possam ser recortadas juntas.
+"""
+from datetime import datetime
+from typing import Dict, Sequence
+
+import numpy as np
+
+DEFAULT_POINTS = 1000
+
+
+def epoch_seconds(timestamps: Sequence[datetime]) -> np.ndarray:
+    return np.asarray(timestamps, dtype='datetime64[us]').astype(np.int64) / 1e6
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Índices dos `points` pontos escolhidos pelo LTTB (sempre incluindo o primeiro e o último).
+    `x` deve estar em ordem crescente.
+    """
+    n = len(x)
+    if points >= n or points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # points - 2 buckets entre o primeiro e o último ponto
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    indices = np.empty(points, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    selected = 0
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        # Vértice seguinte do triângulo: a média do próximo bucket
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        ax, ay = x[selected], y[selected]
+        area = np.abs((ax - avg_x) * (y[start:end] - ay) - (ax - x[start:end]) * (avg_y - ay))
+        selected = start + int(np.argmax(area))
+        indices[i + 1] = selected
+    return indices
+
+
+def min_max_indices(y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Índices do mínimo e do máximo de cada bucket (`points` / 2 buckets), além do primeiro
+    e do último ponto.
+    """
+    n = len(y)
+    buckets = points // 2
+    if n <= points or buckets < 1:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    chosen = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        window = y[start:end]
+        chosen.append(start + int(np.argmin(window)))
+        chosen.append(start + int(np.argmax(window)))
+    return np.unique(chosen)
+
+
+def take(columns: Dict[str, list], indices: np.ndarray) -> Dict[str, list]:
+    """
+    Recorta as colunas (formato {coluna: [valores]}) nos índices informados.
+    """
+    return {name: [values[i] for i in indices] for name, values in columns.items()}
+
+
+def lttb(columns: Dict[str, list], x: str, y: str, points: int = DEFAULT_POINTS) -> Dict[str, list]:
+    """
+    Série {x: [...], y: [...]} reduzida por LTTB. `x` é a coluna de timestamps.
+    """
+    series = {x: columns[x], y: columns[y]}
+    if len(columns[x]) <= points:
+        return series
+    return take(series, lttb_indices(epoch_seconds(columns[x]), np.asarray(columns[y], dtype=float), points))
+
+
+def min_max(columns: Dict[str, list], x: str, y: str, points: int = DEFAULT_POINTS) -> Dict[str, list]:
+    """
+    Série {x: [...], y: [...]} reduzida aos extremos de cada bucket.
+    """
+    series = {x: columns[x], y: columns[y]}
+    if len(columns[x]) <= points:
+        return series
+    return take(series, min_max_indices(np.asarray(columns[y], dtype=float), points))
+
+
+def sample(columns: Dict[str, list], points: int = DEFAULT_POINTS, seed: int = 0) -> Dict[str, list]:
+    """
+    Amostra aleatória (reprodutível) de até `points` linhas, para gráficos de dispersão.
+    """
+    n = len(next(iter(columns.values()), []))
+    if n <= points:
+        return columns
+    indices = np.sort(np.random.default_rng(seed).choice(n, size=points, replace=False))
+    return take(columns, indices)
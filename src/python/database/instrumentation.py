@@ -0,0 +1,289 @@
+"""
+Instrumentação das consultas SQL, no lugar de `echo=True`:
+
+- histogramas de latência por comando, agrupados pelo SQL normalizado
+  (literais e parâmetros trocados por `?`, listas IN colapsadas);
+- log de consultas lentas acima de um limite, com amostragem;
+- contagem de comandos por chamada de serviço, sinalizando padrões N+1.
+
+Configuração por variáveis de ambiente:
+- `DB_INSTRUMENTATION`: `0` desliga a instrumentação (padrão: ligada);
+- `DB_SLOW_QUERY_MS`: limite do log de consultas lentas (padrão: 200);
+- `DB_SLOW_QUERY_SAMPLE`: fração das consultas lentas registradas no log (padrão: 1.0);
+- `DB_N_PLUS_ONE_THRESHOLD`: repetições do mesmo comando em uma chamada de serviço
+  a partir das quais ela é sinalizada (padrão: 10).
+
+Consulta das estatísticas:
+    from database.instrumentation import stats
+    stats.top(10)             # comandos com maior tempo total
+    stats.service_calls()     # comandos por chamada de serviço
+"""
+import bisect
+import contextvars
+import functools
+import inspect
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List
+
+from sqlalchemy import event
+
+from logs.logger import Logger
+
+logger = Logger(__name__)()
+
+# Limites superiores dos buckets do histograma, em milissegundos
+BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float('inf'))
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PARAMETER = re.compile(r"%\(\w+\)s|%s|(?<![:\w]):\w+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Forma canônica do comando, para agrupar execuções que diferem só nos valores.
+    """
+    sql = _STRING.sub("?", statement)
+    sql = _PARAMETER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(?...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class LatencyHistogram:
+    """
+    Histograma de latências com buckets fixos (memória constante por comando).
+    """
+    __slots__ = ('counts', 'count', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p: float) -> float:
+        """
+        Limite superior do bucket que contém o percentil `p` (0-100).
+        """
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'total_ms': self.total_ms,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max_ms
+        }
+
+
+class CallStats:
+    """
+    Quantidade de comandos SQL e latência das chamadas de um método de serviço.
+    """
+    __slots__ = ('calls', 'statements', 'max_statements', 'latency')
+
+    def __init__(self):
+        self.calls = 0
+        self.statements = 0
+        self.max_statements = 0
+        self.latency = LatencyHistogram()
+
+    def add(self, statements: int, ms: float):
+        self.calls += 1
+        self.statements += statements
+        self.max_statements = max(self.max_statements, statements)
+        self.latency.add(ms)
+
+    def to_dict(self) -> dict:
+        latency = self.latency.to_dict()
+        return {
+            'calls': self.calls,
+            'statements': self.statements,
+            'statements_per_call': self.statements / self.calls if self.calls else 0.0,
+            'max_statements': self.max_statements,
+            'p50_ms': latency['p50_ms'],
+            'p95_ms': latency['p95_ms'],
+            'max_ms': latency['max_ms']
+        }
+
+
+class QueryStats:
+    """
+    Estatísticas acumuladas das consultas e das chamadas de serviço (thread-safe).
+    """
+
+    def __init__(self, slow_query_ms: float = 200, slow_query_sample: float = 1.0, n_plus_one_threshold: int = 10):
+        self.slow_query_ms = slow_query_ms
+        self.slow_query_sample = slow_query_sample
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._lock = threading.Lock()
+        self._queries: Dict[str, LatencyHistogram] = {}
+        self._calls: Dict[str, CallStats] = {}
+        self._flagged: Dict[str, dict] = {}
+        self.slow_queries = 0
+
+    @classmethod
+    def from_env(cls) -> 'QueryStats':
+        return cls(
+            slow_query_ms=float(os.getenv('DB_SLOW_QUERY_MS', '200')),
+            slow_query_sample=float(os.getenv('DB_SLOW_QUERY_SAMPLE', '1.0')),
+            n_plus_one_threshold=int(os.getenv('DB_N_PLUS_ONE_THRESHOLD', '10'))
+        )
+
+    def record_query(self, statement: str, ms: float, parameters=None):
+        sql = normalize_sql(statement)
+        with self._lock:
+            histogram = self._queries.get(sql)
+            if histogram is None:
+                histogram = self._queries[sql] = LatencyHistogram()
+            histogram.add(ms)
+            slow = ms >= self.slow_query_ms
+            if slow:
+                self.slow_queries += 1
+        for frame in _call_stack.get():
+            frame[sql] += 1
+        if slow and random.random() < self.slow_query_sample:
+            logger.warning(f"[SQL lento] {ms:.1f} ms: {sql} | parâmetros: {str(parameters)[:200]}")
+        return sql
+
+    def record_call(self, name: str, statements: Counter, ms: float):
+        total = sum(statements.values())
+        with self._lock:
+            call_stats = self._calls.get(name)
+            if call_stats is None:
+                call_stats = self._calls[name] = CallStats()
+            call_stats.add(total, ms)
+        if not statements:
+            return
+        sql, repeats = statements.most_common(1)[0]
+        if repeats >= self.n_plus_one_threshold:
+            with self._lock:
+                self._flagged[name] = {'statement': sql, 'repeats': repeats, 'statements': total}
+            logger.warning(f"[N+1] {name}: {repeats}x o mesmo comando ({total} no total, {ms:.0f} ms): {sql}")
+
+    def queries(self) -> Dict[str, dict]:
+        with self._lock:
+            return {sql: histogram.to_dict() for sql, histogram in self._queries.items()}
+
+    def top(self, limit: int = 10, by: str = 'total_ms') -> List[dict]:
+        """
+        Comandos ordenados por `by` (`total_ms`, `count`, `p95_ms`, `max_ms`...).
+        """
+        rows = [{'statement': sql, **values} for sql, values in self.queries().items()]
+        return sorted(rows, key=lambda row: row[by], reverse=True)[:limit]
+
+    def service_calls(self) -> Dict[str, dict]:
+        """
+        Comandos SQL por chamada e latência de cada método de serviço instrumentado.
+        """
+        with self._lock:
+            return {name: call_stats.to_dict() for name, call_stats in self._calls.items()}
+
+    def n_plus_one(self) -> Dict[str, dict]:
+        with self._lock:
+            return dict(self._flagged)
+
+    def reset(self):
+        with self._lock:
+            self._queries.clear()
+            self._calls.clear()
+            self._flagged.clear()
+            self.slow_queries = 0
+
+
+stats = QueryStats.from_env()
+
+# Contadores de comandos das chamadas de serviço em andamento (chamadas aninhadas
+# contam também para as externas)
+_call_stack: contextvars.ContextVar = contextvars.ContextVar('db_call_stack', default=())
+
+
+@contextmanager
+def track_calls(name: str):
+    """
+    Conta os comandos SQL executados no bloco e os registra sob `name`.
+    """
+    statements = Counter()
+    token = _call_stack.set(_call_stack.get() + (statements,))
+    start = time.perf_counter()
+    try:
+        yield statements
+    finally:
+        _call_stack.reset(token)
+        stats.record_call(name, statements, (time.perf_counter() - start) * 1000)
+
+
+def instrument_service(cls):
+    """
+    Decorador de classe: conta os comandos SQL de cada método público do serviço.
+    Métodos geradores (iter_*) não são envolvidos, pois executam fora da chamada.
+    """
+    for attr, method in list(vars(cls).items()):
+        if attr.startswith('_') or not inspect.isfunction(method) or inspect.isgeneratorfunction(method):
+            continue
+        setattr(cls, attr, _tracked(f"{cls.__name__}.{attr}", method))
+    return cls
+
+
+def _tracked(name: str, method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with track_calls(name):
+            return method(*args, **kwargs)
+    return wrapper
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info['query_start'].pop()
+    stats.record_query(statement, (time.perf_counter() - start) * 1000, parameters)
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_start'):
+        connection.info['query_start'].pop()
+
+
+def enabled() -> bool:
+    return os.getenv('DB_INSTRUMENTATION', '1') != '0'
+
+
+def install(engine):
+    """
+    Registra os eventos de instrumentação no engine (idempotente).
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+    return engine
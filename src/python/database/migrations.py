@@ -0,0 +1,88 @@
+"""
+Migração do esquema em bancos já existentes: cria as tabelas e os índices declarados
+nos models que ainda não existem. É idempotente e não altera nem remove objetos.
+
+Uso (na pasta src/python):
+    python -m database.migrations           # aplica
+    python -m database.migrations --dry-run # apenas lista o que seria criado
+"""
+import argparse
+import logging
+from typing import List
+
+from sqlalchemy import Index, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from database.models import Base, SensorLatestState
+from database.repositories import SensorStateRepository
+
+logger = logging.getLogger(__name__)
+
+
+def missing_tables(engine: Engine) -> List[str]:
+    existing = set(inspect(engine).get_table_names())
+    return [table.name for table in Base.metadata.sorted_tables if table.name not in existing]
+
+
+def missing_indexes(engine: Engine) -> List[Index]:
+    """
+    Índices declarados nos models ausentes em tabelas que já existem no banco.
+    A comparação é feita pelo nome, sem diferenciar maiúsculas (o Oracle as normaliza).
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index['name'].lower() for index in inspector.get_indexes(table.name) if index.get('name')}
+        missing.extend(index for index in sorted(table.indexes, key=lambda i: i.name)
+                       if index.name.lower() not in existing)
+    return missing
+
+
+def upgrade(engine: Engine) -> List[str]:
+    """
+    Cria tabelas e índices ausentes. Retorna os nomes dos objetos criados.
+    """
+    created = []
+    tables = missing_tables(engine)
+    indexes = missing_indexes(engine)
+    if tables:
+        # create_all cria também os índices das tabelas novas
+        Base.metadata.create_all(engine, tables=[Base.metadata.tables[name] for name in tables])
+        created.extend(tables)
+        logger.info(f"Tabelas criadas: {', '.join(tables)}")
+        if SensorLatestState.__tablename__ in tables:
+            # Tabela derivada: carga inicial a partir do histórico de leituras
+            with Session(engine) as session:
+                count = SensorStateRepository(session).rebuild()
+            logger.info(f"Estado atual carregado para {count} sensores")
+    for index in indexes:
+        index.create(engine)
+        created.append(index.name)
+        logger.info(f"Índice criado: {index.name} em {index.table.name}")
+    return created
+
+
+def main():
+    from database.connection import db
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='Apenas lista os objetos ausentes')
+    args = parser.parse_args()
+
+    if args.dry_run:
+        for name in missing_tables(db.engine):
+            print(f"tabela {name}")
+        for index in missing_indexes(db.engine):
+            print(f"índice {index.name} em {index.table.name}")
+        return
+    created = upgrade(db.engine)
+    print(f"{len(created)} objetos criados" if created else "Esquema já atualizado")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
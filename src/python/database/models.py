@@ -1,6 +1,6 @@
 import uuid
-from sqlalchemy import Column, String, Float, Boolean, DateTime, ForeignKey, Date, Sequence
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy import Column, String, Float, Boolean, DateTime, ForeignKey, Date, Sequence, Integer, PrimaryKeyConstraint, Index
+from sqlalchemy.orm import declarative_base, relationship, declared_attr
 from datetime import datetime, timezone, timedelta
 
 Base = declarative_base()
@@ -29,6 +29,9 @@ class Component(Base):
     def __repr__(self):
         return f"<Component(id={self.id}, tipo='{self.type}')>"
 
+# Componentes de uma cultura (chave estrangeira: o Oracle não indexa FKs automaticamente)
+Index("ix_components_crop_id", Component.crop_id)
+
 # Tabela que armazena os registros de sensores no solo
 class SensorRecord(Base):
     __tablename__ = "sensor_records"
@@ -65,6 +68,11 @@ class SensorRecord(Base):
             data_dict['timestamp'] = datetime.fromisoformat(data_dict['timestamp'])
         return cls(**data_dict)
 
+# Leituras de um sensor, da mais recente para a mais antiga (get_by_sensor, get_latest_by_sensor)
+Index("ix_sensor_records_sensor_ts", SensorRecord.sensor_id, SensorRecord.timestamp.desc())
+# Intervalos de datas e paginação por keyset (timestamp, id)
+Index("ix_sensor_records_ts_id", SensorRecord.timestamp, SensorRecord.id)
+
 # Tabela que armazena os dados meteorológicos obtidos de API externa
 class ClimateData(Base):
     __tablename__ = "climate_data"
@@ -84,6 +92,9 @@ class ClimateData(Base):
             "rain_forecast": self.rain_forecast,
         }
 
+# Registro mais recente, intervalos de datas e paginação por keyset (timestamp, id)
+Index("ix_climate_data_ts_id", ClimateData.timestamp, ClimateData.id)
+
 # Tabela que armazena os dados dos produtores
 class Producer(Base):
     __tablename__ = 'producers'
@@ -116,6 +127,8 @@ class Crop(Base):
     def __repr__(self):
         return f"<Crop(id={self.id}, name='{self.name}')>"
 
+Index("ix_crops_producer_id", Crop.producer_id)
+
 # Tabela que armazena os dados de aplicação de insumos, como fertilizantes, defensivos, etc.
 class Application(Base):
     __tablename__ = 'applications'
@@ -130,3 +143,131 @@ class Application(Base):
 
     def __repr__(self):
         return f"<Application(id={self.id}, crop={self.crop_id}, type='{self.type}')>"
+
+# Aplicações de uma cultura por tipo e período (get_by_crop, totais por tipo)
+Index("ix_applications_crop_type_ts", Application.crop_id, Application.type, Application.timestamp)
+# Intervalos de datas e paginação por keyset (timestamp, id)
+Index("ix_applications_ts_id", Application.timestamp, Application.id)
+
+# Colunas comuns às tabelas de agregação (rollup) dos registros de sensores
+class SensorRollupMixin:
+    @declared_attr
+    def __table_args__(cls):
+        # Chave (sensor_id, bucket_start): atende às consultas por sensor e intervalo
+        return (PrimaryKeyConstraint("sensor_id", "bucket_start"),)
+
+    @declared_attr
+    def sensor_id(cls):
+        return Column(String(36), ForeignKey("components.id", ondelete="CASCADE"), nullable=False)
+
+    bucket_start = Column(DateTime, nullable=False)
+    sample_count = Column(Integer, nullable=False)
+    soil_moisture_min = Column(Float, nullable=False)
+    soil_moisture_max = Column(Float, nullable=False)
+    soil_moisture_avg = Column(Float, nullable=False)
+    soil_ph_min = Column(Float, nullable=False)
+    soil_ph_max = Column(Float, nullable=False)
+    soil_ph_avg = Column(Float, nullable=False)
+    phosphorus_ratio = Column(Float, nullable=False)
+    potassium_ratio = Column(Float, nullable=False)
+    irrigation_on_ratio = Column(Float, nullable=False)
+
+    def to_dict(self):
+        return {
+            "sensor_id": self.sensor_id,
+            "bucket_start": self.bucket_start.isoformat(),
+            "sample_count": self.sample_count,
+            "soil_moisture_min": self.soil_moisture_min,
+            "soil_moisture_max": self.soil_moisture_max,
+            "soil_moisture_avg": self.soil_moisture_avg,
+            "soil_ph_min": self.soil_ph_min,
+            "soil_ph_max": self.soil_ph_max,
+            "soil_ph_avg": self.soil_ph_avg,
+            "phosphorus_ratio": self.phosphorus_ratio,
+            "potassium_ratio": self.potassium_ratio,
+            "irrigation_on_ratio": self.irrigation_on_ratio,
+        }
+
+# Agregação horária dos registros de sensores
+class SensorRecordHourly(SensorRollupMixin, Base):
+    __tablename__ = "sensor_records_hourly"
+
+    def __repr__(self):
+        return f"<SensorRecordHourly(sensor_id={self.sensor_id}, bucket_start={self.bucket_start})>"
+
+# Agregação diária dos registros de sensores
+class SensorRecordDaily(SensorRollupMixin, Base):
+    __tablename__ = "sensor_records_daily"
+
+    def __repr__(self):
+        return f"<SensorRecordDaily(sensor_id={self.sensor_id}, bucket_start={self.bucket_start})>"
+
+# Marca d'água dos jobs incrementais: até onde os dados brutos já foram processados
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(50), primary_key=True)
+    last_timestamp = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<RollupWatermark(name='{self.name}', last_timestamp={self.last_timestamp})>"
+
+# Leitura mais recente de cada sensor, mantida na mesma transação de cada inserção:
+# o estado atual de todos os sensores custa O(sensores), e não O(histórico)
+class SensorLatestState(Base):
+    __tablename__ = "sensor_latest_state"
+
+    sensor_id = Column(String(36), ForeignKey("components.id", ondelete="CASCADE"), primary_key=True)
+    record_id = Column(String(36), nullable=False)
+    timestamp = Column(DateTime, nullable=False)
+    soil_moisture = Column(Float, nullable=False)
+    phosphorus_present = Column(Boolean, nullable=False)
+    potassium_present = Column(Boolean, nullable=False)
+    soil_ph = Column(Float, nullable=False)
+    irrigation_status = Column(String(10), nullable=False)
+
+    def to_dict(self):
+        return {
+            "sensor_id": self.sensor_id,
+            "record_id": self.record_id,
+            "timestamp": self.timestamp.isoformat(),
+            "soil_moisture": self.soil_moisture,
+            "phosphorus_present": self.phosphorus_present,
+            "potassium_present": self.potassium_present,
+            "soil_ph": self.soil_ph,
+            "irrigation_status": self.irrigation_status,
+        }
+
+    def __repr__(self):
+        return f"<SensorLatestState(sensor_id={self.sensor_id}, timestamp={self.timestamp})>"
+
+# Predições de irrigação geradas em lote: uma linha por sensor a cada execução do job
+# de pontuação (`services.prediction_service`), todas com o mesmo `predicted_at`
+class IrrigationPrediction(Base):
+    __tablename__ = "irrigation_predictions"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    sensor_id = Column(String(36), ForeignKey("components.id", ondelete="CASCADE"), nullable=False)
+    record_id = Column(String(36), nullable=False)  # leitura usada como entrada
+    climate_id = Column(String(36), nullable=False)  # registro climático usado como entrada
+    predicted_at = Column(DateTime, nullable=False)
+    should_irrigate = Column(Boolean, nullable=False)
+    confidence = Column(Float, nullable=False)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "sensor_id": self.sensor_id,
+            "record_id": self.record_id,
+            "climate_id": self.climate_id,
+            "predicted_at": self.predicted_at.isoformat(),
+            "should_irrigate": self.should_irrigate,
+            "confidence": self.confidence,
+        }
+
+    def __repr__(self):
+        return f"<IrrigationPrediction(sensor_id={self.sensor_id}, predicted_at={self.predicted_at})>"
+
+# Predições de um sensor por data e a execução mais recente
+Index("ix_predictions_sensor_ts", IrrigationPrediction.sensor_id, IrrigationPrediction.predicted_at)
+Index("ix_predictions_ts", IrrigationPrediction.predicted_at)
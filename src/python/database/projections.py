@@ -0,0 +1,121 @@
+"""
+Projeções de leitura: linhas compactas (dataclasses com `__slots__`) montadas a partir de
+`select()` do Core, sem instanciar objetos ORM nem registrá-los no identity map.
+
+Cada projeção declara os campos na ordem das colunas selecionadas, então uma linha do
+resultado vira uma instância com `Projection(*row)`.
+"""
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence
+
+
+@dataclass(frozen=True, slots=True)
+class ProducerRow:
+    id: str
+    name: str
+    email: str
+    phone: str
+
+
+@dataclass(frozen=True, slots=True)
+class CropRow:
+    id: str
+    name: str
+    type: str
+    start_date: date
+    end_date: Optional[date]
+    producer_id: str
+
+
+@dataclass(frozen=True, slots=True)
+class ComponentRow:
+    id: str
+    name: str
+    type: str
+    crop_id: Optional[str]
+
+
+@dataclass(frozen=True, slots=True)
+class SensorRecordRow:
+    id: str
+    sensor_id: str
+    timestamp: datetime
+    soil_moisture: float
+    phosphorus_present: bool
+    potassium_present: bool
+    soil_ph: float
+    irrigation_status: str
+
+
+@dataclass(frozen=True, slots=True)
+class SensorStateRow:
+    sensor_id: str
+    record_id: str
+    timestamp: datetime
+    soil_moisture: float
+    phosphorus_present: bool
+    potassium_present: bool
+    soil_ph: float
+    irrigation_status: str
+
+
+@dataclass(frozen=True, slots=True)
+class IrrigationPredictionRow:
+    id: str
+    sensor_id: str
+    record_id: str
+    climate_id: str
+    predicted_at: datetime
+    should_irrigate: bool
+    confidence: float
+
+
+@dataclass(frozen=True, slots=True)
+class ApplicationRow:
+    id: str
+    crop_id: str
+    timestamp: datetime
+    type: str
+    quantity: float
+
+
+@dataclass(frozen=True, slots=True)
+class ClimateDataRow:
+    id: str
+    timestamp: datetime
+    temperature: float
+    air_humidity: float
+    rain_forecast: bool
+
+
+def field_names(row_type) -> List[str]:
+    return [field.name for field in fields(row_type)]
+
+
+def columns_for(model, row_type) -> list:
+    """
+    Colunas do model na ordem dos campos da projeção, para usar em `select(*colunas)`.
+    """
+    return [getattr(model, name) for name in field_names(row_type)]
+
+
+def as_dict(row) -> dict:
+    return {name: getattr(row, name) for name in row.__slots__}
+
+
+def entity_dict(entity) -> dict:
+    """
+    Dicionário só com as colunas de um objeto ORM (sem `_sa_instance_state` nem
+    relacionamentos). Atributos expirados por um commit são recarregados.
+    """
+    return {attr.key: getattr(entity, attr.key) for attr in entity.__mapper__.column_attrs}
+
+
+def to_columns(rows: Sequence[tuple], names: Sequence[str]) -> Dict[str, list]:
+    """
+    Formato colunar: {coluna: [valores]}, pronto para `pd.DataFrame(...)`.
+    """
+    if not rows:
+        return {name: [] for name in names}
+    return {name: list(values) for name, values in zip(names, zip(*rows))}
@@ -1,15 +1,24 @@
+from .base import BaseRepository, Page
 from .producer_repository import ProducerRepository
 from .crop_repository import CropRepository
 from .component_repository import ComponentRepository
 from .sensor_record_repository import SensorRecordRepository
 from .application_repository import ApplicationRepository
 from .climate_data_repository import ClimateDataRepository
+from .sensor_rollup_repository import SensorRollupRepository
+from .sensor_state_repository import SensorStateRepository
+from .irrigation_prediction_repository import IrrigationPredictionRepository
 
 __all__ = [
+    'BaseRepository',
+    'Page',
     'ProducerRepository',
     'CropRepository',
     'ComponentRepository',
     'SensorRecordRepository',
     'ApplicationRepository',
-    'ClimateDataRepository'
+    'ClimateDataRepository',
+    'SensorRollupRepository',
+    'SensorStateRepository',
+    'IrrigationPredictionRepository'
 ]
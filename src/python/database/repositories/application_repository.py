@@ -1,17 +1,26 @@
-from typing import List, Optional, Type
+from typing import List, Optional, Sequence, Type
 from datetime import datetime, date, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select, distinct, Row
 from ..models import Component, SensorRecord, ClimateData, Producer, Crop, Application
+from ..sql_functions import dialect_name, time_bucket
+from ..projections import ApplicationRow
+from .base import BaseRepository
 
-class ApplicationRepository:
-    def __init__(self, session: Session):
-        self.session = session
+class ApplicationRepository(BaseRepository):
+    model = Application
+    row_type = ApplicationRow
+    keyset = ('timestamp', 'id')
+    time_column = 'timestamp'
+    GROUP_COLUMNS = {
+        'crop_id': Application.crop_id,
+        'type': Application.type
+    }
 
     def create(self, crop_id: str, type: str, quantity: float) -> Application:
         application = Application(crop_id=crop_id, type=type, quantity=quantity, timestamp=datetime.now(timezone.utc))
         self.session.add(application)
-        self.session.commit()
+        self._commit()
         return application
 
     def get_by_id(self, id: str) -> Optional[Application]:
@@ -35,35 +44,69 @@ class ApplicationRepository:
             for key, value in kwargs.items():
                 if hasattr(application, key):
                     setattr(application, key, value)
-            self.session.commit()
+            self._commit()
         return application
 
     def delete(self, id: str) -> bool:
         application = self.get_by_id(id)
         if application:
             self.session.delete(application)
-            self.session.commit()
+            self._commit()
             return True
         return False
 
-    def get_total_quantity_by_type(self, type: str, start_date: datetime = None, end_date: datetime = None) -> float:
-        query = self.session.query(Application).filter(Application.type == type)
+    def get_total_quantity_by_type(self, type: str, start_date: datetime = None, end_date: datetime = None,
+                                   crop_id: Optional[str] = None) -> float:
+        query = self.session.query(func.coalesce(func.sum(Application.quantity), 0.0)).filter(Application.type == type)
+        if crop_id:
+            query = query.filter(Application.crop_id == crop_id)
         if start_date and end_date:
             query = query.filter(Application.timestamp.between(start_date, end_date))
-        return sum(app.quantity for app in query.all())
+        return float(query.scalar())
 
     def get_crop_application_summary(self, crop_id: str) -> dict:
-        applications = self.get_by_crop(crop_id)
-        if not applications:
-            return {
-                'total_applications': 0,
-                'types_applied': [],
-                'total_quantity': 0
-            }
-        types = set(app.type for app in applications)
-        total_quantity = sum(app.quantity for app in applications)
+        rows = self.session.query(
+            Application.type,
+            func.count(Application.id),
+            func.sum(Application.quantity)
+        ).filter(Application.crop_id == crop_id).group_by(Application.type).all()
         return {
-            'total_applications': len(applications),
-            'types_applied': list(types),
-            'total_quantity': total_quantity
+            'total_applications': sum(count for _, count, _ in rows),
+            'types_applied': [type for type, _, _ in rows],
+            'total_quantity': sum(quantity for _, _, quantity in rows)
         }
+
+    def summarize(self, group_by: Sequence[str] = ('crop_id', 'type'), bucket: Optional[str] = None,
+                  crop_id: Optional[str] = None, type: Optional[str] = None,
+                  start_date: datetime = None, end_date: datetime = None) -> List[Row]:
+        """
+        Agrega as aplicações no banco (GROUP BY) por cultura, tipo e/ou intervalo de tempo
+        (`bucket`: hour, day, week ou month). Cada linha traz as colunas agrupadas, `bucket`
+        (se informado), `application_count`, `total_quantity`, `distinct_types` e `distinct_crops`.
+        """
+        groups = []
+        for name in group_by:
+            if name not in self.GROUP_COLUMNS:
+                raise ValueError(f"Agrupamento inválido: {name}. Use um de {', '.join(self.GROUP_COLUMNS)}")
+            groups.append(self.GROUP_COLUMNS[name])
+        if bucket:
+            groups.append(time_bucket(Application.timestamp, bucket, dialect_name(self.session)).label('bucket'))
+
+        stmt = select(
+            *groups,
+            func.count(Application.id).label('application_count'),
+            func.coalesce(func.sum(Application.quantity), 0.0).label('total_quantity'),
+            func.count(distinct(Application.type)).label('distinct_types'),
+            func.count(distinct(Application.crop_id)).label('distinct_crops')
+        )
+        if crop_id:
+            stmt = stmt.where(Application.crop_id == crop_id)
+        if type:
+            stmt = stmt.where(Application.type == type)
+        if start_date:
+            stmt = stmt.where(Application.timestamp >= start_date)
+        if end_date:
+            stmt = stmt.where(Application.timestamp <= end_date)
+        if groups:
+            stmt = stmt.group_by(*groups).order_by(*groups)
+        return self.session.execute(stmt).all()
@@ -0,0 +1,152 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import select, and_, or_
+from sqlalchemy.orm import Session
+from ..projections import columns_for, field_names, to_columns
+
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_CHUNK_SIZE = 1000
+
+
+@dataclass
+class Page:
+    """
+    Uma página de resultados. `next_cursor` é passado para `get_page` para buscar a
+    próxima página e é None na última.
+    """
+    items: List[Any]
+    next_cursor: Optional[Tuple]
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+
+def keyset_after(columns: Sequence, values: Sequence):
+    """
+    Condição "linha vem depois do cursor" para a ordenação por `columns`:
+    (c1 > v1) OR (c1 = v1 AND c2 > v2) OR ...
+    Escrita sem comparação de tuplas, que o Oracle não suporta.
+    """
+    clauses = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal_prefix, column > value))
+    return or_(*clauses)
+
+
+class BaseRepository:
+    """
+    Operações de leitura paginada (keyset) e em streaming comuns a todos os repositórios.
+
+    `keyset` lista os atributos do model que definem a ordem estável da paginação;
+    o último deve ser único (a chave primária).
+
+    Com `autocommit=False` (repositórios de um `unit_of_work`), as escritas apenas
+    enviam as alterações ao banco (flush) e o commit fica com quem controla a transação.
+    """
+    model = None
+    row_type = None
+    keyset: Tuple[str, ...] = ('id',)
+    time_column: Optional[str] = None
+
+    def __init__(self, session: Session, autocommit: bool = True):
+        self.session = session
+        self.autocommit = autocommit
+
+    def _commit(self):
+        if self.autocommit:
+            self.session.commit()
+        else:
+            self.session.flush()
+
+    @property
+    def keyset_columns(self) -> List:
+        return [getattr(self.model, name) for name in self.keyset]
+
+    @property
+    def row_columns(self) -> List:
+        return columns_for(self.model, self.row_type)
+
+    def _select_rows(self, filters: Sequence = ()):
+        stmt = select(*self.row_columns).where(*filters).order_by(*self.keyset_columns)
+        return self.session.execute(stmt)
+
+    def list_rows(self, filters: Sequence = ()) -> List:
+        """
+        Linhas compactas (`row_type`, com `__slots__`) via Core, sem objetos ORM.
+        """
+        row_type = self.row_type
+        return [row_type(*row) for row in self._select_rows(filters)]
+
+    def list_dicts(self, filters: Sequence = ()) -> List[dict]:
+        """
+        Mesmas colunas de `list_rows`, como dicionários (formato das respostas dos serviços).
+        """
+        return [dict(row._mapping) for row in self._select_rows(filters)]
+
+    def list_columns(self, filters: Sequence = ()) -> dict:
+        """
+        Formato colunar {coluna: [valores]}: uma lista por coluna em vez de um objeto por linha.
+        """
+        return to_columns(self._select_rows(filters).all(), field_names(self.row_type))
+
+    def get_window(self, names: Sequence[str], start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   filters: Sequence = ()) -> dict:
+        """
+        Colunas `names` dos registros com `time_column` em [start, end), em ordem temporal
+        e no formato colunar. Sem limites, todo o histórico.
+        """
+        time_column = getattr(self.model, self.time_column)
+        conditions = list(filters)
+        if start is not None:
+            conditions.append(time_column >= start)
+        if end is not None:
+            conditions.append(time_column < end)
+        stmt = select(*(getattr(self.model, name) for name in names)).where(*conditions).order_by(*self.keyset_columns)
+        return to_columns(self.session.execute(stmt).all(), names)
+
+    def get_page(self, cursor: Optional[Tuple] = None, page_size: int = DEFAULT_PAGE_SIZE, filters: Sequence = ()) -> Page:
+        """
+        Busca uma página ordenada pelo keyset, a partir do cursor (exclusivo).
+        O custo de cada página independe de quantas páginas vieram antes.
+        """
+        columns = self.keyset_columns
+        stmt = select(self.model).where(*filters).order_by(*columns)
+        if cursor is not None:
+            stmt = stmt.where(keyset_after(columns, cursor))
+        items = self.session.execute(stmt.limit(page_size + 1)).scalars().all()
+        if len(items) <= page_size:
+            return Page(items, None)
+        items = items[:page_size]
+        return Page(items, tuple(getattr(items[-1], name) for name in self.keyset))
+
+    def iter_pages(self, page_size: int = DEFAULT_PAGE_SIZE, filters: Sequence = ()) -> Iterator[Page]:
+        cursor = None
+        while True:
+            page = self.get_page(cursor, page_size, filters)
+            yield page
+            if not page.has_more:
+                return
+            cursor = page.next_cursor
+
+    def stream_chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE, columns: Optional[Sequence] = None,
+                      filters: Sequence = ()) -> Iterator[List]:
+        """
+        Percorre a tabela inteira na ordem do keyset com cursor no servidor (`yield_per`),
+        em listas de até `chunk_size` objetos, ou de tuplas quando `columns` é informado.
+        """
+        stmt = select(*columns) if columns else select(self.model)
+        stmt = stmt.where(*filters).order_by(*self.keyset_columns).execution_options(yield_per=chunk_size)
+        result = self.session.execute(stmt)
+        if not columns:
+            result = result.scalars()
+        yield from result.partitions()
+
+    def stream_all(self, chunk_size: int = DEFAULT_CHUNK_SIZE, filters: Sequence = ()) -> Iterator:
+        """
+        Percorre a tabela inteira objeto a objeto, em memória constante.
+        """
+        for chunk in self.stream_chunks(chunk_size, filters=filters):
+            yield from chunk
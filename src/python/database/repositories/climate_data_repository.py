@@ -3,10 +3,14 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, Float
 from datetime import datetime, timezone
 from ..models import ClimateData
+from ..projections import ClimateDataRow
+from .base import BaseRepository
 
-class ClimateDataRepository:
-    def __init__(self, session: Session):
-        self.session = session
+class ClimateDataRepository(BaseRepository):
+    model = ClimateData
+    row_type = ClimateDataRow
+    keyset = ('timestamp', 'id')
+    time_column = 'timestamp'
 
     def create(self, temperature: float, air_humidity: float, rain_forecast: bool) -> ClimateData:
         data = ClimateData(
@@ -16,7 +20,7 @@ class ClimateDataRepository:
             timestamp=datetime.now(timezone.utc)
         )
         self.session.add(data)
-        self.session.commit()
+        self._commit()
         return data
 
     def get_by_id(self, id: str) -> Optional[ClimateData]:
@@ -31,14 +35,14 @@ class ClimateDataRepository:
             for key, value in kwargs.items():
                 if hasattr(data, key) and key != 'id':
                     setattr(data, key, value)
-            self.session.commit()
+            self._commit()
         return data
 
     def delete(self, id: str) -> bool:
         data = self.get_by_id(id)
         if data:
             self.session.delete(data)
-            self.session.commit()
+            self._commit()
             return True
         return False
 
@@ -3,15 +3,18 @@ from datetime import datetime, date, timezone
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from ..models import Component, SensorRecord, ClimateData, Producer, Crop, Application
+from ..projections import ComponentRow
+from .base import BaseRepository
 
-class ComponentRepository:
-    def __init__(self, session: Session):
-        self.session = session
+class ComponentRepository(BaseRepository):
+    model = Component
+    row_type = ComponentRow
+    keyset = ('id',)
 
     def create(self, name: str, type: str, crop_id: Optional[str] = None) -> Component:
         component = Component(name=name, type=type, crop_id=crop_id)
         self.session.add(component)
-        self.session.commit()
+        self._commit()
         return component
 
     def get_by_id(self, comp_id: str) -> Optional[Component]:
@@ -29,13 +32,13 @@ class ComponentRepository:
             for key, value in kwargs.items():
                 if hasattr(component, key):
                     setattr(component, key, value)
-            self.session.commit()
+            self._commit()
         return component
 
     def delete(self, comp_id: str) -> bool:
         component = self.get_by_id(comp_id)
         if component:
             self.session.delete(component)
-            self.session.commit()
+            self._commit()
             return True
         return False
\ No newline at end of file
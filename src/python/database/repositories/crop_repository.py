@@ -1,11 +1,15 @@
 from typing import List, Optional, Type
 from datetime import date
-from sqlalchemy.orm import Session
-from ..models import Crop
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+from ..models import Crop, Component, Application
+from ..projections import CropRow
+from .base import BaseRepository
 
-class CropRepository:
-    def __init__(self, session: Session):
-        self.session = session
+class CropRepository(BaseRepository):
+    model = Crop
+    row_type = CropRow
+    keyset = ('id',)
 
     def create(self, name: str, type: str, start_date: date, producer_id: str, end_date: Optional[date] = None) -> Crop:
         crop = Crop(
@@ -16,7 +20,7 @@ class CropRepository:
             producer_id=producer_id
         )
         self.session.add(crop)
-        self.session.commit()
+        self._commit()
         return crop
 
     def get_by_id(self, id: str) -> Optional[Crop]:
@@ -31,14 +35,14 @@ class CropRepository:
             for key, value in kwargs.items():
                 if hasattr(crop, key) and key != 'id':
                     setattr(crop, key, value)
-            self.session.commit()
+            self._commit()
         return crop
 
     def delete(self, id: str) -> bool:
         crop = self.get_by_id(id)
         if crop:
             self.session.delete(crop)
-            self.session.commit()
+            self._commit()
             return True
         return False
 
@@ -51,8 +55,30 @@ class CropRepository:
     def get_by_producer(self, producer_id: str) -> List[Type[Crop]]:
         return self.session.query(Crop).filter(Crop.producer_id == producer_id).all()
 
+    def get_with_details(self, id: str) -> Optional[Crop]:
+        """
+        Cultura com componentes e aplicações carregados antecipadamente (3 consultas,
+        sem lazy loads ao percorrer os relacionamentos).
+        """
+        return self.session.execute(
+            select(Crop)
+            .options(selectinload(Crop.components), selectinload(Crop.applications))
+            .where(Crop.id == id)
+        ).scalar_one_or_none()
+
+    def get_components(self, crop_id: str) -> List[Component]:
+        return self.session.query(Component).filter(Component.crop_id == crop_id).all()
+
+    def get_applications(self, crop_id: str) -> List[Application]:
+        return self.session.query(Application).filter(Application.crop_id == crop_id).all()
+
     def get_crops_with_applications(self) -> List[dict]:
-        crops = self.get_all()
+        # Aplicações de todas as culturas em uma única consulta extra (selectinload)
+        crops = self.session.execute(
+            select(Crop)
+            .options(selectinload(Crop.applications))
+            .where(Crop.applications.any())
+        ).scalars().all()
         return [
             {
                 'id': crop.id,
@@ -68,5 +94,5 @@ class CropRepository:
                         'timestamp': app.timestamp
                     } for app in crop.applications
                 ]
-            } for crop in crops if crop.applications
-        ]
\ No newline at end of file
+            } for crop in crops
+        ]
@@ -0,0 +1,47 @@
+from typing import Iterable, List, Optional
+from datetime import datetime
+from sqlalchemy import func, select
+from ..bulk import bulk_insert
+from ..models import IrrigationPrediction
+from ..projections import IrrigationPredictionRow
+from .base import BaseRepository
+
+
+class IrrigationPredictionRepository(BaseRepository):
+    model = IrrigationPrediction
+    row_type = IrrigationPredictionRow
+    keyset = ('predicted_at', 'id')
+    time_column = 'predicted_at'
+
+    def create_many(self, predictions: Iterable[dict]) -> int:
+        """
+        Grava um lote de predições com uma única operação em massa (`bulk_insert`) e um
+        único commit: uma execução do job fica inteira no banco, ou nenhuma parte dela.
+        """
+        rows = list(predictions)
+        if not rows:
+            return 0
+        bulk_insert(self.session, IrrigationPrediction, rows)
+        self._commit()
+        return len(rows)
+
+    def get_last_run_time(self) -> Optional[datetime]:
+        return self.session.execute(select(func.max(IrrigationPrediction.predicted_at))).scalar()
+
+    def get_last_run(self) -> List[IrrigationPredictionRow]:
+        """
+        Predições da execução mais recente do job (uma por sensor).
+        """
+        last_run = self.get_last_run_time()
+        if last_run is None:
+            return []
+        return self.list_rows([IrrigationPrediction.predicted_at == last_run])
+
+    def get_by_sensor(self, sensor_id: str, limit: int = 100) -> List[IrrigationPrediction]:
+        return (
+            self.session.query(IrrigationPrediction)
+            .filter(IrrigationPrediction.sensor_id == sensor_id)
+            .order_by(IrrigationPrediction.predicted_at.desc())
+            .limit(limit)
+            .all()
+        )
@@ -1,10 +1,14 @@
 from typing import List, Optional, Type
-from sqlalchemy.orm import Session
-from ..models import Producer
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+from ..models import Producer, Crop
+from ..projections import ProducerRow
+from .base import BaseRepository
 
-class ProducerRepository:
-    def __init__(self, session: Session):
-        self.session = session
+class ProducerRepository(BaseRepository):
+    model = Producer
+    row_type = ProducerRow
+    keyset = ('id',)
 
     def create(self, name: str, email: str, phone: str) -> Producer:
         producer = Producer(
@@ -13,7 +17,7 @@ class ProducerRepository:
             phone=phone
         )
         self.session.add(producer)
-        self.session.commit()
+        self._commit()
         return producer
 
     def get_by_id(self, id: str) -> Optional[Producer]:
@@ -28,14 +32,14 @@ class ProducerRepository:
             for key, value in kwargs.items():
                 if hasattr(producer, key) and key != 'id':
                     setattr(producer, key, value)
-            self.session.commit()
+            self._commit()
         return producer
 
     def delete(self, id: str) -> bool:
         producer = self.get_by_id(id)
         if producer:
             self.session.delete(producer)
-            self.session.commit()
+            self._commit()
             return True
         return False
 
@@ -49,15 +53,49 @@ class ProducerRepository:
         return self.session.query(Producer).filter(Producer.name.ilike(f"%{name}%")).all()
 
     def get_crops_by_producer(self, producer_id: str) -> List[dict]:
-        producer = self.get_by_id(producer_id)
-        if producer and producer.crops:
-            return [
-                {
-                    'id': crop.id,
-                    'name': crop.name,
-                    'type': crop.type,
-                    'start_date': crop.start_date,
-                    'end_date': crop.end_date
-                } for crop in producer.crops
-            ]
-        return []
+        # Consulta direta às culturas: sem carregar o produtor nem o relacionamento
+        rows = self.session.execute(
+            select(Crop.id, Crop.name, Crop.type, Crop.start_date, Crop.end_date)
+            .where(Crop.producer_id == producer_id)
+        ).all()
+        return [row._asdict() for row in rows]
+
+    def get_producer_tree(self, producer_id: Optional[str] = None) -> List[dict]:
+        """
+        Árvore produtor -> culturas -> componentes/aplicações em número constante de
+        consultas (produtores, culturas, componentes e aplicações: 4), independente
+        da quantidade de produtores e culturas.
+        """
+        crops = selectinload(Producer.crops)
+        stmt = select(Producer).options(
+            crops.selectinload(Crop.components),
+            crops.selectinload(Crop.applications)
+        ).order_by(Producer.name, Producer.id)
+        if producer_id is not None:
+            stmt = stmt.where(Producer.id == producer_id)
+        return [
+            {
+                'id': producer.id,
+                'name': producer.name,
+                'email': producer.email,
+                'phone': producer.phone,
+                'crops': [
+                    {
+                        'id': crop.id,
+                        'name': crop.name,
+                        'type': crop.type,
+                        'start_date': crop.start_date,
+                        'end_date': crop.end_date,
+                        'components': [component.to_dict() for component in crop.components],
+                        'applications': [
+                            {
+                                'id': app.id,
+                                'type': app.type,
+                                'quantity': app.quantity,
+                                'timestamp': app.timestamp
+                            } for app in crop.applications
+                        ]
+                    } for crop in producer.crops
+                ]
+            } for producer in self.session.execute(stmt).scalars()
+        ]
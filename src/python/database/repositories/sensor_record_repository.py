@@ -1,12 +1,27 @@
-from typing import List, Optional, Type
+import uuid
+from typing import Iterable, List, Optional, Type
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 from ..models import SensorRecord
+from ..bulk import bulk_insert
+from ..projections import SensorRecordRow
+from .base import BaseRepository
+from .sensor_state_repository import SensorStateRepository
+from .sensor_rollup_repository import SensorRollupRepository
 from sqlalchemy import func, Float
 
-class SensorRecordRepository:
-    def __init__(self, session: Session):
-        self.session = session
+class SensorRecordRepository(BaseRepository):
+    model = SensorRecord
+    row_type = SensorRecordRow
+    keyset = ('timestamp', 'id')
+    time_column = 'timestamp'
+
+    def __init__(self, session: Session, autocommit: bool = True):
+        super().__init__(session, autocommit)
+        # Estado atual dos sensores: atualizado na mesma transação de cada escrita
+        self.states = SensorStateRepository(session, autocommit=False)
+        # Agregações horárias/diárias: buckets já agregados são refeitos na mesma transação
+        self.rollups = SensorRollupRepository(session, autocommit=False)
 
     def create(self, sensor_id: str, soil_moisture: float, phosphorus_present: bool, potassium_present: bool, soil_ph: float, irrigation_status: str) -> SensorRecord:
         record = SensorRecord(
@@ -19,9 +34,39 @@ class SensorRecordRepository:
             timestamp=datetime.now(timezone.utc)
         )
         self.session.add(record)
-        self.session.commit()
+        self.session.flush()
+        self.states.apply([{column.key: getattr(record, column.key) for column in SensorRecord.__table__.columns}])
+        self._commit()
         return record
 
+    def create_many(self, readings: Iterable[dict]) -> int:
+        """
+        Insere um lote de leituras com uma única operação em massa (`bulk_insert`:
+        COPY no PostgreSQL, array binding no Oracle, executemany nos demais) e um único commit.
+        Cada leitura deve conter os mesmos campos aceitos por `create`; `id` e
+        `timestamp` são gerados quando ausentes. Retorna a quantidade de linhas inseridas.
+        """
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                'id': reading.get('id') or str(uuid.uuid4()),
+                'sensor_id': reading['sensor_id'],
+                'soil_moisture': reading['soil_moisture'],
+                'phosphorus_present': reading['phosphorus_present'],
+                'potassium_present': reading['potassium_present'],
+                'soil_ph': reading['soil_ph'],
+                'irrigation_status': reading.get('irrigation_status', 'DESLIGADA'),
+                'timestamp': reading.get('timestamp') or now
+            } for reading in readings
+        ]
+        if not rows:
+            return 0
+        bulk_insert(self.session, SensorRecord, rows)
+        self.states.apply(rows)
+        self.rollups.refresh_buckets((row['sensor_id'], row['timestamp']) for row in rows)
+        self._commit()
+        return len(rows)
+
     def get_by_id(self, id: str) -> Optional[SensorRecord]:
         return self.session.query(SensorRecord).filter(SensorRecord.id == id).first()
 
@@ -31,17 +76,23 @@ class SensorRecordRepository:
     def update(self, id: str, **kwargs) -> Optional[SensorRecord]:
         record = self.get_by_id(id)
         if record:
+            touched = [(record.sensor_id, record.timestamp)]
             for key, value in kwargs.items():
                 if hasattr(record, key) and key != 'id':
                     setattr(record, key, value)
-            self.session.commit()
+            touched.append((record.sensor_id, record.timestamp))
+            self.states.refresh({sensor_id for sensor_id, _ in touched})
+            self.rollups.refresh_buckets(touched)
+            self._commit()
         return record
 
     def delete(self, id: str) -> bool:
         record = self.get_by_id(id)
         if record:
             self.session.delete(record)
-            self.session.commit()
+            self.states.refresh([record.sensor_id])
+            self.rollups.refresh_buckets([(record.sensor_id, record.timestamp)])
+            self._commit()
             return True
         return False
 
@@ -55,9 +106,9 @@ class SensorRecordRepository:
         return self.session.query(SensorRecord).filter(SensorRecord.sensor_id == sensor_id).all()
 
     def get_latest_by_sensor(self, sensor_id: str) -> Optional[SensorRecord]:
-        return self.session.query(SensorRecord).filter(
-            SensorRecord.sensor_id == sensor_id
-        ).order_by(SensorRecord.timestamp.desc()).first()
+        # Busca pela chave no estado atual, sem ordenar o histórico do sensor
+        state = self.states.get(sensor_id)
+        return self.session.get(SensorRecord, state.record_id) if state else None
 
     def get_average_values_by_sensor(self, sensor_id: str, start_date: datetime = None, end_date: datetime = None) -> dict:
         query = self.session.query(
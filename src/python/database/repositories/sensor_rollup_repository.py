@@ -0,0 +1,358 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, date, timedelta, timezone
+from sqlalchemy import func, Float, select, case
+from ..models import SensorRecord, SensorRecordHourly, SensorRecordDaily, RollupWatermark
+from ..sql_functions import dialect_name, time_bucket
+from .base import BaseRepository
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+WATERMARK_NAME = 'sensor_records'
+ROLLUPS = {'hour': SensorRecordHourly, 'day': SensorRecordDaily}
+BUCKET_SIZES = {'hour': HOUR, 'day': DAY}
+STAT_FIELDS = (
+    'sample_count',
+    'soil_moisture_min', 'soil_moisture_max', 'soil_moisture_avg',
+    'soil_ph_min', 'soil_ph_max', 'soil_ph_avg',
+    'phosphorus_ratio', 'potassium_ratio', 'irrigation_on_ratio'
+)
+_AVG_FIELDS = ('soil_moisture_avg', 'soil_ph_avg', 'phosphorus_ratio', 'potassium_ratio', 'irrigation_on_ratio')
+_IN_LIST_LIMIT = 1000  # Limite de itens em uma cláusula IN no Oracle
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _floor(value: datetime, size: timedelta) -> datetime:
+    return datetime.min + ((value - datetime.min) // size) * size
+
+
+def _ceil(value: datetime, size: timedelta) -> datetime:
+    floor = _floor(value, size)
+    return floor if floor == value else floor + size
+
+
+def _as_datetime(value) -> datetime:
+    # SQLite devolve o bucket como texto; Oracle/PostgreSQL como datetime
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+def combine_stats(parts: Iterable[dict]) -> dict:
+    """
+    Combina agregados parciais: contagens somadas, mínimos/máximos e médias ponderadas.
+    """
+    parts = [part for part in parts if part and part.get('sample_count')]
+    total = sum(part['sample_count'] for part in parts)
+    if not total:
+        return {field: (0 if field == 'sample_count' else None) for field in STAT_FIELDS}
+    combined = {'sample_count': total}
+    for prefix in ('soil_moisture', 'soil_ph'):
+        combined[f'{prefix}_min'] = min(part[f'{prefix}_min'] for part in parts)
+        combined[f'{prefix}_max'] = max(part[f'{prefix}_max'] for part in parts)
+    for field in _AVG_FIELDS:
+        combined[field] = sum(part[field] * part['sample_count'] for part in parts) / total
+    return combined
+
+
+class SensorRollupRepository(BaseRepository):
+    """
+    Agregações horárias e diárias dos registros de sensores, atualizadas de forma
+    incremental a partir de uma marca d'água, e consultas que combinam a agregação
+    mais grossa possível com os dados brutos ainda não agregados.
+    """
+    model = SensorRecordHourly
+    keyset = ('bucket_start', 'sensor_id')
+
+    def get_watermark(self) -> Optional[datetime]:
+        watermark = self.session.get(RollupWatermark, WATERMARK_NAME)
+        return watermark.last_timestamp if watermark else None
+
+    def refresh(self, lag: timedelta = timedelta(minutes=5), now: Optional[datetime] = None) -> int:
+        """
+        Agrega os registros com timestamp entre a marca d'água e `now - lag` nas tabelas
+        horária e diária, mesclando com os buckets já existentes, e avança a marca d'água.
+        `lag` dá tempo para lotes ainda em trânsito chegarem ao banco.
+        Escritas posteriores com timestamp até a marca d'água (cargas retroativas, edições
+        e exclusões) são refletidas pelo `SensorRecordRepository` com `refresh_buckets`.
+        Retorna a quantidade de registros brutos agregados.
+        """
+        cutoff = _naive_utc(now or datetime.now(timezone.utc)) - lag
+        watermark = self.session.get(RollupWatermark, WATERMARK_NAME)
+        if watermark and cutoff <= watermark.last_timestamp:
+            return 0
+
+        filters = [SensorRecord.timestamp <= cutoff]
+        if watermark:
+            filters.append(SensorRecord.timestamp > watermark.last_timestamp)
+
+        processed = 0
+        dialect = dialect_name(self.session)
+        for unit, model in ROLLUPS.items():
+            bucket = time_bucket(SensorRecord.timestamp, unit, dialect).label('bucket_start')
+            rows = self.session.execute(
+                select(SensorRecord.sensor_id, bucket, *self._raw_stats())
+                .where(*filters)
+                .group_by(SensorRecord.sensor_id, bucket)
+            ).all()
+            self._merge(model, rows)
+            processed = sum(row.sample_count for row in rows)
+
+        if watermark:
+            watermark.last_timestamp = cutoff
+        else:
+            self.session.add(RollupWatermark(name=WATERMARK_NAME, last_timestamp=cutoff))
+        self._commit()
+        return processed
+
+    def rebuild(self, lag: timedelta = timedelta(minutes=5), now: Optional[datetime] = None) -> int:
+        """
+        Descarta as agregações e a marca d'água e reprocessa todo o histórico na mesma transação.
+        """
+        for model in ROLLUPS.values():
+            self.session.query(model).delete(synchronize_session=False)
+        self.session.query(RollupWatermark).filter(RollupWatermark.name == WATERMARK_NAME).delete(synchronize_session=False)
+        return self.refresh(lag, now)
+
+    def refresh_buckets(self, touched: Iterable[Tuple[str, datetime]]) -> int:
+        """
+        Reagrega, a partir dos registros brutos, os buckets horários e diários de cada par
+        (sensor_id, timestamp) escrito até a marca d'água, para que edições, exclusões e
+        cargas retroativas não deixem agregações desatualizadas. Pares posteriores à marca
+        d'água são ignorados (entram no próximo `refresh`). Não faz commit: deve ser chamado
+        na transação da escrita. Retorna a quantidade de buckets reagregados.
+        """
+        touched = [(sensor_id, _naive_utc(timestamp)) for sensor_id, timestamp in touched]
+        if not touched:
+            return 0
+        watermark = self.get_watermark()
+        if watermark is None:
+            return 0
+        touched = [(sensor_id, timestamp) for sensor_id, timestamp in touched
+                   if timestamp is not None and timestamp <= watermark]
+        if not touched:
+            return 0
+
+        refreshed = 0
+        dialect = dialect_name(self.session)
+        for unit, model in ROLLUPS.items():
+            size = BUCKET_SIZES[unit]
+            buckets: Dict[str, set] = {}
+            for sensor_id, timestamp in touched:
+                buckets.setdefault(sensor_id, set()).add(_floor(timestamp, size))
+            bucket = time_bucket(SensorRecord.timestamp, unit, dialect).label('bucket_start')
+            for sensor_id, starts in buckets.items():
+                first, last = min(starts), max(starts) + size
+                # Mesmo recorte do `refresh`: só os registros até a marca d'água
+                rows = self.session.execute(
+                    select(bucket, *self._raw_stats())
+                    .where(
+                        SensorRecord.sensor_id == sensor_id,
+                        SensorRecord.timestamp >= first,
+                        SensorRecord.timestamp < last,
+                        SensorRecord.timestamp <= watermark
+                    )
+                    .group_by(bucket)
+                ).all()
+                stats = {_as_datetime(row.bucket_start): {field: getattr(row, field) for field in STAT_FIELDS}
+                         for row in rows}
+                existing = {
+                    rollup.bucket_start: rollup
+                    for rollup in self.session.query(model).filter(
+                        model.sensor_id == sensor_id,
+                        model.bucket_start >= first,
+                        model.bucket_start < last
+                    )
+                }
+                for bucket_start in starts:
+                    rollup, new = existing.get(bucket_start), stats.get(bucket_start)
+                    if new is None:
+                        if rollup is not None:
+                            self.session.delete(rollup)
+                    elif rollup is None:
+                        self.session.add(model(sensor_id=sensor_id, bucket_start=bucket_start, **new))
+                    else:
+                        for field, value in new.items():
+                            setattr(rollup, field, value)
+                refreshed += len(starts)
+        return refreshed
+
+    def get_summary(self, sensor_id: str, start_date: datetime = None, end_date: datetime = None) -> dict:
+        """
+        Estatísticas do sensor no intervalo [start_date, end_date]. O intervalo é dividido
+        em trechos cobertos pela agregação diária, pela horária e pelos dados brutos
+        (bordas desalinhadas e dados posteriores à marca d'água), nessa ordem de preferência.
+        """
+        start_date, end_date = _naive_utc(start_date), _naive_utc(end_date)
+        watermark = self.get_watermark()
+        if watermark is None:
+            segments, tail_start = [], start_date
+        else:
+            limit = _floor(watermark if end_date is None else min(watermark, end_date), HOUR)
+            if start_date is not None and start_date >= limit:
+                segments, tail_start = [], start_date
+            else:
+                segments, tail_start = self._plan(start_date, limit), limit
+
+        parts = [self._segment_stats(sensor_id, source, begin, end) for source, begin, end in segments]
+        parts.append(self._raw_segment_stats(sensor_id, tail_start, end_date, inclusive_end=True))
+        return combine_stats(parts)
+
+    def get_series(self, sensor_id: str, start_date: datetime, end_date: datetime, resolution: timedelta) -> List[dict]:
+        """
+        Série agregada do sensor usando a agregação mais grossa que não ultrapassa
+        `resolution` (diária, horária ou registros brutos). Os buckets são alinhados
+        ao início do dia/hora; buckets posteriores à marca d'água vêm dos dados brutos.
+        """
+        start_date, end_date = _naive_utc(start_date), _naive_utc(end_date)
+        unit = 'day' if resolution >= DAY else 'hour' if resolution >= HOUR else None
+        if unit is None:
+            return [
+                {'bucket_start': record.timestamp, 'sample_count': 1,
+                 **self._record_stats(record)}
+                for record in self.session.query(SensorRecord).filter(
+                    SensorRecord.sensor_id == sensor_id,
+                    SensorRecord.timestamp.between(start_date, end_date)
+                ).order_by(SensorRecord.timestamp)
+            ]
+
+        model, size = ROLLUPS[unit], BUCKET_SIZES[unit]
+        watermark = self.get_watermark()
+        limit = _floor(min(watermark, end_date), size) if watermark else _floor(start_date, size)
+        series = [
+            {'bucket_start': row.bucket_start, **{field: getattr(row, field) for field in STAT_FIELDS}}
+            for row in self.session.query(model).filter(
+                model.sensor_id == sensor_id,
+                model.bucket_start >= _floor(start_date, size),
+                model.bucket_start < limit
+            ).order_by(model.bucket_start)
+        ]
+
+        bucket = time_bucket(SensorRecord.timestamp, unit, dialect_name(self.session)).label('bucket_start')
+        tail = self.session.execute(
+            select(bucket, *self._raw_stats())
+            .where(
+                SensorRecord.sensor_id == sensor_id,
+                SensorRecord.timestamp >= max(limit, start_date),
+                SensorRecord.timestamp <= end_date
+            )
+            .group_by(bucket)
+            .order_by(bucket)
+        ).all()
+        series.extend(
+            {**row._asdict(), 'bucket_start': _as_datetime(row.bucket_start)} for row in tail
+        )
+        return series
+
+    def _plan(self, start: Optional[datetime], limit: datetime) -> List[Tuple[str, Optional[datetime], datetime]]:
+        """
+        Divide [start, limit) em trechos ('raw' | 'hour' | 'day', início, fim).
+        `limit` deve estar alinhado à hora.
+        """
+        hour_start = _ceil(start, HOUR) if start is not None else None
+        if hour_start is not None and hour_start >= limit:
+            return [('raw', start, limit)]
+
+        segments = []
+        if start is not None and hour_start != start:
+            segments.append(('raw', start, hour_start))
+        day_start = _ceil(hour_start, DAY) if hour_start is not None else None
+        day_end = _floor(limit, DAY)
+        if day_start is None or day_start < day_end:
+            if hour_start is not None and hour_start != day_start:
+                segments.append(('hour', hour_start, day_start))
+            segments.append(('day', day_start, day_end))
+            if day_end != limit:
+                segments.append(('hour', day_end, limit))
+        else:
+            segments.append(('hour', hour_start, limit))
+        return segments
+
+    def _segment_stats(self, sensor_id: str, source: str, begin: Optional[datetime], end: datetime) -> dict:
+        if source == 'raw':
+            return self._raw_segment_stats(sensor_id, begin, end)
+        model = ROLLUPS[source]
+        total = func.sum(model.sample_count)
+        query = select(
+            total.label('sample_count'),
+            func.min(model.soil_moisture_min).label('soil_moisture_min'),
+            func.max(model.soil_moisture_max).label('soil_moisture_max'),
+            func.min(model.soil_ph_min).label('soil_ph_min'),
+            func.max(model.soil_ph_max).label('soil_ph_max'),
+            *[(func.sum(getattr(model, field) * model.sample_count) / total).label(field) for field in _AVG_FIELDS]
+        ).where(model.sensor_id == sensor_id, model.bucket_start < end)
+        if begin is not None:
+            query = query.where(model.bucket_start >= begin)
+        return self.session.execute(query).one()._asdict()
+
+    def _raw_segment_stats(self, sensor_id: str, begin: Optional[datetime], end: Optional[datetime],
+                           inclusive_end: bool = False) -> dict:
+        query = select(*self._raw_stats()).where(SensorRecord.sensor_id == sensor_id)
+        if begin is not None:
+            query = query.where(SensorRecord.timestamp >= begin)
+        if end is not None:
+            query = query.where(SensorRecord.timestamp <= end if inclusive_end else SensorRecord.timestamp < end)
+        return self.session.execute(query).one()._asdict()
+
+    @staticmethod
+    def _raw_stats() -> list:
+        return [
+            func.count(SensorRecord.id).label('sample_count'),
+            func.min(SensorRecord.soil_moisture).label('soil_moisture_min'),
+            func.max(SensorRecord.soil_moisture).label('soil_moisture_max'),
+            func.avg(SensorRecord.soil_moisture).label('soil_moisture_avg'),
+            func.min(SensorRecord.soil_ph).label('soil_ph_min'),
+            func.max(SensorRecord.soil_ph).label('soil_ph_max'),
+            func.avg(SensorRecord.soil_ph).label('soil_ph_avg'),
+            func.avg(SensorRecord.phosphorus_present.cast(Float)).label('phosphorus_ratio'),
+            func.avg(SensorRecord.potassium_present.cast(Float)).label('potassium_ratio'),
+            func.avg(case((SensorRecord.irrigation_status == "ATIVADA", 1.0), else_=0.0)).label('irrigation_on_ratio')
+        ]
+
+    @staticmethod
+    def _record_stats(record: SensorRecord) -> dict:
+        return {
+            'soil_moisture_min': record.soil_moisture,
+            'soil_moisture_max': record.soil_moisture,
+            'soil_moisture_avg': record.soil_moisture,
+            'soil_ph_min': record.soil_ph,
+            'soil_ph_max': record.soil_ph,
+            'soil_ph_avg': record.soil_ph,
+            'phosphorus_ratio': float(record.phosphorus_present),
+            'potassium_ratio': float(record.potassium_present),
+            'irrigation_on_ratio': 1.0 if record.irrigation_status == "ATIVADA" else 0.0
+        }
+
+    def _merge(self, model, rows):
+        """
+        Mescla os agregados novos com os buckets existentes (upsert portável entre dialetos).
+        """
+        if not rows:
+            return
+        new = {(row.sensor_id, _as_datetime(row.bucket_start)): {field: getattr(row, field) for field in STAT_FIELDS}
+               for row in rows}
+        first_bucket = min(bucket for _, bucket in new)
+        sensor_ids = sorted({sensor_id for sensor_id, _ in new})
+
+        existing: Dict[Tuple[str, datetime], object] = {}
+        for offset in range(0, len(sensor_ids), _IN_LIST_LIMIT):
+            for rollup in self.session.query(model).filter(
+                model.sensor_id.in_(sensor_ids[offset:offset + _IN_LIST_LIMIT]),
+                model.bucket_start >= first_bucket
+            ):
+                existing[(rollup.sensor_id, rollup.bucket_start)] = rollup
+
+        for (sensor_id, bucket_start), stats in new.items():
+            rollup = existing.get((sensor_id, bucket_start))
+            if rollup is None:
+                self.session.add(model(sensor_id=sensor_id, bucket_start=bucket_start, **stats))
+            else:
+                merged = combine_stats([{field: getattr(rollup, field) for field in STAT_FIELDS}, stats])
+                for field, value in merged.items():
+                    setattr(rollup, field, value)
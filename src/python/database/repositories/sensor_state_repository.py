@@ -0,0 +1,176 @@
+from typing import Dict, Iterable, List, Optional
+from datetime import datetime
+from sqlalchemy import func, select, case, Float
+from sqlalchemy.dialects import postgresql, sqlite
+from ..models import SensorLatestState, SensorRecord, Component, Crop
+from ..projections import SensorStateRow, field_names
+from ..sql_functions import dialect_name
+from .base import BaseRepository
+
+STATE_FIELDS = tuple(name for name in field_names(SensorStateRow) if name not in ('sensor_id', 'record_id'))
+_IN_LIST_LIMIT = 1000  # Limite de itens em uma cláusula IN no Oracle
+
+
+def _naive(value: datetime) -> datetime:
+    # Mesmo valor gravado na coluna DateTime (sem fuso), para comparar em Python
+    return value.replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+def newest_by_sensor(readings: Iterable[dict]) -> Dict[str, dict]:
+    """
+    Leitura mais recente de cada sensor em um lote, no formato de linha do estado.
+    """
+    newest: Dict[str, dict] = {}
+    for reading in readings:
+        state = {
+            'sensor_id': reading['sensor_id'],
+            'record_id': reading['id'],
+            'timestamp': _naive(reading['timestamp']),
+            **{field: reading[field] for field in STATE_FIELDS if field != 'timestamp'}
+        }
+        current = newest.get(state['sensor_id'])
+        if current is None or state['timestamp'] >= current['timestamp']:
+            newest[state['sensor_id']] = state
+    return newest
+
+
+class SensorStateRepository(BaseRepository):
+    """
+    Estado atual (leitura mais recente) de cada sensor. Atualizado pelo
+    `SensorRecordRepository` na mesma transação das inserções, alterações e exclusões.
+    """
+    model = SensorLatestState
+    row_type = SensorStateRow
+    keyset = ('sensor_id',)
+
+    def apply(self, readings: Iterable[dict]) -> int:
+        """
+        Registra as leituras novas: o estado de cada sensor só é substituído por uma
+        leitura com timestamp igual ou posterior ao atual. Não faz commit.
+        """
+        states = list(newest_by_sensor(readings).values())
+        if not states:
+            return 0
+        dialect = dialect_name(self.session)
+        if dialect in ('postgresql', 'sqlite'):
+            self._upsert(dialect, states)
+        else:
+            self._merge(states)
+        return len(states)
+
+    def refresh(self, sensor_ids: Iterable[str]):
+        """
+        Recalcula o estado dos sensores a partir do histórico (após alterar ou excluir
+        leituras), usando o índice (sensor_id, timestamp desc). Não faz commit.
+        """
+        self.session.flush()
+        for sensor_id in set(sensor_ids):
+            record = self.session.execute(
+                select(SensorRecord).where(SensorRecord.sensor_id == sensor_id)
+                .order_by(SensorRecord.timestamp.desc()).limit(1)
+            ).scalar_one_or_none()
+            state = self.session.get(SensorLatestState, sensor_id)
+            if record is None:
+                if state is not None:
+                    self.session.delete(state)
+                continue
+            values = {'record_id': record.id, **{field: getattr(record, field) for field in STATE_FIELDS}}
+            values['timestamp'] = _naive(values['timestamp'])
+            if state is None:
+                self.session.add(SensorLatestState(sensor_id=sensor_id, **values))
+            else:
+                for field, value in values.items():
+                    setattr(state, field, value)
+        self.session.flush()
+
+    def rebuild(self) -> int:
+        """
+        Reconstrói a tabela inteira a partir do histórico (carga inicial em bancos existentes).
+        """
+        self.session.query(SensorLatestState).delete()
+        latest = select(
+            SensorRecord.sensor_id,
+            func.max(SensorRecord.timestamp).label('timestamp')
+        ).group_by(SensorRecord.sensor_id).subquery()
+        records = self.session.execute(
+            select(*(getattr(SensorRecord, name) for name in ('id', 'sensor_id') + STATE_FIELDS)).join(
+                latest,
+                (SensorRecord.sensor_id == latest.c.sensor_id) & (SensorRecord.timestamp == latest.c.timestamp)
+            )
+        ).mappings().all()
+        count = self.apply(records)
+        self._commit()
+        return count
+
+    def get(self, sensor_id: str) -> Optional[SensorLatestState]:
+        return self.session.get(SensorLatestState, sensor_id)
+
+    def get_latest(self) -> Optional[SensorLatestState]:
+        """
+        Leitura mais recente entre todos os sensores (uma linha por sensor, não o histórico).
+        """
+        return self.session.query(SensorLatestState).order_by(SensorLatestState.timestamp.desc()).first()
+
+    def get_all_states(self) -> List[dict]:
+        """
+        Estado atual de todos os sensores, com o nome do sensor e a cultura.
+        """
+        stmt = select(
+            *(getattr(SensorLatestState, name) for name in field_names(SensorStateRow)),
+            Component.name.label('sensor_name'),
+            Component.crop_id
+        ).join(Component, Component.id == SensorLatestState.sensor_id).order_by(SensorLatestState.sensor_id)
+        return [dict(row) for row in self.session.execute(stmt).mappings()]
+
+    def get_crop_states(self) -> List[dict]:
+        """
+        Estado atual de cada cultura, agregando o estado dos seus sensores: médias de
+        umidade e pH, sensores com irrigação ativada e a leitura mais recente.
+        """
+        stmt = select(
+            Crop.id.label('crop_id'),
+            Crop.name.label('crop_name'),
+            func.count(SensorLatestState.sensor_id).label('sensor_count'),
+            func.avg(SensorLatestState.soil_moisture).label('soil_moisture_avg'),
+            func.avg(SensorLatestState.soil_ph).label('soil_ph_avg'),
+            func.min(SensorLatestState.soil_moisture).label('soil_moisture_min'),
+            func.avg(SensorLatestState.phosphorus_present.cast(Float)).label('phosphorus_ratio'),
+            func.avg(SensorLatestState.potassium_present.cast(Float)).label('potassium_ratio'),
+            func.sum(case((SensorLatestState.irrigation_status == "ATIVADA", 1), else_=0)).label('irrigating_sensors'),
+            func.max(SensorLatestState.timestamp).label('last_reading')
+        ).join(Component, Component.id == SensorLatestState.sensor_id).join(
+            Crop, Crop.id == Component.crop_id
+        ).group_by(Crop.id, Crop.name).order_by(Crop.name)
+        return [dict(row) for row in self.session.execute(stmt).mappings()]
+
+    def _upsert(self, dialect: str, states: List[dict]):
+        # INSERT ... ON CONFLICT DO UPDATE ... WHERE: a comparação acontece no banco, sob o lock da linha
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = insert(SensorLatestState)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SensorLatestState.sensor_id],
+            set_={name: stmt.excluded[name] for name in ('record_id',) + STATE_FIELDS},
+            where=stmt.excluded.timestamp >= SensorLatestState.timestamp
+        )
+        self.session.execute(stmt, states)
+
+    def _merge(self, states: List[dict]):
+        """
+        Upsert portável (ex.: Oracle): bloqueia as linhas existentes com FOR UPDATE e
+        compara os timestamps em Python.
+        """
+        by_sensor = {state['sensor_id']: state for state in states}
+        sensor_ids = sorted(by_sensor)
+        existing: Dict[str, SensorLatestState] = {}
+        for offset in range(0, len(sensor_ids), _IN_LIST_LIMIT):
+            for state in self.session.query(SensorLatestState).filter(
+                SensorLatestState.sensor_id.in_(sensor_ids[offset:offset + _IN_LIST_LIMIT])
+            ).with_for_update():
+                existing[state.sensor_id] = state
+        for sensor_id, values in by_sensor.items():
+            state = existing.get(sensor_id)
+            if state is None:
+                self.session.add(SensorLatestState(**values))
+            elif values['timestamp'] >= state.timestamp:
+                for field, value in values.items():
+                    setattr(state, field, value)
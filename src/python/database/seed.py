@@ -1,4 +1,4 @@
-from database.oracle import db
+from database.connection import db
 from database.models import Component, SensorRecord, ClimateData, Application, Producer, Crop
 from datetime import datetime, timezone, timedelta
 import uuid
@@ -1,5 +1,5 @@
 from database.models import Base
-from database.oracle import db
+from database.connection import db
 
 import logging
 
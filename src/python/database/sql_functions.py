@@ -0,0 +1,45 @@
+"""
+Funções SQL dependentes do dialeto, usadas pelas consultas agregadas dos repositórios.
+"""
+from sqlalchemy import func, literal_column
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+BUCKET_UNITS = ('hour', 'day', 'week', 'month')
+
+_ORACLE_FORMATS = {'hour': 'HH24', 'day': 'DD', 'week': 'IW', 'month': 'MM'}
+_SQLITE_FORMATS = {'hour': '%Y-%m-%d %H:00:00', 'day': '%Y-%m-%d 00:00:00', 'month': '%Y-%m-01 00:00:00'}
+
+
+def _literal(value: str) -> ColumnElement:
+    return literal_column(f"'{value}'")
+
+
+def dialect_name(session: Session) -> str:
+    return session.get_bind().dialect.name
+
+
+def ping_statement(dialect: str) -> str:
+    """
+    Consulta mínima para testar a conexão (o Oracle exige a tabela DUAL).
+    """
+    return "SELECT 1 FROM DUAL" if dialect == 'oracle' else "SELECT 1"
+
+
+def time_bucket(column: ColumnElement, unit: str, dialect: str) -> ColumnElement:
+    """
+    Trunca um timestamp para o início do intervalo (`hour`, `day`, `week` ou `month`).
+    Semanas começam na segunda-feira. Os formatos são renderizados como literais para
+    que a expressão no SELECT e no GROUP BY seja idêntica.
+    """
+    if unit not in BUCKET_UNITS:
+        raise ValueError(f"Intervalo inválido: {unit}. Use um de {', '.join(BUCKET_UNITS)}")
+    if dialect == 'oracle':
+        return func.trunc(column, _literal(_ORACLE_FORMATS[unit]))
+    if dialect == 'postgresql':
+        return func.date_trunc(_literal(unit), column)
+    if dialect == 'sqlite':
+        if unit == 'week':
+            return func.strftime(_literal('%Y-%m-%d 00:00:00'), column, _literal('weekday 0'), _literal('-6 days'))
+        return func.strftime(_literal(_SQLITE_FORMATS[unit]), column)
+    raise ValueError(f"Dialeto não suportado para agregação temporal: {dialect}")
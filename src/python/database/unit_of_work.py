@@ -0,0 +1,85 @@
+"""
+Unidade de trabalho: repositórios que compartilham uma única transação, confirmada
+uma vez ao final do bloco (ou desfeita se ocorrer uma exceção).
+
+    with unit_of_work() as uow:
+        record = uow.sensor_records.update(record_id, soil_moisture=25.0)
+        uow.applications.create(crop_id=crop_id, type="Irrigação", quantity=10.0)
+    # um único commit aqui
+"""
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from sqlalchemy.orm import Session
+
+from .connection import session_factory, get_engine
+from .repositories import (
+    ProducerRepository,
+    CropRepository,
+    ComponentRepository,
+    SensorRecordRepository,
+    ApplicationRepository,
+    ClimateDataRepository,
+    SensorRollupRepository,
+    SensorStateRepository,
+    IrrigationPredictionRepository
+)
+
+
+class UnitOfWork:
+    """
+    Expõe os repositórios sobre a mesma sessão, sem commit por operação.
+    Os repositórios são criados no primeiro acesso.
+    """
+    _repositories = {
+        'producers': ProducerRepository,
+        'crops': CropRepository,
+        'components': ComponentRepository,
+        'sensor_records': SensorRecordRepository,
+        'applications': ApplicationRepository,
+        'climate_data': ClimateDataRepository,
+        'sensor_rollups': SensorRollupRepository,
+        'sensor_states': SensorStateRepository,
+        'irrigation_predictions': IrrigationPredictionRepository
+    }
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def __getattr__(self, name):
+        repository_class = self._repositories.get(name)
+        if repository_class is None:
+            raise AttributeError(f"{type(self).__name__!r} não possui o repositório {name!r}")
+        repository = repository_class(self.session, autocommit=False)
+        setattr(self, name, repository)
+        return repository
+
+    def flush(self):
+        self.session.flush()
+
+    def commit(self):
+        self.session.commit()
+
+    def rollback(self):
+        self.session.rollback()
+
+
+@contextmanager
+def unit_of_work(session: Optional[Session] = None) -> Iterator[UnitOfWork]:
+    """
+    Abre uma unidade de trabalho. Sem `session`, usa uma sessão nova, fechada ao final;
+    com `session` (ex.: a sessão de um serviço), usa-a sem fechá-la.
+    """
+    owns_session = session is None
+    if owns_session:
+        session = session_factory(bind=get_engine())
+    uow = UnitOfWork(session)
+    try:
+        yield uow
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        if owns_session:
+            session.close()
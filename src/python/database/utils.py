@@ -1,6 +1,6 @@
-from sqlalchemy.schema import CreateTable
+from sqlalchemy.schema import CreateTable, CreateIndex
 from database.models import Base, Component, SensorRecord, ClimateData
-from database.oracle import db
+from database.connection import db
 import os
 
 
@@ -16,6 +16,8 @@ def generate_ddl(output_dir="generated"):
         for table in Base.metadata.sorted_tables:
             ddl_statement = str(CreateTable(table).compile(db.engine))
             file.write(f"{ddl_statement};\n\n")
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                file.write(f"{CreateIndex(index).compile(db.engine)};\n\n")
 
     print(f"Arquivo DDL gerado em: {ddl_path}")
 
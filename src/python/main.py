@@ -1,6 +1,7 @@
 """
 Ponto de entrada principal da aplicação.
 """
+import startup_timing
 import logging.config
 
 from dotenv import load_dotenv
@@ -9,6 +10,8 @@ import time
 from database.seed import run_seed
 from database.setup import reset_database, drop_all_tables
 
+startup_timing.mark('imports')
+
 # Configura logging
 logger = logging.getLogger(__name__)
 
@@ -27,6 +30,7 @@ def main():
         reset_database()
         run_seed()
         logger.info("✅ Banco de dados inicializado com sucesso. Seeds carregadas")
+        startup_timing.report('main')
     except Exception as e:
         logger.error(f"Erro ao criar tabelas: {str(e)}")
         return
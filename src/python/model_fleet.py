@@ -0,0 +1,241 @@
+"""
+Frota de modelos de irrigação: um modelo por tipo de cultura (`Crop.type`) ou por cultura
+(`Crop.id`), cada um com o próprio registro versionado em
+`<MODEL_REGISTRY_DIR>/fleet/<segmento>/<valor>/`.
+
+- `train_fleet` treina os modelos em paralelo, um processo por segmento;
+- `ModelFleet` roteia cada predição (ou cada grupo de linhas de um lote) para o modelo do
+  segmento. Os modelos são carregados no primeiro uso e no máximo `max_loaded` ficam em
+  memória (LRU). Segmentos sem modelo usam o modelo global (`get_predictor`).
+
+Configuração: `MODEL_FLEET_MAX_LOADED` (padrão: 8).
+
+Uso (na pasta src/python):
+    python model_fleet.py                     # um modelo por tipo de cultura
+    python model_fleet.py --by crop --workers 4
+    python model_fleet.py --segment Grão      # só os segmentos informados
+"""
+import argparse
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from database import Component, Crop, SensorRecord
+from database.connection import get_session, close_session, reset_after_fork
+from model_registry import DEFAULT_REGISTRY_DIR, ModelRegistry
+from prediction_model import IrrigationPredictor, get_predictor
+from training_data import FEATURES
+
+logger = logging.getLogger(__name__)
+
+# Coluna que define o segmento de cada leitura (pelo sensor e a cultura dele)
+SEGMENTS = {
+    'crop_type': Crop.type,
+    'crop': Crop.id
+}
+DEFAULT_SEGMENT = 'crop_type'
+DEFAULT_MAX_LOADED = int(os.getenv('MODEL_FLEET_MAX_LOADED', '8'))
+# Segmentos com menos leituras não ganham modelo próprio (usam o global)
+MIN_SEGMENT_ROWS = 50
+
+
+def segment_registry(by: str, value, registry_root: Optional[str] = None) -> ModelRegistry:
+    key = re.sub(r'[^\w.-]+', '_', str(value)).strip('_') or '_'
+    return ModelRegistry(os.path.join(registry_root or DEFAULT_REGISTRY_DIR, 'fleet', by, key))
+
+
+def segment_filter(by: str, value):
+    """
+    Condição sobre SensorRecord: leituras dos sensores das culturas do segmento.
+    """
+    sensors = select(Component.id).join(Crop, Crop.id == Component.crop_id).where(SEGMENTS[by] == value)
+    return SensorRecord.sensor_id.in_(sensors)
+
+
+def list_segments(session: Session, by: str = DEFAULT_SEGMENT) -> Dict[str, int]:
+    """
+    Segmentos com leituras e a quantidade de leituras de cada um.
+    """
+    column = SEGMENTS[by]
+    stmt = (
+        select(column, func.count(SensorRecord.id))
+        .join(Component, Component.id == SensorRecord.sensor_id)
+        .join(Crop, Crop.id == Component.crop_id)
+        .group_by(column)
+    )
+    return {value: count for value, count in session.execute(stmt)}
+
+
+def sensor_segments(session: Session, by: str = DEFAULT_SEGMENT) -> Dict[str, str]:
+    """
+    Segmento de cada sensor associado a uma cultura.
+    """
+    stmt = select(Component.id, SEGMENTS[by]).join(Crop, Crop.id == Component.crop_id)
+    return {sensor_id: value for sensor_id, value in session.execute(stmt)}
+
+
+def _train_segment(by: str, value, registry_root: Optional[str], chunk_size: Optional[int],
+                   params: Optional[dict]):
+    # Executa em um processo do pool, com sessão própria
+    try:
+        predictor = IrrigationPredictor(segment_registry(by, value, registry_root))
+        return value, predictor.train(chunk_size, params=params, filters=[segment_filter(by, value)])
+    finally:
+        close_session()
+
+
+def train_fleet(by: str = DEFAULT_SEGMENT, segments: Optional[Iterable] = None, workers: Optional[int] = None,
+                chunk_size: Optional[int] = None, params: Optional[dict] = None,
+                registry_root: Optional[str] = None, min_rows: int = MIN_SEGMENT_ROWS) -> Dict[str, bool]:
+    """
+    Treina um modelo por segmento (todos com leituras suficientes, ou só os de `segments`),
+    em até `workers` processos. Retorna o resultado do treino de cada segmento.
+    """
+    try:
+        counts = list_segments(get_session(), by)
+    finally:
+        # Sem conexão aberta no processo pai durante o fork
+        close_session()
+    wanted = set(segments) if segments is not None else set(counts)
+    selected = sorted(value for value in wanted if counts.get(value, 0) >= min_rows)
+    for value in sorted(wanted - set(selected), key=str):
+        logger.info(f"Segmento {value!r} com {counts.get(value, 0)} leituras: usa o modelo global")
+    if not selected:
+        return {}
+
+    workers = min(workers or os.cpu_count() or 1, len(selected))
+    logger.info(f"Treinando {len(selected)} modelos ({by}) em {workers} processos")
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=reset_after_fork) as pool:
+        futures = [
+            pool.submit(_train_segment, by, value, registry_root, chunk_size, params)
+            for value in selected
+        ]
+        for future in as_completed(futures):
+            value, success = future.result()
+            results[value] = success
+            logger.info(f"Modelo do segmento {value!r}: {'treinado' if success else 'falhou'}")
+    return results
+
+
+class ModelFleet:
+    """
+    Roteador de predições por segmento, com os modelos carregados sob demanda e no máximo
+    `max_loaded` em memória (o menos usado recentemente é descartado). Uma versão nova
+    ativada no registro de um segmento é carregada na predição seguinte.
+    """
+    def __init__(self, by: str = DEFAULT_SEGMENT, registry_root: Optional[str] = None,
+                 max_loaded: int = DEFAULT_MAX_LOADED, fallback: Optional[IrrigationPredictor] = None):
+        if by not in SEGMENTS:
+            raise ValueError(f"Segmento inválido: {by}")
+        self.by = by
+        self.registry_root = registry_root
+        self.max_loaded = max_loaded
+        self.loads = 0
+        self._fallback = fallback
+        self._loaded: 'OrderedDict[str, IrrigationPredictor]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def fallback(self) -> IrrigationPredictor:
+        return self._fallback or get_predictor(self.registry_root)
+
+    def loaded_segments(self) -> list:
+        with self._lock:
+            return list(self._loaded)
+
+    def predictor_for(self, segment) -> IrrigationPredictor:
+        if segment is None:
+            return self.fallback
+        registry = segment_registry(self.by, segment, self.registry_root)
+        active = registry.active_version()
+        if active is None:
+            return self.fallback
+        with self._lock:
+            predictor = self._loaded.get(segment)
+            if predictor is None or predictor.version != active:
+                predictor = IrrigationPredictor(registry)
+                if not predictor.load_model(active):
+                    return self.fallback
+                self.loads += 1
+                self._loaded[segment] = predictor
+            self._loaded.move_to_end(segment)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+            return predictor
+
+    def predict(self, segment, soil_moisture, phosphorus_present, potassium_present, soil_ph,
+                temperature, air_humidity, rain_forecast):
+        return self.predictor_for(segment).predict(
+            soil_moisture, phosphorus_present, potassium_present, soil_ph,
+            temperature, air_humidity, rain_forecast
+        )
+
+    def predict_batch(self, segments: Sequence, data):
+        """
+        Como `IrrigationPredictor.predict_batch`, com o segmento de cada linha em `segments`:
+        as linhas de um mesmo segmento são avaliadas juntas, em uma chamada ao modelo dele.
+        """
+        if isinstance(data, pd.DataFrame):
+            data = data[FEATURES]
+        data = np.asarray(data, dtype=float)
+        if len(segments) != len(data):
+            raise ValueError("É esperado um segmento por linha")
+        groups: Dict[object, list] = {}
+        for row, segment in enumerate(segments):
+            groups.setdefault(segment, []).append(row)
+
+        should_irrigate = np.zeros(len(data), dtype=bool)
+        confidence = np.zeros(len(data))
+        for segment, rows in groups.items():
+            result = self.predictor_for(segment).predict_batch(data[rows])
+            if result is None:
+                return None
+            should_irrigate[rows], confidence[rows] = result
+        return should_irrigate, confidence
+
+
+_fleets: Dict[tuple, ModelFleet] = {}
+_fleets_lock = threading.Lock()
+
+
+def get_fleet(by: str = DEFAULT_SEGMENT, registry_root: Optional[str] = None) -> ModelFleet:
+    """
+    Frota compartilhada pelo processo (como `get_predictor`).
+    """
+    with _fleets_lock:
+        key = (by, os.path.abspath(registry_root or DEFAULT_REGISTRY_DIR))
+        fleet = _fleets.get(key)
+        if fleet is None:
+            fleet = _fleets[key] = ModelFleet(by, registry_root)
+        return fleet
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--by', choices=sorted(SEGMENTS), default=DEFAULT_SEGMENT, help='Segmentação dos modelos')
+    parser.add_argument('--segment', action='append', default=None,
+                        help='Treina só este segmento (pode ser repetido)')
+    parser.add_argument('--workers', type=int, default=None, help='Processos (padrão: todos os núcleos)')
+    parser.add_argument('--chunk-size', type=int, default=None, help='Leituras por bloco na leitura do histórico')
+    args = parser.parse_args()
+
+    results = train_fleet(args.by, args.segment, args.workers, args.chunk_size)
+    for value, success in sorted(results.items(), key=lambda item: str(item[0])):
+        print(f"{value}: {'treinado' if success else 'falhou'}")
+    if not results:
+        print("Nenhum segmento com dados suficientes")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,186 @@
+"""
+Registro versionado dos modelos de irrigação.
+
+Cada treino gera uma versão em `<raiz>/<versão>/`:
+- `model.joblib`: o par (modelo, scaler), salvo com joblib sem compressão, para que os
+  arrays numpy grandes sejam carregados com memory-map (`mmap_mode='r'`): a carga lê só o
+  necessário e as páginas do arquivo são compartilhadas entre os processos;
+- `metadata.json`: marca d'água dos dados de treino, métricas, lista de features e versões
+  das bibliotecas.
+
+O arquivo `ACTIVE` aponta a versão em uso. Ativar outra versão (ou voltar à anterior com
+`rollback`) só reescreve esse arquivo; os preditores compartilhados (`get_predictor`)
+carregam a nova versão na próxima predição.
+
+Configuração: `MODEL_REGISTRY_DIR` (padrão: `models`).
+
+Uso (na pasta src/python):
+    python -m model_registry list              # versões registradas
+    python -m model_registry activate <versão>
+    python -m model_registry rollback          # volta à versão anterior à ativa
+"""
+import argparse
+import json
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Tuple
+
+import joblib
+import sklearn
+
+from training_data import FEATURES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REGISTRY_DIR = os.getenv('MODEL_REGISTRY_DIR', 'models')
+ARTIFACT_FILE = 'model.joblib'
+METADATA_FILE = 'metadata.json'
+ACTIVE_FILE = 'ACTIVE'
+
+
+class ModelRegistry:
+    """
+    Versões de modelo em um diretório. As escritas são atômicas (diretório ou arquivo
+    temporário renomeado), então um leitor nunca vê uma versão pela metade.
+    """
+    def __init__(self, root: Optional[str] = None):
+        self.root = os.path.abspath(root or DEFAULT_REGISTRY_DIR)
+
+    def _path(self, *parts) -> str:
+        return os.path.join(self.root, *parts)
+
+    def save(self, model, scaler, metrics: Optional[dict] = None, watermark: Optional[datetime] = None,
+             features: Sequence[str] = FEATURES, activate: bool = True, mode: str = 'full',
+             parent: Optional[str] = None) -> str:
+        """
+        Registra uma nova versão e, com `activate`, passa a usá-la. Retorna a versão.
+        `mode` e `parent` descrevem a origem (treino completo ou incremental sobre `parent`).
+        """
+        os.makedirs(self.root, exist_ok=True)
+        created_at = datetime.now(timezone.utc)
+        version = created_at.strftime('%Y%m%dT%H%M%S%fZ')
+        metadata = {
+            'version': version,
+            'created_at': created_at.isoformat(),
+            'watermark': watermark.isoformat() if watermark is not None else None,
+            'mode': mode,
+            'parent': parent,
+            'features': list(features),
+            'metrics': metrics or {},
+            'sklearn_version': sklearn.__version__,
+            'joblib_version': joblib.__version__
+        }
+        staging = tempfile.mkdtemp(prefix=f'.{version}-', dir=self.root)
+        try:
+            joblib.dump((model, scaler), os.path.join(staging, ARTIFACT_FILE))
+            with open(os.path.join(staging, METADATA_FILE), 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, indent=2, default=str)
+            os.replace(staging, self._path(version))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        logger.info(f"Modelo registrado: versão {version}")
+        if activate:
+            self.activate(version)
+        return version
+
+    def import_pickle(self, path: str, activate: bool = True) -> str:
+        """
+        Registra um modelo salvo no formato antigo (pickle de (modelo, scaler)).
+        """
+        with open(path, 'rb') as f:
+            model, scaler = pickle.load(f)
+        return self.save(model, scaler, metrics={'imported_from': os.path.basename(path)}, activate=activate,
+                         mode='imported')
+
+    def versions(self) -> List[str]:
+        """
+        Versões registradas, da mais antiga para a mais recente.
+        """
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if not name.startswith('.') and os.path.isfile(self._path(name, METADATA_FILE))
+        )
+
+    def metadata(self, version: str) -> dict:
+        with open(self._path(version, METADATA_FILE), encoding='utf-8') as f:
+            return json.load(f)
+
+    def active_version(self) -> Optional[str]:
+        try:
+            with open(self._path(ACTIVE_FILE), encoding='utf-8') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def activate(self, version: str):
+        if version not in self.versions():
+            raise ValueError(f"Versão de modelo não encontrada: {version}")
+        fd, temporary = tempfile.mkstemp(prefix='.active-', dir=self.root)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(version)
+        os.replace(temporary, self._path(ACTIVE_FILE))
+        logger.info(f"Versão de modelo ativa: {version}")
+
+    def rollback(self) -> str:
+        """
+        Ativa a versão anterior à ativa. Retorna a versão ativada.
+        """
+        versions = self.versions()
+        active = self.active_version()
+        position = versions.index(active) if active in versions else len(versions)
+        if position == 0:
+            raise ValueError("Não há versão anterior à ativa")
+        self.activate(versions[position - 1])
+        return versions[position - 1]
+
+    def load(self, version: Optional[str] = None, mmap: bool = True) -> Tuple[object, object, dict]:
+        """
+        Carrega (modelo, scaler, metadados) da versão informada ou da ativa. Com `mmap`, os
+        arrays numpy do artefato são mapeados do arquivo (somente leitura) em vez de copiados.
+        """
+        version = version or self.active_version()
+        if version is None:
+            raise FileNotFoundError(f"Nenhuma versão de modelo ativa em {self.root}")
+        model, scaler = joblib.load(self._path(version, ARTIFACT_FILE), mmap_mode='r' if mmap else None)
+        return model, scaler, self.metadata(version)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['list', 'activate', 'rollback'])
+    parser.add_argument('version', nargs='?', help='Versão a ativar (comando activate)')
+    parser.add_argument('--root', default=None, help='Diretório do registro (padrão: MODEL_REGISTRY_DIR)')
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.root)
+    if args.command == 'list':
+        active = registry.active_version()
+        for version in registry.versions():
+            metadata = registry.metadata(version)
+            accuracy = metadata['metrics'].get('accuracy')
+            print(f"{'*' if version == active else ' '} {version}  "
+                  f"acurácia={accuracy if accuracy is not None else '-'}  dados até {metadata['watermark'] or '-'}  "
+                  f"({metadata.get('mode', 'full')})")
+        return
+    try:
+        if args.command == 'activate':
+            if not args.version:
+                parser.error("informe a versão a ativar")
+            registry.activate(args.version)
+            print(f"Versão ativa: {args.version}")
+        else:
+            print(f"Versão ativa: {registry.rollback()}")
+    except ValueError as e:
+        parser.exit(1, f"{e}\n")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -1,153 +1,290 @@
 """
 Módulo para implementação de modelo preditivo de irrigação com Scikit-learn.
+
+Uso (na pasta src/python):
+    python prediction_model.py                          # treino completo
+    python prediction_model.py --incremental warm_start  # só os dados novos (ex.: job noturno)
+    python prediction_model.py --incremental window
 """
+import startup_timing
+import argparse
 import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-import pickle
 import os
 import logging
-from datetime import datetime, timedelta
+import threading
+from datetime import datetime, timedelta, timezone
 
-from database import SensorRecordRepository, ClimateDataRepository
-from database.oracle import get_session
+from database import SensorRecord, SensorRecordRepository, ClimateDataRepository
+from database.connection import get_session
+from database.repositories.base import DEFAULT_CHUNK_SIZE
+from model_registry import ModelRegistry
+from training_data import (
+    FEATURES,
+    TARGET,
+    sensor_frame,
+    climate_frame,
+    join_nearest_climate,
+    iter_joined_chunks
+)
 
 logger = logging.getLogger(__name__)
 
+# Arquivo único das versões anteriores ao registro: importado na primeira carga
+LEGACY_MODEL_PATH = 'irrigation_model.pkl'
+# Redução simulada da umidade do solo por hora, usada na projeção do horizonte
+MOISTURE_DECAY_RATE = 0.5
+# Hiperparâmetros da floresta no treino completo e na janela
+DEFAULT_MODEL_PARAMS = {'n_estimators': 100, 'random_state': 42}
+# Treino incremental: árvores acrescentadas por retreino, limite da floresta, janela do
+# retreino sem warm_start e mínimo de leituras novas para retreinar
+DEFAULT_EXTRA_TREES = 20
+MAX_ESTIMATORS = 300
+DEFAULT_TRAINING_WINDOW = timedelta(days=30)
+MIN_INCREMENTAL_ROWS = 50
+
 class IrrigationPredictor:
     """
     Classe para treinamento e predição de necessidades de irrigação
     usando dados históricos dos sensores e clima.
     """
-    def __init__(self, model_path='irrigation_model.pkl'):
-        self.model_path = model_path
+    def __init__(self, registry=None, session=None):
+        # `registry`: um ModelRegistry ou o diretório dele (padrão: MODEL_REGISTRY_DIR)
+        self.registry = registry if isinstance(registry, ModelRegistry) else ModelRegistry(registry)
         self.model = None
         self.scaler = StandardScaler()
-        self.session = get_session()
-        self.sensor_repo = SensorRecordRepository(self.session)
-        self.climate_repo = ClimateDataRepository(self.session)
-        
-    def _prepare_data(self):
+        self.version = None
+        self.metadata = None
+        self._session = session
+
+    @property
+    def session(self):
+        # Sem sessão própria, usa a da thread atual: o preditor compartilhado
+        # (get_predictor) atende várias threads do dashboard
+        return self._session or get_session()
+
+    @property
+    def sensor_repo(self):
+        return SensorRecordRepository(self.session)
+
+    @property
+    def climate_repo(self):
+        return ClimateDataRepository(self.session)
+
+    def _prepare_data(self, chunk_size=None, filters=()):
         """
         Prepara os dados para treinamento, combinando registros de sensores e dados climáticos.
+        Com `chunk_size`, o histórico de sensores é lido e combinado em blocos desse tamanho,
+        sem materializar todos os registros em memória. `filters` (condições sobre
+        SensorRecord) restringe as leituras, ex.: às de uma cultura.
+
+        Retorna (X, y, marca d'água), em que a marca d'água é o timestamp da leitura mais
+        recente usada no treino.
         """
-        # Buscar dados históricos
-        sensor_records = self.sensor_repo.get_all()
-        climate_data = self.climate_repo.get_all()
-        
-        if not sensor_records or not climate_data:
-            logger.error("Dados insuficientes para treinamento")
-            return None, None
-            
-        # Converter para DataFrames
-        sensor_df = pd.DataFrame([
-            {
-                'timestamp': record.timestamp,
-                'soil_moisture': record.soil_moisture,
-                'phosphorus_present': int(record.phosphorus_present),
-                'potassium_present': int(record.potassium_present),
-                'soil_ph': record.soil_ph,
-                'irrigation_status': 1 if record.irrigation_status == "ATIVADA" else 0
-            } for record in sensor_records
-        ])
-        
-        climate_df = pd.DataFrame([
-            {
-                'timestamp': record.timestamp,
-                'temperature': record.temperature,
-                'air_humidity': record.air_humidity,
-                'rain_forecast': int(record.rain_forecast)
-            } for record in climate_data
-        ])
-        
-        # Mesclar os dados por timestamp próximo
-        merged_data = []
-        for _, sensor_row in sensor_df.iterrows():
-            # Encontrar o registro climático mais próximo no tempo
-            sensor_time = sensor_row['timestamp']
-            closest_climate = min(
-                climate_df.iterrows(), 
-                key=lambda x: abs((x[1]['timestamp'] - sensor_time).total_seconds())
-            )
-            
-            # Só considerar se a diferença for menor que 1 hora
-            time_diff = abs((closest_climate[1]['timestamp'] - sensor_time).total_seconds())
-            if time_diff <= 3600:  # 1 hora em segundos
-                merged_data.append({
-                    'soil_moisture': sensor_row['soil_moisture'],
-                    'phosphorus_present': sensor_row['phosphorus_present'],
-                    'potassium_present': sensor_row['potassium_present'],
-                    'soil_ph': sensor_row['soil_ph'],
-                    'temperature': closest_climate[1]['temperature'],
-                    'air_humidity': closest_climate[1]['air_humidity'],
-                    'rain_forecast': closest_climate[1]['rain_forecast'],
-                    'irrigation_status': sensor_row['irrigation_status']
-                })
-        
-        if not merged_data:
+        if chunk_size or filters:
+            frames = self._iter_sensor_frames(chunk_size or DEFAULT_CHUNK_SIZE, filters)
+            chunks = list(iter_joined_chunks(frames, self._climate_between))
+            df = pd.concat(chunks, ignore_index=True) if chunks else None
+        else:
+            # Buscar dados históricos
+            sensor_records = self.sensor_repo.get_all()
+            climate_data = self.climate_repo.get_all()
+
+            if not sensor_records or not climate_data:
+                logger.error("Dados insuficientes para treinamento")
+                return None, None, None
+
+            sensor_df = sensor_frame([
+                (record.timestamp, record.soil_moisture, record.phosphorus_present,
+                 record.potassium_present, record.soil_ph, record.irrigation_status)
+                for record in sensor_records
+            ])
+            climate_df = climate_frame([
+                (record.timestamp, record.temperature, record.air_humidity, record.rain_forecast)
+                for record in climate_data
+            ])
+
+            # Mesclar os dados pelo registro climático mais próximo (até 1 hora de diferença)
+            df = join_nearest_climate(sensor_df, climate_df)
+
+        if df is None or df.empty:
             logger.error("Não foi possível correlacionar dados de sensores e clima")
-            return None, None
-            
-        # Criar DataFrame final
-        df = pd.DataFrame(merged_data)
-        
+            return None, None, None
+
         # Separar features e target
-        X = df.drop('irrigation_status', axis=1)
-        y = df['irrigation_status']
-        
-        return X, y
-    
-    def train(self):
+        X = df[FEATURES]
+        y = df[TARGET]
+
+        return X, y, df['timestamp'].max().to_pydatetime()
+
+    def _iter_sensor_frames(self, chunk_size, filters=()):
+        """
+        Lê os registros de sensores em ordem cronológica, em blocos de `chunk_size` linhas.
+        """
+        columns = [
+            SensorRecord.timestamp,
+            SensorRecord.soil_moisture,
+            SensorRecord.phosphorus_present,
+            SensorRecord.potassium_present,
+            SensorRecord.soil_ph,
+            SensorRecord.irrigation_status
+        ]
+        for chunk in self.sensor_repo.stream_chunks(chunk_size, columns=columns, filters=filters):
+            yield sensor_frame(chunk)
+
+    def _climate_between(self, start, end):
+        """
+        Registros climáticos do intervalo, como DataFrame.
+        """
+        records = self.climate_repo.get_by_date_range(
+            start.tz_convert('UTC').tz_localize(None).to_pydatetime(),
+            end.tz_convert('UTC').tz_localize(None).to_pydatetime()
+        )
+        return climate_frame([
+            (record.timestamp, record.temperature, record.air_humidity, record.rain_forecast)
+            for record in records
+        ])
+
+    def training_data(self, chunk_size=None, filters=()):
+        """
+        Histórico completo combinado com o clima, em ordem cronológica: (X, y, marca d'água).
+        """
+        return self._prepare_data(chunk_size, filters)
+
+    def train(self, chunk_size=None, params=None, filters=()):
         """
-        Treina o modelo de predição de irrigação.
+        Treina o modelo de predição de irrigação com todo o histórico e registra uma nova
+        versão, que passa a ser a ativa. `params` substitui hiperparâmetros da floresta
+        (ex.: os escolhidos por `training_pipeline`); `filters` restringe as leituras
+        (modelos por cultura, ver `model_fleet`).
         """
         # Preparar dados
-        X, y = self._prepare_data()
+        X, y, watermark = self._prepare_data(chunk_size, filters)
         if X is None or y is None:
             return False
+        return self._fit(X, y, watermark, mode='full', params=params)
+
+    def train_incremental(self, mode='warm_start', extra_trees=DEFAULT_EXTRA_TREES,
+                          window=DEFAULT_TRAINING_WINDOW, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Retreino a partir da marca d'água da versão ativa: lê apenas as leituras posteriores
+        a ela, então o custo acompanha o volume novo e não o histórico inteiro.
+
+        - `warm_start`: mantém as árvores e o scaler da versão ativa e acrescenta
+          `extra_trees` árvores treinadas com os dados novos;
+        - `window`: treina um modelo novo só com a janela `window` mais recente.
+
+        O `warm_start` passa a `window` quando a floresta chegaria a MAX_ESTIMATORS
+        árvores ou quando os dados novos não têm as duas classes. Sem versão ativa ou
+        marca d'água, faz o treino completo.
+        """
+        if mode not in ('warm_start', 'window'):
+            raise ValueError(f"Modo de treino incremental inválido: {mode}")
+        parent = self.registry.active_version()
+        since = self.registry.metadata(parent).get('watermark') if parent else None
+        if since is None:
+            logger.info("Sem marca d'água de treino anterior: treino completo")
+            return self.train(chunk_size)
+        since = datetime.fromisoformat(since)
+
+        new_data = self._joined_after(since, chunk_size)
+        if len(new_data) < MIN_INCREMENTAL_ROWS:
+            logger.info(f"{len(new_data)} leituras novas desde {since.isoformat()}: retreino adiado")
+            return False
+        watermark = new_data['timestamp'].max().to_pydatetime()
+
+        if mode == 'warm_start':
+            model, scaler, _ = self.registry.load(parent, mmap=False)
+            if model.n_estimators + extra_trees > MAX_ESTIMATORS:
+                logger.info(f"Floresta com {model.n_estimators} árvores: retreino na janela recente")
+            else:
+                model.set_params(warm_start=True, n_estimators=model.n_estimators + extra_trees)
+                if self._fit(new_data[FEATURES], new_data[TARGET], watermark, mode='warm_start',
+                             parent=parent, model=model, scaler=scaler):
+                    return True
+                logger.info("Dados novos sem exemplos das duas classes: retreino na janela recente")
+
+        window_data = self._joined_after(watermark - window, chunk_size)
+        return self._fit(window_data[FEATURES], window_data[TARGET], watermark, mode='window', parent=parent)
+
+    def _joined_after(self, since, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Leituras posteriores a `since`, já combinadas com o clima (mesmas colunas de `_prepare_data`).
+        """
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        frames = self._iter_sensor_frames(chunk_size, filters=[SensorRecord.timestamp > since])
+        chunks = list(iter_joined_chunks(frames, self._climate_between))
+        if not chunks:
+            return pd.DataFrame(columns=['timestamp'] + FEATURES + [TARGET])
+        return pd.concat(chunks, ignore_index=True)
+
+    def _fit(self, X, y, watermark, mode, parent=None, model=None, scaler=None, params=None):
+        """
+        Ajusta o modelo (novo, com os hiperparâmetros `params`, ou o recebido com warm_start),
+        avalia nos 20% mais recentes dos dados e registra a versão como ativa.
+        """
+        # Split temporal para treino e teste (X está em ordem cronológica): o teste é o
+        # período mais recente, sem leituras futuras no treino
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, shuffle=False)
+        if model is not None and set(np.unique(y_train)) != set(model.classes_):
+            # O warm_start exige as mesmas classes do modelo original
+            return False
         
-        # Split para treino e teste
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        
-        # Normalizar features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        # Normalizar features sobre a matriz, na ordem de FEATURES (as predições recebem
+        # matrizes). Scaler e modelo são objetos novos: o par em uso continua atendendo
+        # predições até a troca, ao final
+        if scaler is None:
+            scaler = StandardScaler().fit(X_train.to_numpy(dtype=float))
+        X_train_scaled = scaler.transform(X_train.to_numpy(dtype=float))
+        X_test_scaled = scaler.transform(X_test.to_numpy(dtype=float))
         
         # Treinar modelo
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.model.fit(X_train_scaled, y_train)
+        if model is None:
+            model = RandomForestClassifier(**{**DEFAULT_MODEL_PARAMS, **(params or {})})
+        model.fit(X_train_scaled, y_train)
+        self.model, self.scaler = model, scaler
         
         # Avaliar modelo
         y_pred = self.model.predict(X_test_scaled)
         accuracy = accuracy_score(y_test, y_pred)
-        logger.info(f"Acurácia do modelo: {accuracy:.4f}")
+        logger.info(f"Acurácia do modelo ({mode}): {accuracy:.4f}")
         
         # Relatório detalhado
         report = classification_report(y_test, y_pred)
         logger.info(f"Relatório de classificação:\n{report}")
         
-        # Salvar modelo
-        with open(self.model_path, 'wb') as f:
-            pickle.dump((self.model, self.scaler), f)
-        
-        logger.info(f"Modelo salvo em: {self.model_path}")
+        # Registrar a nova versão
+        metrics = {
+            'accuracy': accuracy,
+            'training_rows': len(X_train),
+            'test_rows': len(X_test),
+            'n_estimators': len(model.estimators_),
+            'report': classification_report(y_test, y_pred, output_dict=True, zero_division=0)
+        }
+        self.version = self.registry.save(self.model, self.scaler, metrics=metrics, watermark=watermark,
+                                          mode=mode, parent=parent)
+        self.metadata = self.registry.metadata(self.version)
         return True
     
-    def load_model(self):
+    def load_model(self, version=None):
         """
-        Carrega o modelo pré-treinado.
+        Carrega a versão informada do registro ou, sem versão, a ativa.
         """
-        if not os.path.exists(self.model_path):
-            logger.error(f"Arquivo de modelo não encontrado: {self.model_path}")
+        version = version or self.registry.active_version()
+        if version is None and os.path.exists(LEGACY_MODEL_PATH):
+            version = self.registry.import_pickle(LEGACY_MODEL_PATH)
+        if version is None:
+            logger.error(f"Nenhum modelo registrado em: {self.registry.root}")
             return False
             
         try:
-            with open(self.model_path, 'rb') as f:
-                self.model, self.scaler = pickle.load(f)
-            logger.info("Modelo carregado com sucesso")
+            self.model, self.scaler, self.metadata = self.registry.load(version)
+            self.version = version
+            logger.info(f"Modelo carregado com sucesso (versão {version})")
             return True
         except Exception as e:
             logger.error(f"Erro ao carregar modelo: {e}")
@@ -158,13 +295,7 @@ class IrrigationPredictor:
         """
         Faz uma predição sobre a necessidade de irrigação.
         """
-        if self.model is None:
-            if not self.load_model():
-                # Se não conseguir carregar, treina um novo
-                self.train()
-                
-        if self.model is None:
-            logger.error("Modelo não disponível para predição")
+        if not self._ensure_model():
             return None
             
         # Preparar dados para predição
@@ -178,84 +309,127 @@ class IrrigationPredictor:
             int(rain_forecast)
         ]])
         
-        # Normalizar
-        data_scaled = self.scaler.transform(data)
-        
-        # Predizer
-        prediction = self.model.predict(data_scaled)
-        probability = self.model.predict_proba(data_scaled)
-        
+        should_irrigate, confidence = self._score(data)
         return {
-            'should_irrigate': bool(prediction[0]),
-            'confidence': float(probability[0][1]) if prediction[0] else float(probability[0][0]),
+            'should_irrigate': bool(should_irrigate[0]),
+            'confidence': float(confidence[0]),
             'prediction_time': datetime.now()
         }
+
+    def predict_batch(self, data):
+        """
+        Predição em lote: `data` é um DataFrame com as colunas de FEATURES ou uma matriz
+        2-D com as colunas nessa ordem. Retorna dois arrays, com a decisão de irrigar e a
+        confiança de cada linha, calculados com uma única passada do scaler e do modelo.
+        """
+        if not self._ensure_model():
+            return None
+        if isinstance(data, pd.DataFrame):
+            data = data[FEATURES]
+        data = np.asarray(data, dtype=float)
+        if data.ndim != 2 or data.shape[1] != len(FEATURES):
+            raise ValueError(f"Esperada uma matriz com {len(FEATURES)} colunas ({', '.join(FEATURES)})")
+        return self._score(data)
+
+    def _ensure_model(self) -> bool:
+        if self.model is None and not self.load_model():
+            # Se não conseguir carregar, treina um novo
+            self.train()
+        if self.model is None:
+            logger.error("Modelo não disponível para predição")
+            return False
+        return True
+
+    def _score(self, data):
+        """
+        Classe prevista e confiança de cada linha de `data` (matriz na ordem de FEATURES),
+        com uma única chamada a `predict_proba`: a classe prevista é a de maior probabilidade,
+        como em `predict`.
+        """
+        model, scaler = self.model, self.scaler
+        probability = model.predict_proba(scaler.transform(data))
+        best = probability.argmax(axis=1)
+        return model.classes_[best].astype(bool), probability[np.arange(len(best)), best]
         
     def predict_next_irrigation(self, hours_ahead=24, interval_hours=1):
         """
         Prevê a necessidade de irrigação para as próximas horas, com base nas tendências.
         Retorna horários recomendados para irrigação.
+
+        O horizonte inteiro é montado como uma matriz e avaliado com uma única chamada
+        ao modelo; as leituras base vêm do estado atual dos sensores e do registro
+        climático mais recente, sem carregar o histórico.
         """
+        if not self._ensure_model():
+            return []
+
         # Obter últimas leituras
-        latest_sensor = self.sensor_repo.get_all()
-        if not latest_sensor:
+        latest_sensor = self.sensor_repo.states.get_latest()
+        if latest_sensor is None:
             return []
-            
-        latest_sensor = max(latest_sensor, key=lambda x: x.timestamp)
-        
-        latest_climate = self.climate_repo.get_all()
-        if not latest_climate:
+        latest_climate = self.climate_repo.get_latest()
+        if latest_climate is None:
             return []
-            
-        latest_climate = max(latest_climate, key=lambda x: x.timestamp)
-        
-        # Valores base para previsão
-        base_soil_moisture = latest_sensor.soil_moisture
-        base_phosphorus = latest_sensor.phosphorus_present
-        base_potassium = latest_sensor.potassium_present
-        base_ph = latest_sensor.soil_ph
-        base_temp = latest_climate.temperature
-        base_humidity = latest_climate.air_humidity
-        base_rain = latest_climate.rain_forecast
-        
-        # Simular diminuição de umidade ao longo do tempo (simplificação)
-        moisture_decay_rate = 0.5  # % por hora
-        
-        recommended_times = []
+
+        # Projetar valores futuros: só a umidade varia ao longo do horizonte (simplificação)
+        hours = np.arange(0, hours_ahead, interval_hours)
+        if len(hours) == 0:
+            return []
+        projected_moisture = np.maximum(0, latest_sensor.soil_moisture - MOISTURE_DECAY_RATE * hours)
+        data = np.empty((len(hours), len(FEATURES)))
+        data[:, 0] = projected_moisture
+        data[:, 1:] = [
+            int(latest_sensor.phosphorus_present),
+            int(latest_sensor.potassium_present),
+            latest_sensor.soil_ph,
+            latest_climate.temperature,
+            latest_climate.air_humidity,
+            int(latest_climate.rain_forecast)
+        ]
+        should_irrigate, confidence = self._score(data)
+
         current_time = datetime.now()
-        
-        for hour in range(0, hours_ahead, interval_hours):
-            # Projetar valores futuros
-            future_time = current_time + timedelta(hours=hour)
-            
-            # Simular diminuição da umidade (simplificação)
-            projected_moisture = max(0, base_soil_moisture - (moisture_decay_rate * hour))
-            
-            # Fazer predição
-            prediction = self.predict(
-                projected_moisture, 
-                base_phosphorus, 
-                base_potassium,
-                base_ph,
-                base_temp,
-                base_humidity,
-                base_rain
-            )
-            
-            if prediction and prediction['should_irrigate']:
-                recommended_times.append({
-                    'time': future_time,
-                    'predicted_moisture': projected_moisture,
-                    'confidence': prediction['confidence']
-                })
-                
-        return recommended_times
-
-def train_irrigation_model():
+        return [
+            {
+                'time': current_time + timedelta(hours=int(hours[i])),
+                'predicted_moisture': float(projected_moisture[i]),
+                'confidence': float(confidence[i])
+            }
+            for i in np.flatnonzero(should_irrigate)
+        ]
+
+
+_predictors = {}
+_predictors_lock = threading.Lock()
+
+
+def get_predictor(registry_dir=None) -> IrrigationPredictor:
     """
-    Função para treinar o modelo de irrigação.
+    Preditor compartilhado pelo processo, com a versão ativa do registro já carregada (sem
+    abrir sessão nem ler o artefato a cada predição). Quando outra versão é ativada (novo
+    treino ou rollback), é carregada na chamada seguinte.
+    """
+    registry = ModelRegistry(registry_dir)
+    with _predictors_lock:
+        predictor = _predictors.get(registry.root)
+        if predictor is None:
+            predictor = _predictors[registry.root] = IrrigationPredictor(registry)
+            predictor.load_model()
+        else:
+            active = registry.active_version()
+            if active is not None and active != predictor.version:
+                predictor.load_model(active)
+        return predictor
+
+
+def train_irrigation_model(incremental=None):
+    """
+    Função para treinar o modelo de irrigação. Com `incremental` ('warm_start' ou
+    'window'), retreina a partir da marca d'água da versão ativa.
     """
     predictor = IrrigationPredictor()
+    if incremental:
+        return predictor.train_incremental(incremental)
     success = predictor.train()
     return success
 
@@ -263,18 +437,22 @@ def get_irrigation_prediction(soil_moisture, phosphorus, potassium, ph, temperat
     """
     Obtém uma predição para uma situação específica.
     """
-    predictor = IrrigationPredictor()
-    return predictor.predict(soil_moisture, phosphorus, potassium, ph, temperature, humidity, rain)
+    return get_predictor().predict(soil_moisture, phosphorus, potassium, ph, temperature, humidity, rain)
 
 def get_future_irrigation_schedule():
     """
     Obtém uma programação de irrigação para as próximas horas.
     """
-    predictor = IrrigationPredictor()
-    return predictor.predict_next_irrigation(hours_ahead=48, interval_hours=3)
+    return get_predictor().predict_next_irrigation(hours_ahead=48, interval_hours=3)
 
 if __name__ == "__main__":
     # Testar funcionamento
+    startup_timing.mark('imports')
     logging.basicConfig(level=logging.INFO)
-    success = train_irrigation_model()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--incremental', choices=['warm_start', 'window'], default=None,
+                        help='Retreina só com as leituras posteriores à marca d\'água da versão ativa')
+    args = parser.parse_args()
+    success = train_irrigation_model(args.incremental)
     print(f"Modelo treinado: {success}")
+    startup_timing.report('prediction_model')
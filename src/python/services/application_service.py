@@ -1,15 +1,21 @@
-from typing import List, Optional, Dict
+from typing import Iterator, List, Optional, Dict
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime
 
-from database import ApplicationRepository
+from database import Application, ApplicationRepository
+from database.repositories.base import DEFAULT_PAGE_SIZE, DEFAULT_CHUNK_SIZE
+from database.instrumentation import instrument_service
+from database.projections import ApplicationRow, entity_dict
+from services.cache import invalidates
 
 
+@instrument_service
 class ApplicationService:
     def __init__(self, session: Session):
         self.repo = ApplicationRepository(session)
 
+    @invalidates('applications')
     def create_application(self, data: dict) -> dict:
         try:
             application = self.repo.create(
@@ -18,26 +24,34 @@ class ApplicationService:
                 quantity=data['quantity'],
                 timestamp=datetime.now()
             )
-            return application.__dict__
+            return entity_dict(application)
         except SQLAlchemyError as e:
             self.repo.session.rollback()
             raise e
 
     def get_application(self, application_id: str) -> Optional[dict]:
         application = self.repo.get_by_id(application_id)
-        return application.__dict__ if application else None
+        return entity_dict(application) if application else None
 
     def list_applications(self) -> List[dict]:
-        return [application.__dict__ for application in self.repo.get_all()]
+        return self.repo.list_dicts()
 
+    def list_applications_rows(self) -> List[ApplicationRow]:
+        return self.repo.list_rows()
+
+    def applications_columns(self) -> Dict[str, list]:
+        return self.repo.list_columns()
+
+    @invalidates('applications')
     def update_application(self, application_id: str, data: dict) -> Optional[dict]:
         try:
             updated_application = self.repo.update(application_id, **data)
-            return updated_application.__dict__ if updated_application else None
+            return entity_dict(updated_application) if updated_application else None
         except SQLAlchemyError as e:
             self.repo.session.rollback()
             raise e
 
+    @invalidates('applications')
     def delete_application(self, application_id: str) -> bool:
         try:
             return self.repo.delete(application_id)
@@ -46,18 +60,32 @@ class ApplicationService:
             raise e
 
     def get_applications_by_crop(self, crop_id: str) -> List[dict]:
-        return [application.__dict__ for application in self.repo.get_by_crop(crop_id)]
+        return self.repo.list_dicts(filters=[Application.crop_id == crop_id])
 
     def get_total_quantity_by_type(self, crop_id: str, app_type: str) -> float:
-        applications = self.repo.get_by_crop(crop_id)
-        return sum(app.quantity for app in applications if app.type == app_type)
+        return self.repo.get_total_quantity_by_type(app_type, crop_id=crop_id)
 
     def get_application_summary(self, crop_id: str) -> dict:
-        applications = self.repo.get_by_crop(crop_id)
-        total_quantity = sum(app.quantity for app in applications)
-        types = list(set(app.type for app in applications))
-        return {
-            'total_applications': len(applications),
-            'types_applied': types,
-            'total_quantity': total_quantity
-        }
+        return self.repo.get_crop_application_summary(crop_id)
+
+    def summarize_applications(self, group_by=('crop_id', 'type'), bucket: Optional[str] = None, **filters) -> List[dict]:
+        """
+        Resumo agregado no banco por cultura, tipo e/ou intervalo de tempo.
+        Veja `ApplicationRepository.summarize` para os filtros aceitos.
+        """
+        return [dict(row._mapping) for row in self.repo.summarize(group_by=group_by, bucket=bucket, **filters)]
+
+    def list_applications_page(self, cursor: Optional[tuple] = None, page_size: int = DEFAULT_PAGE_SIZE) -> dict:
+        """
+        Uma página da listagem (paginação por keyset). Passe `next_cursor` para obter a próxima.
+        """
+        page = self.repo.get_page(cursor, page_size)
+        return {'items': [entity_dict(application) for application in page.items], 'next_cursor': page.next_cursor}
+
+    def iter_applications(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict]:
+        """
+        Percorre todos os registros em streaming, em memória constante.
+        """
+        for chunk in self.repo.stream_chunks(chunk_size, columns=self.repo.row_columns):
+            for row in chunk:
+                yield dict(row._mapping)
@@ -0,0 +1,209 @@
+"""
+Cache de leituras entre o dashboard e os serviços.
+
+Cada entrada é identificada pela consulta e pela versão dos dados das tabelas que ela lê.
+As escritas feitas pelos serviços (`@invalidates`) incrementam a versão das tabelas
+afetadas, então a próxima leitura já não encontra a entrada antiga; o TTL cobre as
+escritas feitas fora deste processo (ex.: a ingestão de telemetria).
+
+O cache é do processo: as reexecuções do script do Streamlit e as sessões de usuários
+simultâneos compartilham as mesmas entradas, e consultas iguais em paralelo executam
+uma única vez.
+
+`FigureCache` guarda os gráficos do matplotlib já renderizados (PNG), identificados por
+um hash do tipo de gráfico, dos parâmetros e da versão dos dados: um gráfico inalterado
+custa uma consulta ao cache em vez de uma nova renderização a cada interação.
+
+Configuração por variáveis de ambiente:
+- `DASHBOARD_CACHE_TTL`: validade das entradas em segundos (padrão: 30; `0` desliga o cache);
+- `DASHBOARD_CACHE_MAX_ENTRIES`: quantidade máxima de entradas (padrão: 256);
+- `DASHBOARD_FIGURE_CACHE_MAX_ENTRIES`: quantidade máxima de gráficos renderizados (padrão: 64).
+
+Os valores retornados são compartilhados entre as chamadas e não devem ser alterados.
+"""
+import functools
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, Tuple
+
+# Tabelas removidas em cascata (ON DELETE CASCADE) junto com cada tabela
+CASCADES = {
+    'producers': ('crops',),
+    'crops': ('components', 'applications'),
+    'components': ('sensor_records', 'sensor_latest_state', 'sensor_records_hourly', 'sensor_records_daily',
+                   'irrigation_predictions'),
+}
+
+
+def with_cascades(tables: Iterable[str]) -> Tuple[str, ...]:
+    pending, found = list(tables), []
+    while pending:
+        table = pending.pop()
+        if table not in found:
+            found.append(table)
+            pending.extend(CASCADES.get(table, ()))
+    return tuple(found)
+
+
+class QueryCache:
+    """
+    Cache LRU com TTL, invalidado por versão de tabela (thread-safe).
+    """
+    def __init__(self, ttl: float = 30.0, max_entries: int = 256, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._versions: Dict[str, int] = {}
+        self._entries: 'OrderedDict[tuple, Tuple[float, object]]' = OrderedDict()
+        self._loading: Dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'QueryCache':
+        return cls(
+            ttl=float(os.getenv('DASHBOARD_CACHE_TTL', '30')),
+            max_entries=int(os.getenv('DASHBOARD_CACHE_MAX_ENTRIES', '256'))
+        )
+
+    def version(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+    def get(self, query: Hashable, tables: Iterable[str], loader: Callable[[], object]):
+        """
+        Retorna o resultado de `query` em cache ou o obtém com `loader()`.
+        `tables` são as tabelas lidas pela consulta, cujas escritas a invalidam.
+        """
+        if self.ttl <= 0:
+            return loader()
+        tables = tuple(tables)
+        versions = self.version(tables)
+        key = (query, tables, versions)
+
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            loading = self._loading.setdefault(key, threading.Lock())
+        with loading:
+            # Outra thread pode ter carregado a mesma consulta enquanto esperávamos
+            value = self._lookup(key, count=False)
+            if value is not _MISSING:
+                return value
+            with self._lock:
+                self.misses += 1
+            try:
+                value = loader()
+                self._store(key, versions, value)
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+        return value
+
+    def invalidate(self, *tables: str):
+        """
+        Marca os dados das tabelas como alterados: as entradas que as leem deixam de valer.
+        Sem argumentos, descarta todo o cache.
+        """
+        with self._lock:
+            if not tables:
+                self._entries.clear()
+                return
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+            stale = [key for key in self._entries if set(key[1]) & set(tables)]
+            for key in stale:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+    def _lookup(self, key: tuple, count: bool = True):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                return _MISSING
+            self._entries.move_to_end(key)
+            if count:
+                self.hits += 1
+            return entry[1]
+
+    def _store(self, key: tuple, versions: Tuple[int, ...], value):
+        with self._lock:
+            # Uma escrita durante a consulta torna o resultado possivelmente antigo: não guarda
+            if tuple(self._versions.get(table, 0) for table in key[1]) != versions:
+                return
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class FigureCache:
+    """
+    LRU de gráficos renderizados em PNG. A versão dos dados vem do cache de leituras,
+    então as escritas pelos serviços também invalidam os gráficos que as exibem.
+    """
+    def __init__(self, data_cache: QueryCache, max_entries: int = 64, dpi: int = 100):
+        self.data_cache = data_cache
+        self.dpi = dpi
+        self._figures = QueryCache(ttl=data_cache.ttl, max_entries=max_entries, clock=data_cache.clock)
+
+    @classmethod
+    def from_env(cls, data_cache: QueryCache) -> 'FigureCache':
+        return cls(data_cache, max_entries=int(os.getenv('DASHBOARD_FIGURE_CACHE_MAX_ENTRIES', '64')))
+
+    def key(self, chart: str, params: Hashable, tables: Iterable[str]) -> str:
+        tables = tuple(tables)
+        return hashlib.sha1(repr((chart, params, tables, self.data_cache.version(tables))).encode()).hexdigest()
+
+    def png(self, chart: str, params: Hashable, tables: Iterable[str], render: Callable[[], object]) -> bytes:
+        """
+        PNG do gráfico `chart`; `render()` (que retorna uma figura do matplotlib) só é
+        chamado quando não há uma renderização válida para os mesmos parâmetros e dados.
+        """
+        return self._figures.get(self.key(chart, params, tables), (), lambda: self._render(render))
+
+    def stats(self) -> dict:
+        return self._figures.stats()
+
+    def _render(self, render: Callable[[], object]) -> bytes:
+        import matplotlib.pyplot as plt
+
+        figure = render()
+        try:
+            buffer = io.BytesIO()
+            figure.savefig(buffer, format='png', dpi=self.dpi, bbox_inches='tight')
+            return buffer.getvalue()
+        finally:
+            plt.close(figure)
+
+
+_MISSING = object()
+
+cache = QueryCache.from_env()
+figures = FigureCache.from_env(cache)
+
+
+def invalidates(*tables: str, cascade: bool = False):
+    """
+    Decorador dos métodos de escrita dos serviços: ao concluir, invalida no cache as
+    tabelas alteradas. Com `cascade=True` (exclusões), também as tabelas filhas.
+    """
+    affected = with_cascades(tables) if cascade else tables
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            result = method(*args, **kwargs)
+            cache.invalidate(*affected)
+            return result
+        return wrapper
+    return decorator
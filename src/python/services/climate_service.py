@@ -1,16 +1,27 @@
-from database.oracle import db
+from database.connection import db
 from database.models import ClimateData
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
 from sqlalchemy.orm import Session
+import numpy as np
 
-from database import ComponentRepository
+from database import ClimateDataRepository
+from database.repositories.base import DEFAULT_PAGE_SIZE, DEFAULT_CHUNK_SIZE
+from database.instrumentation import instrument_service
+from database import downsampling
+from database.downsampling import DEFAULT_POINTS
+from database.projections import ClimateDataRow
+from services.cache import invalidates
 
+CHART_COLUMNS = ('timestamp', 'temperature', 'air_humidity')
 
+
+@instrument_service
 class ClimateService:
     def __init__(self, session: Session):
-        self.repo = ComponentRepository(session)
+        self.repo = ClimateDataRepository(session)
 
+    @invalidates('climate_data')
     def create_climate_data(self, data: dict) -> dict:
         climate = ClimateData(
             timestamp=data.get("timestamp", datetime.utcnow()),
@@ -36,6 +47,15 @@ class ClimateService:
         return [c.to_dict() for c in climates]
 
 
+    def list_climate_data_rows(self) -> List[ClimateDataRow]:
+        return self.repo.list_rows()
+
+
+    def climate_data_columns(self) -> Dict[str, list]:
+        return self.repo.list_columns()
+
+
+    @invalidates('climate_data')
     def update_climate_data(self, climate_id: str, data: dict) -> Optional[dict]:
         climate = db.session.query(ClimateData).filter_by(id=climate_id).first()
         if not climate:
@@ -55,6 +75,7 @@ class ClimateService:
         return climate.to_dict()
 
 
+    @invalidates('climate_data')
     def delete_climate_data(self, climate_id: str) -> bool:
         climate = db.session.query(ClimateData).filter_by(id=climate_id).first()
         if not climate:
@@ -62,3 +83,36 @@ class ClimateService:
         db.session.delete(climate)
         db.session.commit()
         return True
+
+
+    def get_chart_series(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                         points: int = DEFAULT_POINTS, bins: int = 10) -> dict:
+        """
+        Séries dos gráficos no intervalo, reduzidas a até `points` pontos: temperatura e
+        umidade por LTTB, amostra para a dispersão e histograma da temperatura já contado.
+        """
+        columns = self.repo.get_window(CHART_COLUMNS, start_date, end_date)
+        counts, edges = np.histogram(np.asarray(columns['temperature'], dtype=float), bins=bins)
+        return {
+            'count': len(columns['timestamp']),
+            'temperature': downsampling.lttb(columns, 'timestamp', 'temperature', points),
+            'air_humidity': downsampling.lttb(columns, 'timestamp', 'air_humidity', points),
+            'scatter': downsampling.sample({'temperature': columns['temperature'], 'air_humidity': columns['air_humidity']}, points),
+            'temperature_histogram': {'counts': counts.tolist(), 'edges': edges.tolist()}
+        }
+
+
+    def list_climate_data_page(self, cursor: Optional[tuple] = None, page_size: int = DEFAULT_PAGE_SIZE) -> dict:
+        """
+        Uma página da listagem (paginação por keyset). Passe `next_cursor` para obter a próxima.
+        """
+        page = self.repo.get_page(cursor, page_size)
+        return {'items': [c.to_dict() for c in page.items], 'next_cursor': page.next_cursor}
+
+
+    def iter_climate_data(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict]:
+        """
+        Percorre todos os registros em streaming, em memória constante.
+        """
+        for climate in self.repo.stream_all(chunk_size):
+            yield climate.to_dict()
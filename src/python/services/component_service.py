@@ -1,40 +1,69 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional, Dict
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
 from database import ComponentRepository
+from database.repositories.base import DEFAULT_PAGE_SIZE, DEFAULT_CHUNK_SIZE
+from database.instrumentation import instrument_service
+from database.projections import ComponentRow, entity_dict
+from services.cache import invalidates
 
 
+@instrument_service
 class ComponentService:
     def __init__(self, session: Session):
         self.repo = ComponentRepository(session)
 
+    @invalidates('components')
     def create_component(self, data: dict) -> dict:
         try:
             component = self.repo.create(name=data['name'], type=data['type'], crop_id=data.get('crop_id'))
-            return component.__dict__
+            return entity_dict(component)
         except SQLAlchemyError as e:
             self.repo.session.rollback()
             raise e
 
     def get_component(self, component_id: str) -> Optional[dict]:
         component = self.repo.get_by_id(component_id)
-        return component.__dict__ if component else None
+        return entity_dict(component) if component else None
 
     def list_components(self) -> List[dict]:
-        return [component.__dict__ for component in self.repo.get_all()]
+        return self.repo.list_dicts()
 
+    def list_components_rows(self) -> List[ComponentRow]:
+        return self.repo.list_rows()
+
+    def components_columns(self) -> Dict[str, list]:
+        return self.repo.list_columns()
+
+    @invalidates('components')
     def update_component(self, component_id: str, data: dict) -> Optional[dict]:
         try:
             updated_component = self.repo.update(component_id, **data)
-            return updated_component.__dict__ if updated_component else None
+            return entity_dict(updated_component) if updated_component else None
         except SQLAlchemyError as e:
             self.repo.session.rollback()
             raise e
 
+    @invalidates('components', cascade=True)
     def delete_component(self, component_id: str) -> bool:
         try:
             return self.repo.delete(component_id)
         except SQLAlchemyError as e:
             self.repo.session.rollback()
-            raise e
\ No newline at end of file
+            raise e
+
+    def list_components_page(self, cursor: Optional[tuple] = None, page_size: int = DEFAULT_PAGE_SIZE) -> dict:
+        """
+        Uma página da listagem (paginação por keyset). Passe `next_cursor` para obter a próxima.
+        """
+        page = self.repo.get_page(cursor, page_size)
+        return {'items': [entity_dict(component) for component in page.items], 'next_cursor': page.next_cursor}
+
+    def iter_components(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict]:
+        """
+        Percorre todos os registros em streaming, em memória constante.
+        """
+        for chunk in self.repo.stream_chunks(chunk_size, columns=self.repo.row_columns):
+            for row in chunk:
+                yield dict(row._mapping)
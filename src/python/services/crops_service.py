@@ -1,15 +1,21 @@
-from typing import List, Optional, Dict
+from typing import Iterator, List, Optional, Dict
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import date
 
-from database import CropRepository
+from database import Crop, CropRepository
+from database.repositories.base import DEFAULT_PAGE_SIZE, DEFAULT_CHUNK_SIZE
+from database.instrumentation import instrument_service
+from database.projections import CropRow, entity_dict
+from services.cache import invalidates
 
 
+@instrument_service
 class CropService:
     def __init__(self, session: Session):
         self.repo = CropRepository(session)
 
+    @invalidates('crops')
     def create_crop(self, data: dict) -> dict:
         try:
             crop = self.repo.create(
@@ -19,26 +25,34 @@ class CropService:
                 end_date=date.fromisoformat(data.get('end_date')) if data.get('end_date') else None,
                 producer_id=data['producer_id']
             )
-            return crop.__dict__
+            return entity_dict(crop)
         except SQLAlchemyError as e:
             self.repo.session.rollback()
             raise e
 
     def get_crop(self, crop_id: str) -> Optional[dict]:
         crop = self.repo.get_by_id(crop_id)
-        return crop.__dict__ if crop else None
+        return entity_dict(crop) if crop else None
 
     def list_crops(self) -> List[dict]:
-        return [crop.__dict__ for crop in self.repo.get_all()]
+        return self.repo.list_dicts()
 
+    def list_crops_rows(self) -> List[CropRow]:
+        return self.repo.list_rows()
+
+    def crops_columns(self) -> Dict[str, list]:
+        return self.repo.list_columns()
+
+    @invalidates('crops')
     def update_crop(self, crop_id: str, data: dict) -> Optional[dict]:
         try:
             updated_crop = self.repo.update(crop_id, **data)
-            return updated_crop.__dict__ if updated_crop else None
+            return entity_dict(updated_crop) if updated_crop else None
         except SQLAlchemyError as e:
             self.repo.session.rollback()
             raise e
 
+    @invalidates('crops', cascade=True)
     def delete_crop(self, crop_id: str) -> bool:
         try:
             return self.repo.delete(crop_id)
@@ -47,29 +61,39 @@ class CropService:
             raise e
 
     def list_active_crops(self) -> List[dict]:
-        return [crop.__dict__ for crop in self.repo.get_active_crops()]
+        return [entity_dict(crop) for crop in self.repo.get_active_crops()]
 
     def get_crops_by_producer(self, producer_id: str) -> List[dict]:
-        return self.repo.get_by_producer(producer_id)
+        return self.repo.list_dicts(filters=[Crop.producer_id == producer_id])
 
     def get_crop_components(self, crop_id: str) -> List[dict]:
-        crop = self.repo.get_by_id(crop_id)
-        if not crop:
-            return []
-        return [component.__dict__ for component in crop.components]
+        return [entity_dict(component) for component in self.repo.get_components(crop_id)]
 
     def get_crop_applications(self, crop_id: str) -> List[dict]:
-        crop = self.repo.get_by_id(crop_id)
-        if not crop:
-            return []
-        return [application.__dict__ for application in crop.applications]
+        return [entity_dict(application) for application in self.repo.get_applications(crop_id)]
 
     def get_crop_details(self, crop_id: str) -> Optional[dict]:
-        crop = self.repo.get_by_id(crop_id)
+        # Uma leitura da cultura com os relacionamentos carregados antecipadamente
+        crop = self.repo.get_with_details(crop_id)
         if not crop:
             return None
         return {
-            **crop.__dict__,
-            "components": self.get_crop_components(crop_id),
-            "applications": self.get_crop_applications(crop_id)
+            **entity_dict(crop),
+            "components": [entity_dict(component) for component in crop.components],
+            "applications": [entity_dict(application) for application in crop.applications]
         }
+
+    def list_crops_page(self, cursor: Optional[tuple] = None, page_size: int = DEFAULT_PAGE_SIZE) -> dict:
+        """
+        Uma página da listagem (paginação por keyset). Passe `next_cursor` para obter a próxima.
+        """
+        page = self.repo.get_page(cursor, page_size)
+        return {'items': [entity_dict(crop) for crop in page.items], 'next_cursor': page.next_cursor}
+
+    def iter_crops(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict]:
+        """
+        Percorre todos os registros em streaming, em memória constante.
+        """
+        for chunk in self.repo.stream_chunks(chunk_size, columns=self.repo.row_columns):
+            for row in chunk:
+                yield dict(row._mapping)
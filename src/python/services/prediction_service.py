@@ -0,0 +1,133 @@
+"""
+Pontuação em lote: aplica o modelo de irrigação à leitura mais recente de cada sensor
+e grava o resultado na tabela de predições.
+
+Cada execução lê o estado atual dos sensores (uma linha por sensor) e o registro
+climático mais recente, avalia todos os sensores com uma única chamada ao modelo
+(`IrrigationPredictor.predict_batch`) e grava as predições em uma única transação. Com uma
+frota de modelos (`model_fleet`), os sensores de cada cultura são avaliados pelo modelo dela.
+
+Uso (na pasta src/python):
+    python -m services.prediction_service               # uma execução
+    python -m services.prediction_service --interval 600  # a cada 10 minutos
+    python -m services.prediction_service --fleet crop_type  # modelos por tipo de cultura
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import ClimateDataRepository, IrrigationPredictionRepository, SensorStateRepository
+from database.connection import get_session, close_session
+from database.instrumentation import instrument_service
+from database.projections import IrrigationPredictionRow
+from logs.logger import Logger
+from model_fleet import SEGMENTS, ModelFleet, get_fleet, sensor_segments
+from prediction_model import IrrigationPredictor, get_predictor
+from services.cache import invalidates
+from training_data import FEATURES
+
+logger = Logger(__name__)()
+
+SENSOR_FEATURES = ('soil_moisture', 'phosphorus_present', 'potassium_present', 'soil_ph')
+CLIMATE_FEATURES = ('temperature', 'air_humidity', 'rain_forecast')
+
+
+@instrument_service
+class IrrigationPredictionService:
+    def __init__(self, session: Session, predictor: Optional[IrrigationPredictor] = None,
+                 fleet: Optional[ModelFleet] = None):
+        self.repo = IrrigationPredictionRepository(session)
+        self.states = SensorStateRepository(session)
+        self.climate = ClimateDataRepository(session)
+        self.predictor = predictor
+        self.fleet = fleet
+
+    @invalidates('irrigation_predictions')
+    def score_sensors(self, now: Optional[datetime] = None) -> int:
+        """
+        Gera uma predição para cada sensor com leitura. Retorna a quantidade gravada.
+        """
+        states = self.states.list_columns()
+        if not states['sensor_id']:
+            logger.info("Nenhum sensor com leituras para pontuar")
+            return 0
+        climate = self.climate.get_latest()
+        if climate is None:
+            logger.warning("Sem dados climáticos: predições não geradas")
+            return 0
+
+        # Matriz na ordem de FEATURES: colunas do estado dos sensores e o clima atual repetido
+        columns = {name: np.asarray(states[name], dtype=float) for name in SENSOR_FEATURES}
+        columns.update({name: np.full(len(states['sensor_id']), float(getattr(climate, name)))
+                        for name in CLIMATE_FEATURES})
+        data = np.column_stack([columns[name] for name in FEATURES])
+
+        if self.fleet is not None:
+            segments = sensor_segments(self.repo.session, self.fleet.by)
+            result = self.fleet.predict_batch([segments.get(sensor_id) for sensor_id in states['sensor_id']], data)
+        else:
+            result = (self.predictor or get_predictor()).predict_batch(data)
+        if result is None:
+            return 0
+        should_irrigate, confidence = result
+
+        predicted_at = (now or datetime.now(timezone.utc)).replace(tzinfo=None)
+        rows = [
+            {
+                'id': str(uuid.uuid4()),
+                'sensor_id': sensor_id,
+                'record_id': record_id,
+                'climate_id': climate.id,
+                'predicted_at': predicted_at,
+                'should_irrigate': bool(irrigate),
+                'confidence': float(score)
+            }
+            for sensor_id, record_id, irrigate, score in zip(
+                states['sensor_id'], states['record_id'], should_irrigate, confidence
+            )
+        ]
+        try:
+            count = self.repo.create_many(rows)
+        except SQLAlchemyError as e:
+            self.repo.session.rollback()
+            raise e
+        logger.info(f"Predições geradas para {count} sensores ({int(should_irrigate.sum())} com irrigação recomendada)")
+        return count
+
+    def list_last_predictions(self) -> List[IrrigationPredictionRow]:
+        return self.repo.get_last_run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--interval', type=float, default=None,
+                        help='Segundos entre execuções; sem valor, executa uma vez')
+    parser.add_argument('--fleet', choices=sorted(SEGMENTS), default=None,
+                        help='Usa os modelos por cultura (ver model_fleet.py) em vez do modelo global')
+    args = parser.parse_args()
+
+    session = get_session()
+    service = IrrigationPredictionService(session, fleet=get_fleet(args.fleet) if args.fleet else None)
+    try:
+        while True:
+            try:
+                service.score_sensors()
+            except SQLAlchemyError as e:
+                logger.exception(f"[ERRO] Falha ao gerar predições: {e}")
+            if args.interval is None:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_session()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,21 @@
-from typing import List, Optional, Dict
+from typing import Iterator, List, Optional, Dict
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime, date
 
 from database import ProducerRepository
+from database.repositories.base import DEFAULT_PAGE_SIZE, DEFAULT_CHUNK_SIZE
+from database.instrumentation import instrument_service
+from database.projections import ProducerRow, entity_dict
+from services.cache import invalidates
 
 
+@instrument_service
 class ProducerService:
     def __init__(self, session: Session):
         self.repo = ProducerRepository(session)
 
+    @invalidates('producers')
     def create_producer(self, data: dict) -> dict:
         try:
             producer = self.repo.create(
@@ -17,26 +23,34 @@ class ProducerService:
                 email=data['email'],
                 phone=data['phone']
             )
-            return producer.__dict__
+            return entity_dict(producer)
         except SQLAlchemyError as e:
             self.repo.session.rollback()
             raise e
 
     def get_producer(self, producer_id: str) -> Optional[dict]:
         producer = self.repo.get_by_id(producer_id)
-        return producer.__dict__ if producer else None
+        return entity_dict(producer) if producer else None
 
     def list_producers(self) -> List[dict]:
-        return [producer.__dict__ for producer in self.repo.get_all()]
+        return self.repo.list_dicts()
 
+    def list_producers_rows(self) -> List[ProducerRow]:
+        return self.repo.list_rows()
+
+    def producers_columns(self) -> Dict[str, list]:
+        return self.repo.list_columns()
+
+    @invalidates('producers')
     def update_producer(self, producer_id: str, data: dict) -> Optional[dict]:
         try:
             updated_producer = self.repo.update(producer_id, **data)
-            return updated_producer.__dict__ if updated_producer else None
+            return entity_dict(updated_producer) if updated_producer else None
         except SQLAlchemyError as e:
             self.repo.session.rollback()
             raise e
 
+    @invalidates('producers', cascade=True)
     def delete_producer(self, producer_id: str) -> bool:
         try:
             return self.repo.delete(producer_id)
@@ -45,4 +59,25 @@ class ProducerService:
             raise e
 
     def get_producer_crops(self, producer_id: str) -> List[dict]:
-        return self.repo.get_crops_by_producer(producer_id)
\ No newline at end of file
+        return self.repo.get_crops_by_producer(producer_id)
+
+    def get_producer_tree(self, producer_id: Optional[str] = None) -> List[dict]:
+        """
+        Produtores com culturas, componentes e aplicações, em número constante de consultas.
+        """
+        return self.repo.get_producer_tree(producer_id)
+
+    def list_producers_page(self, cursor: Optional[tuple] = None, page_size: int = DEFAULT_PAGE_SIZE) -> dict:
+        """
+        Uma página da listagem (paginação por keyset). Passe `next_cursor` para obter a próxima.
+        """
+        page = self.repo.get_page(cursor, page_size)
+        return {'items': [entity_dict(producer) for producer in page.items], 'next_cursor': page.next_cursor}
+
+    def iter_producers(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict]:
+        """
+        Percorre todos os registros em streaming, em memória constante.
+        """
+        for chunk in self.repo.stream_chunks(chunk_size, columns=self.repo.row_columns):
+            for row in chunk:
+                yield dict(row._mapping)
@@ -0,0 +1,82 @@
+"""
+Atualização das agregações horárias e diárias dos registros de sensores.
+
+Cada execução agrega apenas os registros novos desde a última marca d'água, então o
+custo é proporcional ao volume recebido no intervalo e não ao histórico inteiro.
+
+Uso (na pasta src/python):
+    python -m services.rollup_service               # uma atualização
+    python -m services.rollup_service --interval 300  # a cada 5 minutos
+    python -m services.rollup_service --rebuild       # reprocessa todo o histórico
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import SensorRollupRepository
+from database.connection import get_session, close_session
+from database.instrumentation import instrument_service
+from logs.logger import Logger
+
+logger = Logger(__name__)()
+
+
+@instrument_service
+class SensorRollupService:
+    def __init__(self, session: Session):
+        self.repo = SensorRollupRepository(session)
+
+    def refresh(self, lag: timedelta = timedelta(minutes=5), now: Optional[datetime] = None) -> int:
+        try:
+            processed = self.repo.refresh(lag, now)
+            logger.info(f"Agregações atualizadas: {processed} registros até {self.repo.get_watermark()}")
+            return processed
+        except SQLAlchemyError as e:
+            self.repo.session.rollback()
+            raise e
+
+    def rebuild(self, lag: timedelta = timedelta(minutes=5), now: Optional[datetime] = None) -> int:
+        try:
+            processed = self.repo.rebuild(lag, now)
+            logger.info(f"Agregações reconstruídas: {processed} registros")
+            return processed
+        except SQLAlchemyError as e:
+            self.repo.session.rollback()
+            raise e
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--interval', type=float, default=None,
+                        help='Segundos entre atualizações; sem valor, executa uma vez')
+    parser.add_argument('--lag', type=float, default=300,
+                        help='Segundos de atraso tolerado para leituras ainda em trânsito')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Descarta as agregações e reprocessa o histórico (após cargas retroativas)')
+    args = parser.parse_args()
+
+    session = get_session()
+    service = SensorRollupService(session)
+    try:
+        if args.rebuild:
+            service.rebuild(timedelta(seconds=args.lag))
+        while True:
+            try:
+                service.refresh(timedelta(seconds=args.lag))
+            except SQLAlchemyError as e:
+                logger.exception(f"[ERRO] Falha ao atualizar agregações: {e}")
+            if args.interval is None:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_session()
+
+
+if __name__ == "__main__":
+    main()
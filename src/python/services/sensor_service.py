@@ -1,47 +1,119 @@
-from typing import Optional, List
+from typing import Iterable, Iterator, Optional, List, Dict
+from collections import Counter
+from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
-from database import SensorRecordRepository
+from database import SensorRecord, SensorRecordRepository, SensorRollupRepository, unit_of_work
+from database.repositories.base import DEFAULT_PAGE_SIZE, DEFAULT_CHUNK_SIZE
+from database.instrumentation import instrument_service
+from database import downsampling
+from database.downsampling import DEFAULT_POINTS
+from database.projections import SensorRecordRow, entity_dict
+from services.cache import invalidates
 
 
+# Campos da leitura usados pela regra de irrigação
+IRRIGATION_FIELDS = ('soil_moisture', 'soil_ph', 'phosphorus_present', 'potassium_present')
+
+CHART_COLUMNS = ('timestamp', 'soil_moisture', 'soil_ph', 'phosphorus_present', 'potassium_present', 'irrigation_status')
+
+
+def should_irrigate(soil_moisture: float, soil_ph: float, phosphorus_present: bool, potassium_present: bool) -> bool:
+    """
+    Regra de irrigação aplicada a uma leitura de sensor.
+    """
+    return (
+        soil_moisture < 30.0 or  # Umidade muito baixa
+        soil_ph < 5.0 or soil_ph > 8.0 or  # pH fora do ideal
+        not phosphorus_present or  # Falta de fósforo
+        not potassium_present  # Falta de potássio
+    )
+
+
+def irrigation_status_for(reading) -> str:
+    """
+    Retorna o status de irrigação ("ATIVADA"/"DESLIGADA") para um dict de leitura.
+    """
+    irrigate = should_irrigate(
+        reading['soil_moisture'],
+        reading['soil_ph'],
+        reading['phosphorus_present'],
+        reading['potassium_present']
+    )
+    return "ATIVADA" if irrigate else "DESLIGADA"
+
+
+@instrument_service
 class SensorRecordService:
     def __init__(self, session: Session):
         self.repo = SensorRecordRepository(session)
+        self.rollups = SensorRollupRepository(session)
 
+    @invalidates('sensor_records', 'sensor_latest_state')
     def create_sensor_record(self, data: dict) -> dict:
         try:
+            # A regra de irrigação é avaliada antes do INSERT: um único commit por leitura
             record = self.repo.create(
                 sensor_id=data['sensor_id'],
                 soil_moisture=data['soil_moisture'],
                 phosphorus_present=data['phosphorus_present'],
                 potassium_present=data['potassium_present'],
                 soil_ph=data['soil_ph'],
-                irrigation_status=data.get('irrigation_status', 'DESLIGADA')
+                irrigation_status=irrigation_status_for(data)
             )
-            record = self._process_irrigation_logic(record)
-            return record.__dict__
+            return entity_dict(record)
+        except SQLAlchemyError as e:
+            self.repo.session.rollback()
+            raise e
+
+    @invalidates('sensor_records', 'sensor_latest_state')
+    def ingest_batch(self, readings: Iterable[dict]) -> int:
+        """
+        Ingere um lote de leituras: avalia a regra de irrigação em memória para
+        todo o lote e persiste tudo com um único INSERT executemany e um commit.
+        """
+        batch = [{**reading, 'irrigation_status': irrigation_status_for(reading)} for reading in readings]
+        try:
+            return self.repo.create_many(batch)
         except SQLAlchemyError as e:
             self.repo.session.rollback()
             raise e
 
     def get_sensor_record(self, record_id: str) -> Optional[dict]:
         record = self.repo.get_by_id(record_id)
-        return record.__dict__ if record else None
+        return entity_dict(record) if record else None
 
     def list_sensor_records(self) -> List[dict]:
-        return [record.__dict__ for record in self.repo.get_all()]
+        return self.repo.list_dicts()
+
+    def list_sensor_records_rows(self) -> List[SensorRecordRow]:
+        """
+        Linhas compactas (dataclasses com `__slots__`), sem objetos ORM: para tabelas grandes.
+        """
+        return self.repo.list_rows()
+
+    def sensor_records_columns(self) -> Dict[str, list]:
+        """
+        Formato colunar {coluna: [valores]}, pronto para `pd.DataFrame`.
+        """
+        return self.repo.list_columns()
 
+    @invalidates('sensor_records', 'sensor_latest_state')
     def update_sensor_record(self, record_id: str, data: dict) -> Optional[dict]:
-        try:
-            updated_record = self.repo.update(record_id, **data)
-            if updated_record:
-                updated_record = self._process_irrigation_logic(updated_record)
-            return updated_record.__dict__ if updated_record else None
-        except SQLAlchemyError as e:
-            self.repo.session.rollback()
-            raise e
+        # A irrigação é reavaliada sobre a leitura já com as alterações, antes da escrita: o estado
+        # atual e as agregações são recalculados uma vez, com a linha final, em um único commit
+        with unit_of_work(self.repo.session) as uow:
+            record = uow.sensor_records.get_by_id(record_id)
+            if record is None:
+                return None
+            merged = {**{field: getattr(record, field) for field in IRRIGATION_FIELDS}, **data}
+            updated_record = uow.sensor_records.update(
+                record_id, **{**data, 'irrigation_status': irrigation_status_for(merged)}
+            )
+        return entity_dict(updated_record)
 
+    @invalidates('sensor_records', 'sensor_latest_state')
     def delete_sensor_record(self, record_id: str) -> bool:
         try:
             return self.repo.delete(record_id)
@@ -50,22 +122,78 @@ class SensorRecordService:
             raise e
 
     def list_records_by_sensor(self, sensor_id: str) -> List[dict]:
-        return [record.__dict__ for record in self.repo.get_by_sensor(sensor_id)]
+        return self.repo.list_dicts(filters=[SensorRecord.sensor_id == sensor_id])
 
     def get_latest_record_by_sensor(self, sensor_id: str) -> Optional[dict]:
         record = self.repo.get_latest_by_sensor(sensor_id)
-        return record.__dict__ if record else None
-
-    def get_average_values_by_sensor(self, sensor_id: str) -> dict:
-        return self.repo.get_average_values_by_sensor(sensor_id)
-
-    def _process_irrigation_logic(self, record) -> SensorRecordRepository:
-        should_irrigate = (
-            record.soil_moisture < 30.0 or  # Umidade muito baixa
-            record.soil_ph < 5.0 or record.soil_ph > 8.0 or  # pH fora do ideal
-            not record.phosphorus_present or  # Falta de fósforo
-            not record.potassium_present  # Falta de potássio
-        )
-        record.irrigation_status = "ATIVADA" if should_irrigate else "DESLIGADA"
-        self.repo.session.commit()
-        return record
+        return entity_dict(record) if record else None
+
+    def get_current_states(self) -> List[dict]:
+        """
+        Leitura mais recente de cada sensor (custo proporcional à quantidade de sensores).
+        """
+        return self.repo.states.get_all_states()
+
+    def get_crop_states(self) -> List[dict]:
+        """
+        Estado atual de cada cultura, agregado a partir do estado dos seus sensores.
+        """
+        return self.repo.states.get_crop_states()
+
+    def get_average_values_by_sensor(self, sensor_id: str, start_date: datetime = None, end_date: datetime = None) -> dict:
+        # Lê as agregações horárias/diárias e só os registros brutos ainda não agregados
+        summary = self.rollups.get_summary(sensor_id, start_date, end_date)
+        return {
+            'soil_moisture': summary['soil_moisture_avg'] or 0,
+            'soil_ph': summary['soil_ph_avg'] or 0,
+            'phosphorus_present': summary['phosphorus_ratio'] or 0,
+            'potassium_present': summary['potassium_ratio'] or 0
+        }
+
+    def get_sensor_summary(self, sensor_id: str, start_date: datetime = None, end_date: datetime = None) -> dict:
+        """
+        Contagem, mínimos, máximos e médias do sensor no intervalo.
+        """
+        return self.rollups.get_summary(sensor_id, start_date, end_date)
+
+    def get_sensor_series(self, sensor_id: str, start_date: datetime, end_date: datetime,
+                          resolution: timedelta = timedelta(hours=1)) -> List[dict]:
+        """
+        Série agregada do sensor na resolução pedida (horária, diária ou registros brutos).
+        """
+        return self.rollups.get_series(sensor_id, start_date, end_date, resolution)
+
+    def get_chart_series(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                         points: int = DEFAULT_POINTS, sensor_id: Optional[str] = None) -> dict:
+        """
+        Séries dos gráficos no intervalo, reduzidas a até `points` pontos: umidade e pH por
+        LTTB, status da irrigação (1 = ATIVADA) por mínimo/máximo, e contagem de nutrientes.
+        """
+        filters = [SensorRecord.sensor_id == sensor_id] if sensor_id else []
+        columns = self.repo.get_window(CHART_COLUMNS, start_date, end_date, filters)
+        columns['irrigation_active'] = [int(status == "ATIVADA") for status in columns['irrigation_status']]
+        return {
+            'count': len(columns['timestamp']),
+            'soil_moisture': downsampling.lttb(columns, 'timestamp', 'soil_moisture', points),
+            'soil_ph': downsampling.lttb(columns, 'timestamp', 'soil_ph', points),
+            'irrigation': downsampling.min_max(columns, 'timestamp', 'irrigation_active', points),
+            'nutrients': {
+                'phosphorus_present': dict(Counter(map(bool, columns['phosphorus_present']))),
+                'potassium_present': dict(Counter(map(bool, columns['potassium_present'])))
+            }
+        }
+
+    def list_sensor_records_page(self, cursor: Optional[tuple] = None, page_size: int = DEFAULT_PAGE_SIZE) -> dict:
+        """
+        Uma página da listagem (paginação por keyset). Passe `next_cursor` para obter a próxima.
+        """
+        page = self.repo.get_page(cursor, page_size)
+        return {'items': [entity_dict(record) for record in page.items], 'next_cursor': page.next_cursor}
+
+    def iter_sensor_records(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict]:
+        """
+        Percorre todos os registros em streaming, em memória constante.
+        """
+        for chunk in self.repo.stream_chunks(chunk_size, columns=self.repo.row_columns):
+            for row in chunk:
+                yield dict(row._mapping)
@@ -0,0 +1,159 @@
+"""
+Conexão serial persistente com o ESP32.
+
+Abrir a porta reinicia a placa (sinal DTR) e exige aguardar o boot, por isso a conexão
+é aberta uma única vez por porta e reaproveitada entre envios. Falhas de escrita
+fecham a conexão, que é reaberta sob demanda no próximo envio. Payloads enfileirados
+são agrupados em uma única escrita.
+"""
+import atexit
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import serial
+
+from logs.logger import Logger
+
+logger = Logger(__name__)()
+
+
+class SerialLink:
+    """
+    Conexão serial gerenciada para uma porta.
+
+    `settle_time` é a espera após abrir a porta, enquanto o ESP32 reinicia; ela só
+    ocorre na abertura (ou reabertura) da conexão, nunca a cada envio. Enquanto a porta
+    estiver indisponível, no máximo `max_pending` payloads ficam pendentes (os mais
+    antigos são descartados).
+    """
+    def __init__(self, port: str, baudrate: int = 115200, timeout: float = 2.0,
+                 settle_time: float = 2.0, max_pending: int = 100, max_samples: int = 1000):
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.settle_time = settle_time
+        self.connection: Optional[serial.Serial] = None
+        self.opens = 0
+        self.writes = 0
+        self.payloads = 0
+        self.errors = 0
+        self._pending = deque(maxlen=max_pending)
+        self._latencies = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def enqueue(self, payload: str):
+        """
+        Enfileira um payload (uma linha JSON) para o próximo `flush`.
+        """
+        with self._lock:
+            self._pending.append(payload)
+
+    def send(self, payload: str) -> int:
+        """
+        Enfileira o payload e envia tudo o que estiver pendente.
+        """
+        self.enqueue(payload)
+        return self.flush()
+
+    def flush(self) -> int:
+        """
+        Envia os payloads pendentes em uma única escrita. Em caso de falha a conexão
+        é reaberta uma vez; se a nova tentativa falhar, os payloads continuam pendentes
+        e a exceção é propagada. Retorna a quantidade de payloads enviados.
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            data = "".join(f"{payload}\n" for payload in self._pending).encode()
+            start = time.perf_counter()
+            try:
+                self._write(data)
+            except serial.SerialException as e:
+                self.errors += 1
+                logger.warning(f"[ERRO] Falha na porta {self.port}, reconectando: {e}")
+                self._close()
+                self._write(data)
+
+            self._latencies.append(time.perf_counter() - start)
+            sent = len(self._pending)
+            self.writes += 1
+            self.payloads += sent
+            self._pending.clear()
+            return sent
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def stats(self) -> dict:
+        """
+        Estatísticas de envio; latências em milissegundos.
+        """
+        with self._lock:
+            latencies = sorted(latency * 1000 for latency in self._latencies)
+            pending = len(self._pending)
+        summary = {
+            'port': self.port,
+            'opens': self.opens,
+            'writes': self.writes,
+            'payloads': self.payloads,
+            'errors': self.errors,
+            'pending': pending,
+            'samples': len(latencies)
+        }
+        if latencies:
+            summary.update({
+                'mean_ms': statistics.fmean(latencies),
+                'p50_ms': latencies[len(latencies) // 2],
+                'p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                'max_ms': latencies[-1]
+            })
+        return summary
+
+    def _write(self, data: bytes):
+        if self.connection is None or not self.connection.is_open:
+            self._open()
+        self.connection.write(data)
+        self.connection.flush()
+
+    def _open(self):
+        self.connection = serial.Serial(self.port, self.baudrate, timeout=self.timeout, write_timeout=self.timeout)
+        self.opens += 1
+        if self.settle_time:
+            time.sleep(self.settle_time)
+        logger.info(f"[OK] Porta serial {self.port} aberta")
+
+    def _close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except (serial.SerialException, OSError):
+                pass
+            finally:
+                self.connection = None
+
+
+_links: Dict[str, SerialLink] = {}
+_links_lock = threading.Lock()
+
+
+def get_serial_link(port: str, **kwargs) -> SerialLink:
+    """
+    Retorna a conexão persistente da porta, criando-a no primeiro uso.
+    """
+    with _links_lock:
+        link = _links.get(port)
+        if link is None:
+            link = _links[port] = SerialLink(port, **kwargs)
+        return link
+
+
+@atexit.register
+def close_all_links():
+    with _links_lock:
+        for link in _links.values():
+            link.close()
+        _links.clear()
@@ -0,0 +1,369 @@
+"""
+Daemon de ingestão da telemetria serial do ESP32.
+
+O firmware (src/esp32/src/main.cpp) imprime, a cada ciclo, duas linhas de interesse:
+
+    Umidade: 45.20% | Fosforo: Presente | Potassio: Ausente | pH: 6.5   (linha humana)
+    Umidade:45.20,pH:6.50,Irrigacao:100                                 (linha do Serial Plotter)
+
+seguidas de "Irrigação: ATIVADA" ou "Irrigação: DESLIGADA". As portas são lidas com I/O
+não bloqueante (selectors), as leituras montadas por porta e enfileiradas em uma fila
+limitada; uma thread de escrita agrupa as leituras em micro-lotes e as grava com
+`SensorRecordRepository.create_many`. Quando a fila enche, a leitura das portas pausa
+(backpressure) até o banco drenar a fila.
+
+Uso (na pasta src/python):
+    python -m services.telemetry_ingestion --port /dev/ttyUSB0=<sensor_id>
+"""
+import argparse
+import math
+import queue
+import re
+import selectors
+import signal
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import serial
+
+from database import SensorRecordRepository
+from database.connection import get_session, close_session
+from logs.logger import Logger
+
+logger = Logger(__name__)()
+
+_NUMBER = r"(?:nan|-?\d+(?:\.\d+)?)"
+
+HUMAN_LINE = re.compile(
+    rf"^Umidade:\s+(?P<moisture>{_NUMBER})%?\s*\|\s*F[oó]sforo:\s*(?P<phosphorus>Presente|Ausente)"
+    rf"\s*\|\s*Pot[aá]ssio:\s*(?P<potassium>Presente|Ausente)\s*\|\s*pH:\s*(?P<ph>{_NUMBER})$",
+    re.IGNORECASE
+)
+PLOTTER_LINE = re.compile(
+    rf"^Umidade:(?P<moisture>{_NUMBER}),pH:(?P<ph>{_NUMBER}),Irrigacao:(?P<irrigation>\d+)$",
+    re.IGNORECASE
+)
+STATUS_LINE = re.compile(r"^Irriga[çc][ãa]o:\s*(?P<status>ATIVADA|DESLIGADA)$", re.IGNORECASE)
+
+
+def parse_line(line: str) -> Optional[dict]:
+    """
+    Interpreta uma linha da serial. Retorna um dict com a chave `kind`
+    ('reading', 'plotter' ou 'status') ou None para linhas desconhecidas/inválidas.
+    """
+    line = line.strip()
+    match = HUMAN_LINE.match(line)
+    if match:
+        moisture, ph = float(match['moisture']), float(match['ph'])
+        if math.isnan(moisture) or math.isnan(ph):
+            return None
+        return {
+            'kind': 'reading',
+            'soil_moisture': moisture,
+            'phosphorus_present': match['phosphorus'].lower() == 'presente',
+            'potassium_present': match['potassium'].lower() == 'presente',
+            'soil_ph': ph
+        }
+    match = PLOTTER_LINE.match(line)
+    if match:
+        moisture, ph = float(match['moisture']), float(match['ph'])
+        if math.isnan(moisture) or math.isnan(ph):
+            return None
+        return {
+            'kind': 'plotter',
+            'soil_moisture': moisture,
+            'soil_ph': ph,
+            'irrigation_status': "ATIVADA" if int(match['irrigation']) > 0 else "DESLIGADA"
+        }
+    match = STATUS_LINE.match(line)
+    if match:
+        return {'kind': 'status', 'irrigation_status': match['status'].upper()}
+    return None
+
+
+class ReadingAssembler:
+    """
+    Monta leituras completas de um sensor a partir das linhas interpretadas de uma porta.
+
+    A linha humana abre uma leitura; a linha do plotter e a linha de status completam o
+    status da irrigação, e a linha de status fecha a leitura. Uma linha do plotter sem
+    leitura aberta gera uma leitura com os nutrientes da última leitura conhecida.
+    """
+    def __init__(self, sensor_id: str):
+        self.sensor_id = sensor_id
+        self.pending: Optional[dict] = None
+        self.last: Optional[dict] = None
+
+    def feed(self, parsed: dict, timestamp: datetime) -> List[dict]:
+        completed = []
+        kind = parsed['kind']
+        if kind == 'reading':
+            if self.pending:
+                completed.append(self._complete())
+            self.pending = {
+                'sensor_id': self.sensor_id,
+                'soil_moisture': parsed['soil_moisture'],
+                'phosphorus_present': parsed['phosphorus_present'],
+                'potassium_present': parsed['potassium_present'],
+                'soil_ph': parsed['soil_ph'],
+                'timestamp': timestamp
+            }
+        elif kind == 'plotter':
+            if self.pending:
+                self.pending['irrigation_status'] = parsed['irrigation_status']
+            elif self.last:
+                completed.append({
+                    **self.last,
+                    'soil_moisture': parsed['soil_moisture'],
+                    'soil_ph': parsed['soil_ph'],
+                    'irrigation_status': parsed['irrigation_status'],
+                    'timestamp': timestamp
+                })
+                self.last = completed[-1]
+        elif kind == 'status' and self.pending:
+            self.pending['irrigation_status'] = parsed['irrigation_status']
+            completed.append(self._complete())
+        return completed
+
+    def flush(self) -> List[dict]:
+        return [self._complete()] if self.pending else []
+
+    def _complete(self) -> dict:
+        reading = self.pending
+        reading.setdefault('irrigation_status', "DESLIGADA")
+        self.pending = None
+        self.last = reading
+        return reading
+
+
+class SerialPortReader:
+    """
+    Leitor não bloqueante de uma porta serial, com buffer de linhas parciais.
+    """
+    def __init__(self, port: str, sensor_id: str, baudrate: int = 115200):
+        self.port = port
+        self.baudrate = baudrate
+        self.assembler = ReadingAssembler(sensor_id)
+        self.connection: Optional[serial.Serial] = None
+        self._buffer = bytearray()
+
+    def open(self) -> serial.Serial:
+        self.connection = serial.Serial(self.port, self.baudrate, timeout=0)
+        self._buffer.clear()
+        return self.connection
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            finally:
+                self.connection = None
+
+    def fileno(self) -> int:
+        return self.connection.fileno()
+
+    def read_lines(self) -> List[str]:
+        """
+        Lê o que estiver disponível na porta e retorna as linhas completas.
+        """
+        data = self.connection.read(self.connection.in_waiting or 1)
+        if not data:
+            return []
+        self._buffer.extend(data)
+        *lines, rest = self._buffer.split(b"\n")
+        self._buffer = bytearray(rest)
+        return [line.decode("utf-8", errors="replace").strip() for line in lines]
+
+
+def repository_sink(batch: List[dict]):
+    """
+    Grava um micro-lote de leituras com um único INSERT e um único commit.
+    """
+    session = get_session()
+    try:
+        SensorRecordRepository(session).create_many(batch)
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        close_session()
+
+
+class TelemetryIngestionDaemon:
+    """
+    Lê uma ou mais portas seriais e grava as leituras em micro-lotes.
+
+    `ports` mapeia o caminho da porta para o `sensor_id` do componente cadastrado.
+    `sink` recebe cada micro-lote; por padrão grava via `SensorRecordRepository`.
+    """
+    def __init__(self, ports: Dict[str, str], sink: Callable[[List[dict]], None] = repository_sink,
+                 batch_size: int = 500, flush_interval: float = 1.0, queue_size: int = 10000,
+                 baudrate: int = 115200, reconnect_interval: float = 5.0):
+        self.readers = [SerialPortReader(port, sensor_id, baudrate) for port, sensor_id in ports.items()]
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.reconnect_interval = reconnect_interval
+        self.queue: "queue.Queue[dict]" = queue.Queue(maxsize=queue_size)
+        self.stats = {'lines': 0, 'readings': 0, 'written': 0, 'failed': 0, 'batches': 0, 'backpressure': 0}
+        self._stop = threading.Event()
+        self._reader_done = threading.Event()
+        self._selector = selectors.DefaultSelector()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        for reader in self.readers:
+            self._connect(reader)
+        self._stop.clear()
+        self._reader_done.clear()
+        self._threads = [
+            threading.Thread(target=self._read_loop, name="telemetry-reader", daemon=True),
+            threading.Thread(target=self._write_loop, name="telemetry-writer", daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"[OK] Ingestão iniciada em {len(self.readers)} porta(s)")
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        for reader in self.readers:
+            if reader.connection is not None:
+                self._selector.unregister(reader.connection)
+            reader.close()
+        logger.info(f"[OK] Ingestão encerrada: {self.stats}")
+
+    def run_forever(self):
+        """
+        Executa até receber SIGINT/SIGTERM.
+        """
+        self.start()
+        signal.signal(signal.SIGTERM, lambda *_: self._stop.set())
+        try:
+            while not self._stop.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _connect(self, reader: SerialPortReader) -> bool:
+        try:
+            self._selector.register(reader.open(), selectors.EVENT_READ, reader)
+            return True
+        except (serial.SerialException, OSError) as e:
+            logger.error(f"[ERRO] Porta serial {reader.port} indisponível: {e}")
+            reader.close()
+            return False
+
+    def _disconnect(self, reader: SerialPortReader):
+        self._selector.unregister(reader.connection)
+        reader.close()
+
+    def _read_loop(self):
+        last_reconnect = time.monotonic()
+        while not self._stop.is_set():
+            if not self._selector.get_map():
+                self._stop.wait(0.2)
+            else:
+                for key, _ in self._selector.select(timeout=0.2):
+                    self._drain(key.data)
+
+            if time.monotonic() - last_reconnect >= self.reconnect_interval:
+                last_reconnect = time.monotonic()
+                for reader in self.readers:
+                    if reader.connection is None:
+                        self._connect(reader)
+
+        for reader in self.readers:
+            for reading in reader.assembler.flush():
+                self._enqueue(reading)
+        self._reader_done.set()
+
+    def _drain(self, reader: SerialPortReader):
+        try:
+            lines = reader.read_lines()
+        except (serial.SerialException, OSError) as e:
+            logger.error(f"[ERRO] Falha de leitura na porta {reader.port}: {e}")
+            self._disconnect(reader)
+            return
+        timestamp = datetime.now(timezone.utc)
+        for line in lines:
+            self.stats['lines'] += 1
+            parsed = parse_line(line)
+            if parsed is None:
+                continue
+            for reading in reader.assembler.feed(parsed, timestamp):
+                self._enqueue(reading)
+
+    def _enqueue(self, reading: dict):
+        self.stats['readings'] += 1
+        try:
+            self.queue.put_nowait(reading)
+        except queue.Full:
+            # Fila cheia: a leitura das portas fica bloqueada até o banco drenar a fila
+            self.stats['backpressure'] += 1
+            self.queue.put(reading)
+
+    def _write_loop(self):
+        batch: List[dict] = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            reader_done = self._reader_done.is_set()
+            try:
+                timeout = 0 if reader_done else max(0.0, min(0.2, deadline - time.monotonic()))
+                batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                pass
+            expired = time.monotonic() >= deadline
+            drained = reader_done and self.queue.empty()
+            if batch and (len(batch) >= self.batch_size or expired or drained):
+                self._flush(batch)
+                batch = []
+            if expired:
+                deadline = time.monotonic() + self.flush_interval
+            if drained and not batch:
+                return
+
+    def _flush(self, batch: List[dict]):
+        try:
+            self.sink(batch)
+            self.stats['written'] += len(batch)
+            self.stats['batches'] += 1
+        except Exception as e:
+            self.stats['failed'] += len(batch)
+            logger.exception(f"[ERRO] Falha ao gravar lote de {len(batch)} leituras: {e}")
+
+
+def _parse_port(value: str):
+    port, sep, sensor_id = value.partition("=")
+    if not sep or not port or not sensor_id:
+        raise argparse.ArgumentTypeError("use o formato PORTA=SENSOR_ID")
+    return port, sensor_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=_parse_port, action='append', required=True,
+                        help='Porta serial e sensor associado, ex.: /dev/ttyUSB0=<sensor_id>')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--flush-interval', type=float, default=1.0)
+    parser.add_argument('--queue-size', type=int, default=10000)
+    parser.add_argument('--baudrate', type=int, default=115200)
+    args = parser.parse_args()
+
+    daemon = TelemetryIngestionDaemon(
+        dict(args.port),
+        batch_size=args.batch_size,
+        flush_interval=args.flush_interval,
+        queue_size=args.queue_size,
+        baudrate=args.baudrate
+    )
+    daemon.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Cliente da API OpenWeatherMap com sessão HTTP reaproveitada, cache por localidade e
+busca concorrente de várias localidades.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from logs.logger import Logger
+
+logger = Logger(__name__)()
+
+DEFAULT_BASE_URL = "http://api.openweathermap.org/data/2.5/weather"
+
+
+class WeatherClient:
+    """
+    Busca o clima atual por localidade.
+
+    As respostas ficam em cache por `ttl` segundos, e as conexões HTTP são mantidas em
+    um pool compartilhado pelas threads de `fetch_many`.
+    """
+    def __init__(self, api_key: str, base_url: str = DEFAULT_BASE_URL, ttl: float = 600.0,
+                 timeout: Tuple[float, float] = (3.05, 10.0), max_workers: int = 8, retries: int = 2):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.hits = 0
+        self.misses = 0
+        self._cache: Dict[str, Tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=max_workers,
+            pool_maxsize=max_workers,
+            max_retries=Retry(total=retries, backoff_factor=0.3, status_forcelist=(429, 502, 503, 504))
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch(self, location: str) -> Optional[dict]:
+        """
+        Retorna temperatura, umidade e previsão de chuva da localidade,
+        usando o cache enquanto a resposta não expirar. Retorna None em caso de erro.
+        """
+        key = location.strip().lower()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        data = self._request(location)
+        if data is not None:
+            with self._lock:
+                self._cache[key] = (time.monotonic() + self.ttl, data)
+        return data
+
+    def fetch_many(self, locations: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """
+        Busca várias localidades em paralelo. Retorna um dict localidade -> dados.
+        """
+        unique = list(dict.fromkeys(locations))
+        if not unique:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(unique))) as executor:
+            return dict(zip(unique, executor.map(self.fetch, unique)))
+
+    def invalidate(self, location: Optional[str] = None):
+        with self._lock:
+            if location is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(location.strip().lower(), None)
+
+    def close(self):
+        self.session.close()
+
+    def _request(self, location: str) -> Optional[dict]:
+        params = {'q': location, 'appid': self.api_key, 'units': 'metric', 'lang': 'pt_br'}
+        try:
+            response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+            logger.debug(f"Resposta da API para {location}: {data}")
+            return {
+                "temperature": data["main"]["temp"],
+                "air_humidity": data["main"]["humidity"],
+                "rain_forecast": "rain" in data
+            }
+        except requests.exceptions.HTTPError as http_err:
+            logger.error(f"[ERRO] Erro HTTP ({location}): {http_err}")
+        except requests.exceptions.RequestException as err:
+            logger.error(f"[ERRO] Falha ao conectar à API ({location}): {err}")
+        except (KeyError, ValueError) as e:
+            logger.error(f"[ERRO] Resposta inesperada da API ({location}): {e}")
+        return None
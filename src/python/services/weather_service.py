@@ -1,11 +1,13 @@
 import os
-import time
 import json
 import serial
-import requests
+from typing import Dict, Iterable, List, Optional
 
+from database.connection import get_session
 from logs.logger import Logger
-from services.climate_service import create_climate_data
+from services.climate_service import ClimateService
+from services.serial_link import get_serial_link
+from services.weather_client import WeatherClient
 
 logger = Logger(__name__)() 
 
@@ -13,78 +15,109 @@ logger = Logger(__name__)()
 SERIAL_DOOR = os.getenv("PORTA_SERIAL", "/dev/ttyUSB0")
 API_KEY = os.getenv("OPEN_WEATHER_API_KEY")
 CITY = os.getenv("OPEN_WEATHER_CITY")
+WEATHER_CACHE_TTL = float(os.getenv("OPEN_WEATHER_CACHE_TTL", "600"))
 
 
-def send_to_serial(json_data: str):
+def send_to_serial(json_data: str, port: Optional[str] = None):
     """
-    Envia dados JSON ao ESP32 via conexão serial.
+    Envia dados JSON ao ESP32 via conexão serial persistente.
     """
-    try:
-        with serial.Serial(SERIAL_DOOR, 115200, timeout=2) as ser:
-            time.sleep(2)
-            ser.write((json_data + "\n").encode())
-            logger.info("[OK] Dados enviados ao ESP32 via serial")
-    except serial.SerialException as e:
-        logger.error(f"[ERRO] Porta serial indisponível: {e}")
-    except Exception as e:
-        logger.exception(f"[ERRO] Erro inesperado ao enviar dados via serial: {e}")
+    send_to_devices(json_data, [port or SERIAL_DOOR])
 
 
-def fetch_weather_data():
+def send_to_devices(json_data: str, ports: Iterable[str]):
     """
-    Busca dados climáticos atuais da API OpenWeatherMap.
-    Retorna um dicionário com: temperatura, umidade e previsão de chuva.
+    Envia o mesmo payload JSON a vários ESP32, um por porta serial.
+    A porta só é aberta (e a placa reiniciada) no primeiro envio.
     """
-    if not API_KEY or not CITY:
-        raise ValueError("API_KEY ou CIDADE não configurados no .env")
+    for port in ports:
+        link = get_serial_link(port)
+        try:
+            link.send(json_data)
+            logger.info(f"[OK] Dados enviados ao ESP32 via serial ({port})")
+        except serial.SerialException as e:
+            logger.error(f"[ERRO] Porta serial {port} indisponível: {e}")
+        except Exception as e:
+            logger.exception(f"[ERRO] Erro inesperado ao enviar dados via serial: {e}")
 
-    url = f"http://api.openweathermap.org/data/2.5/weather?q={CITY}&appid={API_KEY}&units=metric&lang=pt_br"
 
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
+_weather_client: Optional[WeatherClient] = None
 
-        data = response.json()
 
-        print(f"Response from API: {data}")
+def get_weather_client() -> WeatherClient:
+    """
+    Retorna o cliente de clima do processo (sessão HTTP e cache compartilhados).
+    """
+    global _weather_client
+    if not API_KEY:
+        raise ValueError("API_KEY não configurada no .env")
+    if _weather_client is None:
+        _weather_client = WeatherClient(API_KEY, ttl=WEATHER_CACHE_TTL)
+    return _weather_client
 
-        return {
-            "temperature": data["main"]["temp"],
-            "air_humidity": data["main"]["humidity"],
-            "rain_forecast": "rain" in data
-        }
 
-    except requests.exceptions.HTTPError as http_err:
-        print(f"[ERRO] Erro HTTP: {http_err}")
-    except requests.exceptions.RequestException as err:
-        print(f"[ERRO] Falha ao conectar à API: {err}")
-    except Exception as e:
-        print(f"[ERRO] Erro inesperado: {e}")
+def configured_locations() -> List[str]:
+    """
+    Localidades configuradas: OPEN_WEATHER_CITIES (separadas por vírgula) ou OPEN_WEATHER_CITY.
+    """
+    cities = [city.strip() for city in os.getenv("OPEN_WEATHER_CITIES", "").split(",") if city.strip()]
+    return cities or ([CITY] if CITY else [])
+
 
-    return None
+def fetch_weather_data(city: Optional[str] = None):
+    """
+    Busca dados climáticos atuais da API OpenWeatherMap.
+    Retorna um dicionário com: temperatura, umidade e previsão de chuva.
+    """
+    city = city or CITY
+    if not API_KEY or not city:
+        raise ValueError("API_KEY ou CIDADE não configurados no .env")
+    return get_weather_client().fetch(city)
 
 
-def run_weather_integration():
+def fetch_weather_data_many(cities: Iterable[str]) -> Dict[str, Optional[dict]]:
+    """
+    Busca os dados climáticos de várias localidades em paralelo.
+    """
+    return get_weather_client().fetch_many(cities)
+
+
+def run_weather_integration(locations: Optional[List[str]] = None):
     """
     Executa o fluxo completo:
-    1. Busca dados do clima
-    2. Salva no banco de dados
-    3. Envia via serial ao ESP32
+    1. Busca dados do clima de todas as localidades em paralelo
+    2. Salva no banco de dados os dados da primeira localidade (principal)
+    3. Envia via serial ao ESP32 os dados da localidade principal
+
+    A tabela de clima não tem coluna de localidade e as culturas não têm localização:
+    só a localidade principal é gravada, para que a série climática usada pelo modelo e
+    pelo dashboard seja de uma única cidade. As demais ficam apenas no cache do cliente.
     """
     logger.info("Iniciando integração climática...")
 
     try:
-        data = fetch_weather_data()
-
+        locations = locations or configured_locations()
+        if not locations:
+            logger.warning("[ERRO] Nenhuma localidade configurada (OPEN_WEATHER_CITIES ou OPEN_WEATHER_CITY).")
+            return
+        results = fetch_weather_data_many(locations)
+        primary = locations[0]
+        for location in locations[1:]:
+            if results.get(location):
+                logger.info(f"[OK] Dados climáticos em cache ({location})")
+            else:
+                logger.warning(f"[ERRO] Dados climáticos não foram obtidos da API ({location}).")
+
+        data = results.get(primary)
         if not data:
-            logger.warning("[ERRO] Dados climáticos não foram obtidos da API.")
+            logger.warning(f"[ERRO] Dados climáticos não foram obtidos da API ({primary}).")
             return
 
-        logger.info("[OK] Dados climáticos obtidos com sucesso")
+        logger.info(f"[OK] Dados climáticos obtidos com sucesso ({primary})")
 
         # 1. Salva no banco de dados
         try:
-            record = create_climate_data(data)
+            record = ClimateService(get_session()).create_climate_data(data)
             logger.info(f"[OK] Registro salvo no banco: ID {record['id']}")
         except Exception as db_error:
             logger.exception(f"[ERRO] Falha ao salvar dados no banco: {db_error}")
@@ -95,7 +128,6 @@ def run_weather_integration():
             send_to_serial(json.dumps(data))
         except Exception as serial_error:
             logger.exception(f"[ERRO] Falha ao enviar dados via serial: {serial_error}")
-            return
 
     except Exception as e:
         logger.exception(f"[FATAL] Erro inesperado na integração climática: {e}")
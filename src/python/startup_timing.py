@@ -0,0 +1,69 @@
+"""
+Medição do tempo de inicialização dos pontos de entrada: quanto tempo levam os imports,
+a criação do engine e a primeira consulta ao banco.
+
+Os tempos são contados a partir do import deste módulo, que deve ser o primeiro import
+do ponto de entrada:
+
+    import startup_timing
+    ...  # demais imports
+    startup_timing.mark('imports')
+    ...
+    startup_timing.report('main')
+"""
+from logs.logger import Logger
+import threading
+import time
+from typing import Dict
+
+logger = Logger(__name__)()
+
+_START = time.perf_counter()
+_marks: Dict[str, float] = {}
+_reported = set()
+_lock = threading.Lock()
+
+
+def elapsed() -> float:
+    return time.perf_counter() - _START
+
+
+def mark(label: str) -> float:
+    """
+    Registra o instante (segundos desde o início) em que a etapa terminou.
+    Só a primeira ocorrência de cada etapa é mantida.
+    """
+    with _lock:
+        return _marks.setdefault(label, elapsed())
+
+
+def watch_first_query(engine):
+    """
+    Registra a etapa 'primeira consulta' quando o engine executar o primeiro comando.
+    """
+    from sqlalchemy import event
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        mark('primeira consulta')
+
+    event.listen(engine, "after_cursor_execute", on_execute, once=True)
+
+
+def marks() -> Dict[str, float]:
+    with _lock:
+        return dict(_marks)
+
+
+def report(entry_point: str) -> Dict[str, float]:
+    """
+    Escreve no log a linha do tempo da inicialização (uma vez por ponto de entrada,
+    mesmo que o script seja reexecutado, como no Streamlit) e a retorna.
+    """
+    timeline = marks()
+    with _lock:
+        if entry_point in _reported:
+            return timeline
+        _reported.add(entry_point)
+    steps = ", ".join(f"{label} {seconds:.3f}s" for label, seconds in sorted(timeline.items(), key=lambda item: item[1]))
+    logger.info(f"[startup] {entry_point}: {steps or 'sem etapas registradas'} (total {elapsed():.3f}s)")
+    return timeline
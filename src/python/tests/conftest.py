@@ -4,6 +4,14 @@ from typing import Generator
 from sqlalchemy import text
 from dotenv import load_dotenv
 import os
+import tempfile
+
+# Os testes usam um arquivo SQLite temporário, a menos que TEST_DATABASE_URL aponte
+# para outro banco (ex.: o Oracle de homologação). Definido antes de importar `database`.
+os.environ["DATABASE_URL"] = os.getenv(
+    "TEST_DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='agro-tests-'), 'test.db')}"
+)
 
 from database.models import Base, SensorRecord
 from database.repositories import (
@@ -14,7 +22,7 @@ from database.repositories import (
     ApplicationRepository
 )
 from database import engine, get_session, close_session
-from services.sensor_service import ComponentService
+from services.component_service import ComponentService
 
 # Carrega as variáveis de ambiente
 load_dotenv()
@@ -44,7 +52,7 @@ def setup_database():
     # Criar todas as tabelas
     Base.metadata.create_all(engine)
 
-    # Criar sequências
+    # Criar sequências (apenas no Oracle)
     sequences = [
         'producer_seq',
         'crop_seq',
@@ -53,8 +61,9 @@ def setup_database():
         'application_seq'
     ]
 
-    for seq in sequences:
-        create_sequence(engine, seq)
+    if engine.dialect.name == 'oracle':
+        for seq in sequences:
+            create_sequence(engine, seq)
 
     yield
 
@@ -102,9 +111,9 @@ def application_repo(session):
 
 
 @pytest.fixture
-def sensor_service(component_repo: ComponentRepository) -> ComponentService:
+def sensor_service(session) -> ComponentService:
     """Fixture para o serviço de sensores."""
-    return ComponentService(component_repo)
+    return ComponentService(session)
 
 
 @pytest.fixture
@@ -0,0 +1,126 @@
+import threading
+import time
+
+import pytest
+
+from database import get_session, close_session
+from services.cache import FigureCache, QueryCache, cache, with_cascades
+from services.component_service import ComponentService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_query_cache_ttl_and_invalidation():
+    clock = FakeClock()
+    query_cache = QueryCache(ttl=10, clock=clock)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return len(calls)
+
+    assert query_cache.get('q', ['t'], loader) == 1
+    assert query_cache.get('q', ['t'], loader) == 1
+    assert query_cache.stats() == {'hits': 1, 'misses': 1, 'entries': 1}
+
+    # Escrita em outra tabela não afeta a entrada
+    query_cache.invalidate('outra')
+    assert query_cache.get('q', ['t'], loader) == 1
+
+    query_cache.invalidate('t')
+    assert query_cache.get('q', ['t'], loader) == 2
+
+    clock.now = 11
+    assert query_cache.get('q', ['t'], loader) == 3
+
+
+def test_query_cache_lru_and_single_flight():
+    query_cache = QueryCache(ttl=60, max_entries=2)
+    for key in ['a', 'b', 'a', 'c']:
+        query_cache.get(key, ['t'], lambda: key)
+    # 'b' foi o menos usado recentemente
+    assert query_cache.stats()['entries'] == 2
+    assert query_cache.get('b', ['t'], lambda: 'novo') == 'novo'
+
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'valor'
+
+    threads = [threading.Thread(target=query_cache.get, args=('lenta', ['t'], slow_loader)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+
+
+def test_query_cache_discards_result_of_concurrent_write():
+    query_cache = QueryCache(ttl=60)
+
+    def loader():
+        query_cache.invalidate('t')  # escrita enquanto a consulta executava
+        return 'antigo'
+
+    assert query_cache.get('q', ['t'], loader) == 'antigo'
+    assert query_cache.get('q', ['t'], lambda: 'novo') == 'novo'
+
+
+def test_with_cascades():
+    assert set(with_cascades(['crops'])) == {
+        'crops', 'components', 'applications', 'sensor_records', 'sensor_latest_state',
+        'sensor_records_hourly', 'sensor_records_daily', 'irrigation_predictions'
+    }
+
+
+def test_service_writes_invalidate_cache():
+    session = get_session()
+    try:
+        service = ComponentService(session)
+        ids = lambda: cache.get('component_ids', ['components'], lambda: [c['id'] for c in service.list_components()])
+
+        before = ids()
+        component = service.create_component({'name': "Sensor Cache", 'type': "Sensor"})
+        assert component['id'] in ids()
+        assert component['id'] not in before
+
+        service.delete_component(component['id'])
+        assert component['id'] not in ids()
+    finally:
+        close_session()
+
+
+def test_figure_cache_renders_once_per_data_version():
+    pytest.importorskip("matplotlib")
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    data_cache = QueryCache(ttl=60)
+    figure_cache = FigureCache(data_cache, max_entries=4)
+    renders = []
+
+    def chart():
+        renders.append(1)
+        fig, ax = plt.subplots()
+        ax.plot([1, 2, 3], [3, 1, 2])
+        return fig
+
+    png = figure_cache.png('linha', (1, 2), ['t'], chart)
+    assert png.startswith(b'\x89PNG')
+    assert figure_cache.png('linha', (1, 2), ['t'], chart) == png
+    assert len(renders) == 1
+    # Outros parâmetros ou uma escrita na tabela exigem nova renderização
+    figure_cache.png('linha', (1, 3), ['t'], chart)
+    data_cache.invalidate('t')
+    figure_cache.png('linha', (1, 2), ['t'], chart)
+    assert len(renders) == 3
+    assert plt.get_fignums() == []
@@ -0,0 +1,73 @@
+import numpy as np
+from datetime import datetime, timedelta
+
+from database import get_session, close_session
+from database.downsampling import lttb, lttb_indices, min_max, min_max_indices, sample
+from services.climate_service import ClimateService
+
+
+def test_lttb_keeps_ends_and_peaks():
+    x = np.arange(10000, dtype=float)
+    y = np.sin(x / 500)
+    y[4321] = 50.0  # pico isolado
+    indices = lttb_indices(x, y, 200)
+    assert len(indices) == 200
+    assert indices[0] == 0 and indices[-1] == 9999
+    assert np.all(np.diff(indices) > 0)
+    assert 4321 in indices
+
+    # Séries menores que o alvo voltam inteiras
+    assert list(lttb_indices(x[:50], y[:50], 200)) == list(range(50))
+
+
+def test_min_max_keeps_every_transition():
+    status = np.zeros(100000)
+    status[31337:31340] = 1  # irrigação ativada por 3 leituras
+    indices = min_max_indices(status, 100)
+    assert len(indices) <= 102
+    assert status[indices].max() == 1
+    assert indices[0] == 0 and indices[-1] == 99999
+
+
+def test_column_helpers():
+    start = datetime(2024, 1, 1)
+    columns = {
+        'timestamp': [start + timedelta(minutes=i) for i in range(5000)],
+        'value': [float(i % 100) for i in range(5000)]
+    }
+    series = lttb(columns, 'timestamp', 'value', 500)
+    assert len(series['timestamp']) == len(series['value']) == 500
+    assert series['timestamp'] == sorted(series['timestamp'])
+
+    extremes = min_max(columns, 'timestamp', 'value', 100)
+    assert min(extremes['value']) == 0.0 and max(extremes['value']) == 99.0
+
+    sampled = sample(columns, 300)
+    assert len(sampled['timestamp']) == 300
+    assert sampled == sample(columns, 300)
+
+
+def test_climate_chart_series_window():
+    session = get_session()
+    try:
+        service = ClimateService(session)
+        start = datetime(2031, 5, 1)
+        created = [
+            service.create_climate_data({
+                'timestamp': start + timedelta(minutes=i),
+                'temperature': 20.0 + (i % 10),
+                'air_humidity': 50.0,
+                'rain_forecast': False
+            }) for i in range(60)
+        ]
+        series = service.get_chart_series(start + timedelta(minutes=10), start + timedelta(minutes=50), points=20)
+        assert series['count'] == 40
+        assert len(series['temperature']['timestamp']) == 20
+        assert series['temperature']['timestamp'][0] == start + timedelta(minutes=10)
+        assert sum(series['temperature_histogram']['counts']) == 40
+        assert len(series['scatter']['temperature']) == 20
+
+        for record in created:
+            service.delete_climate_data(record['id'])
+    finally:
+        close_session()
@@ -0,0 +1,72 @@
+from sqlalchemy import create_engine, text
+
+from database.instrumentation import (
+    LatencyHistogram,
+    QueryStats,
+    install,
+    instrument_service,
+    normalize_sql,
+    stats,
+    track_calls
+)
+
+
+def test_normalize_sql():
+    assert normalize_sql("SELECT *  FROM t\n WHERE id = :id_1 AND name = 'Ana'") == "SELECT * FROM t WHERE id = ? AND name = ?"
+    assert normalize_sql("SELECT * FROM t WHERE id IN (?, ?, ?) LIMIT 10") == "SELECT * FROM t WHERE id IN (?...) LIMIT ?"
+    assert normalize_sql("SELECT x::text FROM anon_1 WHERE y = %(y)s") == "SELECT x::text FROM anon_1 WHERE y = ?"
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram()
+    for ms in [0.3, 1.5, 1.8, 30.0, 900.0]:
+        histogram.add(ms)
+    values = histogram.to_dict()
+    assert values['count'] == 5
+    assert values['max_ms'] == 900.0
+    assert values['p50_ms'] == 2
+    assert values['p99_ms'] == 900.0
+
+
+def test_query_and_service_stats(tmp_path):
+    engine = install(create_engine(f"sqlite:///{tmp_path / 'stats.db'}"))
+    stats.reset()
+
+    @instrument_service
+    class ExampleService:
+        def per_item(self, n):
+            with engine.connect() as conn:
+                for i in range(n):
+                    conn.execute(text("SELECT :value"), {'value': i})
+
+        def batched(self):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+    service = ExampleService()
+    service.per_item(12)
+    service.batched()
+
+    top = stats.top(1, by='count')[0]
+    assert top['statement'] == "SELECT ?"
+    assert top['count'] == 13
+
+    calls = stats.service_calls()
+    assert calls['ExampleService.per_item']['statements'] == 12
+    assert calls['ExampleService.batched']['statements_per_call'] == 1
+    assert 'ExampleService.per_item' in stats.n_plus_one()
+    assert 'ExampleService.batched' not in stats.n_plus_one()
+
+    # Chamadas aninhadas contam também para a externa
+    with track_calls('externa') as statements:
+        service.batched()
+    assert sum(statements.values()) == 1
+    engine.dispose()
+
+
+def test_slow_query_threshold():
+    local = QueryStats(slow_query_ms=50, slow_query_sample=0.0)
+    local.record_query("SELECT 1", 10)
+    local.record_query("SELECT 1", 80)
+    assert local.slow_queries == 1
+    assert local.queries()["SELECT ?"]['count'] == 2
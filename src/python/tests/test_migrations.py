@@ -0,0 +1,57 @@
+import pytest
+from datetime import date, datetime
+from sqlalchemy import create_engine, insert, inspect
+from sqlalchemy.orm import Session
+
+from database.models import Base, Component, Crop, Producer, SensorLatestState, SensorRecord
+from database.migrations import missing_indexes, missing_tables, upgrade
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    """Fixture que fornece um banco SQLite vazio e descartável."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_upgrade_creates_missing_tables_and_indexes(sqlite_engine):
+    # Banco "antigo": tabelas sem os índices secundários
+    Base.metadata.create_all(sqlite_engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.drop(sqlite_engine)
+    Base.metadata.tables['rollup_watermarks'].drop(sqlite_engine)
+
+    assert missing_tables(sqlite_engine) == ['rollup_watermarks']
+    assert "ix_sensor_records_sensor_ts" in {index.name for index in missing_indexes(sqlite_engine)}
+
+    created = upgrade(sqlite_engine)
+    assert 'rollup_watermarks' in created
+    assert "ix_sensor_records_sensor_ts" in created
+
+    indexes = {index['name']: index['column_names'] for index in inspect(sqlite_engine).get_indexes(SensorRecord.__tablename__)}
+    assert indexes["ix_sensor_records_sensor_ts"] == ['sensor_id', 'timestamp']
+
+    # Idempotente
+    assert upgrade(sqlite_engine) == []
+
+
+def test_upgrade_backfills_sensor_latest_state(sqlite_engine):
+    Base.metadata.create_all(sqlite_engine)
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(Producer), [{'id': 'p1', 'name': "Produtor", 'email': "p@email.com", 'phone': "0"}])
+        conn.execute(insert(Crop), [{'id': 'c1', 'name': "Milho", 'type': "Grão", 'start_date': date(2024, 1, 1), 'producer_id': 'p1'}])
+        conn.execute(insert(Component), [{'id': 's1', 'name': "Sensor", 'type': "Sensor", 'crop_id': 'c1'}])
+        conn.execute(insert(SensorRecord), [
+            {'id': f'r{i}', 'sensor_id': 's1', 'timestamp': datetime(2024, 1, 1, 12, i), 'soil_moisture': float(i),
+             'phosphorus_present': True, 'potassium_present': True, 'soil_ph': 6.5, 'irrigation_status': "DESLIGADA"}
+            for i in range(5)
+        ])
+    Base.metadata.tables['sensor_latest_state'].drop(sqlite_engine)
+
+    assert 'sensor_latest_state' in upgrade(sqlite_engine)
+    with Session(sqlite_engine) as session:
+        state = session.get(SensorLatestState, 's1')
+        assert state.record_id == 'r4'
+        assert state.soil_moisture == 4.0
@@ -0,0 +1,115 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from database import ClimateData, get_session, close_session
+from database.bulk import bulk_insert
+from database.repositories import ProducerRepository, CropRepository, ComponentRepository, SensorRecordRepository
+from model_fleet import ModelFleet, list_segments, segment_registry, train_fleet
+from model_registry import ModelRegistry
+from prediction_model import IrrigationPredictor
+from services.prediction_service import IrrigationPredictionService
+
+# Limite de umidade abaixo do qual cada tipo de cultura é irrigado
+THRESHOLDS = {"Frota Hortaliça": 30.0, "Frota Fruta": 70.0}
+
+
+@pytest.fixture
+def fleet_data():
+    session = get_session()
+    start = datetime(2037, 1, 1)
+    producer = ProducerRepository(session).create(name="Clara Nunes", email="clara.nunes@email.com", phone="(11) 94444-4444")
+    producer_id = producer.id  # train_fleet fecha a sessão antes de criar os processos
+    sensors = {}
+    rng = np.random.default_rng(3)
+    readings = []
+    for crop_type, threshold in THRESHOLDS.items():
+        crop = CropRepository(session).create(name=crop_type, type=crop_type, start_date=date(2024, 8, 1), producer_id=producer_id)
+        sensor = ComponentRepository(session).create(name=f"Sensor {crop_type}", type="Sensor", crop_id=crop.id)
+        sensors[crop_type] = sensor.id
+        for i, moisture in enumerate(rng.uniform(0, 100, 120)):
+            readings.append({
+                'sensor_id': sensor.id, 'soil_moisture': float(moisture), 'phosphorus_present': True,
+                'potassium_present': True, 'soil_ph': 6.5, 'timestamp': start + timedelta(minutes=30 * i),
+                'irrigation_status': "ATIVADA" if moisture < threshold else "DESLIGADA"
+            })
+    SensorRecordRepository(session).create_many(readings)
+    bulk_insert(session, ClimateData, [
+        {'timestamp': start + timedelta(minutes=30 * i), 'temperature': 25.0, 'air_humidity': 50.0, 'rain_forecast': False}
+        for i in range(120)
+    ])
+    session.commit()
+    try:
+        yield sensors
+    finally:
+        session = get_session()
+        ProducerRepository(session).delete(producer_id)
+        session.query(ClimateData).filter(ClimateData.timestamp >= start).delete()
+        session.commit()
+        close_session()
+
+
+def global_predictor(tmp_path):
+    # Modelo global que nunca recomenda irrigar: identifica as predições sem modelo próprio
+    X = np.random.default_rng(0).uniform(0, 100, (50, 7))
+    y = np.zeros(50, dtype=int)
+    y[0] = 1
+    scaler = StandardScaler().fit(X)
+    registry = ModelRegistry(str(tmp_path / "global"))
+    registry.save(RandomForestClassifier(n_estimators=5, random_state=0).fit(scaler.transform(X), y), scaler)
+    return IrrigationPredictor(registry)
+
+
+def test_train_fleet_and_route_predictions(fleet_data, tmp_path):
+    root = str(tmp_path)
+    assert list_segments(get_session())["Frota Fruta"] == 120
+    results = train_fleet('crop_type', segments=[*THRESHOLDS, "Sem Leituras"], workers=2, registry_root=root)
+    assert results == {"Frota Hortaliça": True, "Frota Fruta": True}
+    for crop_type in THRESHOLDS:
+        registry = segment_registry('crop_type', crop_type, root)
+        metadata = registry.metadata(registry.active_version())
+        assert metadata['metrics']['training_rows'] + metadata['metrics']['test_rows'] == 120
+
+    fleet = ModelFleet('crop_type', registry_root=root, max_loaded=1, fallback=global_predictor(tmp_path))
+    features = (50.0, True, True, 6.5, 25.0, 50.0, False)
+    assert not fleet.predict("Frota Hortaliça", *features)['should_irrigate']
+    assert fleet.predict("Frota Fruta", *features)['should_irrigate']
+    assert fleet.predict("Frota Hortaliça", *features) is not None
+    # LRU com um modelo: cada troca de segmento recarrega
+    assert fleet.loads == 3
+    assert fleet.loaded_segments() == ["Frota Hortaliça"]
+
+    fleet = ModelFleet('crop_type', registry_root=root, max_loaded=2, fallback=global_predictor(tmp_path))
+    segments = ["Frota Fruta", "Frota Hortaliça", None, "Sem Modelo", "Frota Fruta"]
+    data = np.array([features] * len(segments), dtype=float)
+    should_irrigate, confidence = fleet.predict_batch(segments, data)
+    assert list(should_irrigate) == [True, False, False, False, True]
+    for segment, irrigate, score in zip(segments, should_irrigate, confidence):
+        single = fleet.predict(segment, *features)
+        assert (single['should_irrigate'], single['confidence']) == (irrigate, pytest.approx(score))
+    assert fleet.loads == 2
+
+
+def test_score_sensors_with_fleet(fleet_data, tmp_path):
+    root = str(tmp_path)
+    train_fleet('crop_type', segments=list(THRESHOLDS), workers=1, registry_root=root)
+    session = get_session()
+    climate = ClimateData(timestamp=datetime(2037, 2, 1), temperature=25.0, air_humidity=50.0, rain_forecast=False)
+    session.add(climate)
+    session.commit()
+    try:
+        fleet = ModelFleet('crop_type', registry_root=root, fallback=global_predictor(tmp_path))
+        service = IrrigationPredictionService(session, fleet=fleet)
+        assert service.score_sensors() > 0
+        by_sensor = {prediction.sensor_id: prediction for prediction in service.list_last_predictions()}
+        last_moisture = {
+            crop_type: service.states.get(sensor_id).soil_moisture for crop_type, sensor_id in fleet_data.items()
+        }
+        for crop_type, sensor_id in fleet_data.items():
+            assert by_sensor[sensor_id].should_irrigate == (last_moisture[crop_type] < THRESHOLDS[crop_type])
+    finally:
+        session.delete(climate)
+        session.commit()
@@ -0,0 +1,223 @@
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from database import ClimateData, get_session, close_session
+from database.bulk import bulk_insert
+from database.repositories import ProducerRepository, CropRepository, ComponentRepository, SensorRecordRepository
+from model_registry import ModelRegistry
+from prediction_model import IrrigationPredictor, MOISTURE_DECAY_RATE, get_predictor
+from services.climate_service import ClimateService
+from services.prediction_service import IrrigationPredictionService
+from training_data import FEATURES
+
+
+def fit_model(seed=0):
+    """Modelo pequeno treinado com dados sintéticos: irrigar quando a umidade está baixa."""
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([
+        rng.uniform(0, 100, 500),
+        rng.integers(0, 2, 500),
+        rng.integers(0, 2, 500),
+        rng.uniform(4, 8, 500),
+        rng.uniform(10, 35, 500),
+        rng.uniform(20, 90, 500),
+        rng.integers(0, 2, 500)
+    ])
+    y = (X[:, 0] < 40).astype(int)
+    scaler = StandardScaler()
+    model = RandomForestClassifier(n_estimators=10, random_state=42).fit(scaler.fit_transform(X), y)
+    return model, scaler
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = ModelRegistry(str(tmp_path / "modelos"))
+    registry.save(*fit_model(), metrics={'accuracy': 0.9})
+    return registry
+
+
+def test_registry_versions_metadata_and_rollback(registry):
+    first = registry.active_version()
+    watermark = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    second = registry.save(*fit_model(1), metrics={'accuracy': 0.95}, watermark=watermark)
+    assert registry.versions() == [first, second]
+    assert registry.active_version() == second
+
+    metadata = registry.metadata(second)
+    assert metadata['features'] == FEATURES
+    assert metadata['metrics']['accuracy'] == 0.95
+    assert datetime.fromisoformat(metadata['watermark']) == watermark
+
+    model, scaler, _ = registry.load()
+    assert isinstance(scaler.mean_, np.memmap)
+    assert model.predict(scaler.transform(np.zeros((1, len(FEATURES))))).shape == (1,)
+
+    assert registry.rollback() == first
+    assert registry.active_version() == first
+    with pytest.raises(ValueError):
+        registry.rollback()
+    with pytest.raises(ValueError):
+        registry.activate("inexistente")
+
+
+def test_get_predictor_is_shared_and_follows_active_version(registry):
+    predictor = get_predictor(registry.root)
+    first = predictor.version
+    assert predictor.model is not None
+    assert get_predictor(registry.root) is predictor
+
+    second = registry.save(*fit_model(1))
+    assert get_predictor(registry.root) is predictor
+    assert predictor.version == second
+
+    registry.rollback()
+    assert get_predictor(registry.root).version == first
+
+
+def test_vectorized_schedule_matches_step_by_step(registry):
+    session = get_session()
+    try:
+        producer = ProducerRepository(session).create(name="Elisa Prado", email="elisa.prado@email.com", phone="(11) 91111-1111")
+        crop = CropRepository(session).create(name="Feijão", type="Grão", start_date=date(2024, 3, 1), producer_id=producer.id)
+        sensor = ComponentRepository(session).create(name="Sensor Previsão", type="Sensor", crop_id=crop.id)
+        SensorRecordRepository(session).create(
+            sensor_id=sensor.id, soil_moisture=55.0, phosphorus_present=True, potassium_present=False,
+            soil_ph=6.2, irrigation_status="DESLIGADA"
+        )
+        climate = ClimateService(session).create_climate_data({'temperature': 28.0, 'air_humidity': 40.0, 'rain_forecast': False})
+
+        predictor = IrrigationPredictor(registry)
+        assert predictor.load_model()
+        schedule = predictor.predict_next_irrigation(hours_ahead=48, interval_hours=3)
+
+        latest_sensor = predictor.sensor_repo.states.get_latest()
+        latest_climate = predictor.climate_repo.get_latest()
+        expected = []
+        for hour in range(0, 48, 3):
+            moisture = max(0, latest_sensor.soil_moisture - MOISTURE_DECAY_RATE * hour)
+            prediction = predictor.predict(
+                moisture, latest_sensor.phosphorus_present, latest_sensor.potassium_present, latest_sensor.soil_ph,
+                latest_climate.temperature, latest_climate.air_humidity, latest_climate.rain_forecast
+            )
+            if prediction['should_irrigate']:
+                expected.append((moisture, prediction['confidence']))
+        assert expected
+        assert [(item['predicted_moisture'], item['confidence']) for item in schedule] == pytest.approx(expected)
+        # Horizonte vazio: nenhuma hora a avaliar
+        assert predictor.predict_next_irrigation(hours_ahead=0) == []
+        assert predictor.predict_next_irrigation(hours_ahead=-6, interval_hours=3) == []
+
+        ClimateService(session).delete_climate_data(climate['id'])
+        ProducerRepository(session).delete(producer.id)
+    finally:
+        close_session()
+
+
+def test_predict_batch_matches_single_predictions(registry):
+    predictor = IrrigationPredictor(registry)
+    rows = [
+        (20.0, True, False, 6.5, 30.0, 45.0, False),
+        (75.0, True, True, 6.0, 22.0, 80.0, True),
+        (38.0, False, True, 7.1, 27.0, 60.0, False)
+    ]
+    should_irrigate, confidence = predictor.predict_batch(pd.DataFrame(rows, columns=FEATURES))
+    for row, irrigate, score in zip(rows, should_irrigate, confidence):
+        single = predictor.predict(*row)
+        assert single['should_irrigate'] == irrigate
+        assert single['confidence'] == pytest.approx(score)
+
+    same = predictor.predict_batch(np.array(rows, dtype=float))
+    assert np.array_equal(same[0], should_irrigate)
+    with pytest.raises(ValueError):
+        predictor.predict_batch(np.zeros((2, 3)))
+
+
+def test_score_sensors_writes_one_prediction_per_sensor(registry):
+    session = get_session()
+    try:
+        producer = ProducerRepository(session).create(name="Otávio Reis", email="otavio.reis@email.com", phone="(11) 92222-2222")
+        crop = CropRepository(session).create(name="Trigo", type="Grão", start_date=date(2024, 5, 1), producer_id=producer.id)
+        sensors = [
+            ComponentRepository(session).create(name=f"Sensor Lote {i}", type="Sensor", crop_id=crop.id)
+            for i in range(3)
+        ]
+        SensorRecordRepository(session).create_many([
+            {'sensor_id': sensor.id, 'soil_moisture': moisture, 'phosphorus_present': True,
+             'potassium_present': True, 'soil_ph': 6.5}
+            for sensor, moisture in zip(sensors, (10.0, 50.0, 90.0))
+        ])
+        climate = ClimateService(session).create_climate_data({'temperature': 25.0, 'air_humidity': 55.0, 'rain_forecast': False})
+
+        service = IrrigationPredictionService(session, IrrigationPredictor(registry))
+        count = service.score_sensors()
+        predictions = service.list_last_predictions()
+        assert count == len(predictions) == len(service.states.list_rows())
+        by_sensor = {prediction.sensor_id: prediction for prediction in predictions}
+        assert by_sensor[sensors[0].id].should_irrigate
+        assert not by_sensor[sensors[2].id].should_irrigate
+        assert {by_sensor[sensor.id].climate_id for sensor in sensors} == {climate['id']}
+
+        ClimateService(session).delete_climate_data(climate['id'])
+        ProducerRepository(session).delete(producer.id)
+        assert not service.repo.get_by_sensor(sensors[0].id)
+    finally:
+        close_session()
+
+
+def test_train_incremental_reads_only_new_data(registry):
+    session = get_session()
+    since = datetime(2035, 1, 1, tzinfo=timezone.utc)
+    try:
+        producer = ProducerRepository(session).create(name="Rita Moraes", email="rita.moraes@email.com", phone="(11) 93333-3333")
+        crop = CropRepository(session).create(name="Arroz", type="Grão", start_date=date(2024, 7, 1), producer_id=producer.id)
+        sensor = ComponentRepository(session).create(name="Sensor Incremental", type="Sensor", crop_id=crop.id)
+        rng = np.random.default_rng(7)
+        # Uma leitura já coberta pela versão ativa e 200 leituras novas, a cada 30 minutos
+        timestamps = [since] + [since + timedelta(minutes=30 * (i + 1)) for i in range(200)]
+        moisture = rng.uniform(0, 100, len(timestamps))
+        SensorRecordRepository(session).create_many([
+            {'sensor_id': sensor.id, 'soil_moisture': float(m), 'phosphorus_present': True, 'potassium_present': True,
+             'soil_ph': 6.5, 'irrigation_status': "ATIVADA" if m < 30 else "DESLIGADA", 'timestamp': ts}
+            for ts, m in zip(timestamps, moisture)
+        ])
+        bulk_insert(session, ClimateData, [
+            {'timestamp': ts, 'temperature': 25.0, 'air_humidity': 50.0, 'rain_forecast': False} for ts in timestamps
+        ])
+        session.commit()
+
+        first = registry.active_version()
+        registry.save(*fit_model(), watermark=since)
+        parent = registry.active_version()
+
+        predictor = IrrigationPredictor(registry)
+        assert predictor.train_incremental('warm_start', extra_trees=5)
+        metadata = registry.metadata(registry.active_version())
+        assert (metadata['mode'], metadata['parent']) == ('warm_start', parent)
+        assert metadata['metrics']['n_estimators'] == 15
+        assert metadata['metrics']['training_rows'] + metadata['metrics']['test_rows'] == 200
+        assert datetime.fromisoformat(metadata['watermark']) == timestamps[-1]
+
+        # Sem leituras novas desde a última marca d'água, nada a retreinar
+        versions = registry.versions()
+        assert not predictor.train_incremental('warm_start')
+        assert registry.versions() == versions
+
+        # Janela limitada: modelo novo só com as leituras das últimas 24 horas
+        registry.save(*fit_model(), watermark=since)
+        assert predictor.train_incremental('window', window=timedelta(hours=24))
+        metadata = registry.metadata(registry.active_version())
+        assert metadata['mode'] == 'window'
+        assert metadata['metrics']['n_estimators'] == 100
+        assert metadata['metrics']['training_rows'] + metadata['metrics']['test_rows'] == 48
+        assert first in registry.versions()
+
+        ProducerRepository(session).delete(producer.id)
+        session.query(ClimateData).filter(ClimateData.timestamp >= since.replace(tzinfo=None)).delete()
+        session.commit()
+    finally:
+        close_session()
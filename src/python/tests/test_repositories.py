@@ -1,7 +1,9 @@
 import pytest
 from datetime import datetime, date, timedelta
-from sqlalchemy import text
-from database import get_session, close_session
+from sqlalchemy import text, event
+from database import get_session, close_session, unit_of_work
+from database.instrumentation import track_calls
+from database.projections import SensorRecordRow, entity_dict
 from database.models import (
     Producer,
     Crop,
@@ -14,8 +16,10 @@ from database.repositories import (
     CropRepository,
     ComponentRepository,
     SensorRecordRepository,
-    ApplicationRepository
+    ApplicationRepository,
+    SensorRollupRepository
 )
+from services.crops_service import CropService
 
 
 @pytest.fixture
@@ -195,3 +199,361 @@ def test_application_repository(application_repo, crop_repo, producer_repo, sess
     application_repo.delete(application.id)
     application_deleted = application_repo.get_by_id(application.id)
     assert application_deleted is None
+
+
+def test_sensor_record_repository_create_many(sensor_record_repo, component_repo, crop_repo, producer_repo, session):
+    """Testa a inserção em lote de registros de sensor."""
+    producer = producer_repo.create(
+        name="Paula Lima",
+        email="paula.lima@email.com",
+        phone="(11) 92222-2222"
+    )
+    crop = crop_repo.create(
+        name="Trigo",
+        type="Grão",
+        start_date=date(2024, 3, 1),
+        producer_id=producer.id
+    )
+    sensor = component_repo.create(name="Sensor de Solo", type="Sensor", crop_id=crop.id)
+
+    readings = [
+        {
+            'sensor_id': sensor.id,
+            'soil_moisture': 20.0 + i,
+            'phosphorus_present': True,
+            'potassium_present': i % 2 == 0,
+            'soil_ph': 6.5,
+            'irrigation_status': "ATIVADA"
+        } for i in range(10)
+    ]
+
+    # Inserir lote
+    inserted = sensor_record_repo.create_many(readings)
+    assert inserted == 10
+    assert len(sensor_record_repo.get_by_sensor(sensor.id)) == 10
+
+    # Lote vazio não acessa o banco
+    assert sensor_record_repo.create_many([]) == 0
+
+    # Limpar
+    producer_repo.delete(producer.id)
+
+
+def test_application_repository_aggregations(application_repo, crop_repo, producer_repo, session):
+    """Testa as agregações de aplicações feitas no banco."""
+    producer = producer_repo.create(
+        name="Rita Souza",
+        email="rita.souza@email.com",
+        phone="(11) 91111-1111"
+    )
+    crop = crop_repo.create(
+        name="Feijão",
+        type="Grão",
+        start_date=date(2024, 3, 1),
+        producer_id=producer.id
+    )
+    for type, quantity in [("Fertilizante", 10.0), ("Fertilizante", 15.0), ("Defensivo", 5.0)]:
+        application_repo.create(crop_id=crop.id, type=type, quantity=quantity)
+
+    assert application_repo.get_total_quantity_by_type("Fertilizante", crop_id=crop.id) == 25.0
+
+    summary = application_repo.get_crop_application_summary(crop.id)
+    assert summary['total_applications'] == 3
+    assert sorted(summary['types_applied']) == ["Defensivo", "Fertilizante"]
+    assert summary['total_quantity'] == 30.0
+
+    rows = application_repo.summarize(group_by=('type',), crop_id=crop.id)
+    assert [(row.type, row.application_count, row.total_quantity) for row in rows] == [
+        ("Defensivo", 1, 5.0),
+        ("Fertilizante", 2, 25.0)
+    ]
+
+    (daily,) = application_repo.summarize(group_by=(), bucket='day', crop_id=crop.id)
+    assert daily.application_count == 3
+    assert daily.distinct_types == 2
+
+    # Limpar
+    producer_repo.delete(producer.id)
+
+
+def test_sensor_record_repository_keyset_pagination_and_streaming(sensor_record_repo, component_repo, crop_repo, producer_repo, session):
+    """Testa a paginação por keyset (timestamp, id) e a leitura em streaming."""
+    producer = producer_repo.create(
+        name="Bruno Alves",
+        email="bruno.alves@email.com",
+        phone="(11) 90000-0000"
+    )
+    crop = crop_repo.create(
+        name="Arroz",
+        type="Grão",
+        start_date=date(2024, 3, 1),
+        producer_id=producer.id
+    )
+    sensor = component_repo.create(name="Sensor Paginado", type="Sensor", crop_id=crop.id)
+    base_time = datetime(2024, 3, 1, 12, 0)
+    sensor_record_repo.create_many([
+        {
+            'sensor_id': sensor.id,
+            'soil_moisture': float(i),
+            'phosphorus_present': True,
+            'potassium_present': True,
+            'soil_ph': 6.5,
+            # Timestamps repetidos: o id desempata a ordenação
+            'timestamp': base_time + timedelta(minutes=i // 2)
+        } for i in range(25)
+    ])
+    only_sensor = [SensorRecord.sensor_id == sensor.id]
+
+    # Percorrer as páginas
+    pages = list(sensor_record_repo.iter_pages(page_size=10, filters=only_sensor))
+    assert [len(page.items) for page in pages] == [10, 10, 5]
+    assert pages[-1].next_cursor is None
+    paged_ids = [record.id for page in pages for record in page.items]
+    assert len(set(paged_ids)) == 25
+
+    # Streaming na mesma ordem
+    streamed_ids = [record.id for record in sensor_record_repo.stream_all(chunk_size=7, filters=only_sensor)]
+    assert streamed_ids == paged_ids
+
+    chunks = list(sensor_record_repo.stream_chunks(chunk_size=7, columns=[SensorRecord.soil_moisture], filters=only_sensor))
+    assert [len(chunk) for chunk in chunks] == [7, 7, 7, 4]
+
+    # Limpar
+    producer_repo.delete(producer.id)
+
+
+def test_sensor_rollup_repository(sensor_record_repo, component_repo, crop_repo, producer_repo, session):
+    """Testa as agregações horárias/diárias e a combinação com os registros brutos."""
+    producer = producer_repo.create(
+        name="Carla Dias",
+        email="carla.dias@email.com",
+        phone="(11) 93333-3333"
+    )
+    crop = crop_repo.create(
+        name="Café",
+        type="Perene",
+        start_date=date(2024, 3, 1),
+        producer_id=producer.id
+    )
+    sensor = component_repo.create(name="Sensor Agregado", type="Sensor", crop_id=crop.id)
+    rollup_repo = SensorRollupRepository(session)
+    base_time = datetime(2024, 3, 1, 0, 0)
+    sensor_record_repo.create_many([
+        {
+            'sensor_id': sensor.id,
+            'soil_moisture': float(i % 50),
+            'phosphorus_present': i % 3 != 0,
+            'potassium_present': True,
+            'soil_ph': 5.0 + (i % 4),
+            'irrigation_status': "ATIVADA" if i % 2 else "DESLIGADA",
+            'timestamp': base_time + timedelta(minutes=17 * i)
+        } for i in range(400)
+    ])
+
+    # Agrega até 3 dias depois do início; o restante fica nos registros brutos
+    rollup_repo.rebuild(lag=timedelta(0), now=base_time + timedelta(days=3, minutes=30))
+    assert rollup_repo.get_watermark() == base_time + timedelta(days=3, minutes=30)
+
+    def raw_average(start, end):
+        return sensor_record_repo.get_average_values_by_sensor(sensor.id, start, end)
+
+    for start, end in [
+        (base_time, base_time + timedelta(days=5)),
+        (base_time + timedelta(hours=5, minutes=7), base_time + timedelta(days=4, hours=2)),
+        (base_time + timedelta(minutes=10), base_time + timedelta(minutes=50)),
+        (base_time + timedelta(days=1, hours=3), base_time + timedelta(days=2, hours=1, minutes=1))
+    ]:
+        summary = rollup_repo.get_summary(sensor.id, start, end)
+        expected = raw_average(start, end)
+        assert summary['soil_moisture_avg'] == pytest.approx(expected['soil_moisture'])
+        assert summary['soil_ph_avg'] == pytest.approx(expected['soil_ph'])
+        assert summary['phosphorus_ratio'] == pytest.approx(expected['phosphorus_present'])
+
+    full = rollup_repo.get_summary(sensor.id)
+    assert full['sample_count'] == 400
+    assert full['soil_moisture_min'] == 0.0
+    assert full['soil_moisture_max'] == 49.0
+    assert full['irrigation_on_ratio'] == pytest.approx(0.5)
+
+    # Série horária: buckets agregados + buckets dos registros brutos
+    series = rollup_repo.get_series(sensor.id, base_time, base_time + timedelta(days=5), timedelta(hours=1))
+    assert sum(bucket['sample_count'] for bucket in series) == 400
+    assert [bucket['bucket_start'] for bucket in series] == sorted(bucket['bucket_start'] for bucket in series)
+    daily = rollup_repo.get_series(sensor.id, base_time, base_time + timedelta(days=5), timedelta(days=1))
+    assert len(daily) == 5
+
+    # Atualização incremental: só os registros posteriores à marca d'água
+    assert rollup_repo.refresh(lag=timedelta(0), now=base_time + timedelta(days=5)) >= 400 - 256
+    assert rollup_repo.get_summary(sensor.id)['sample_count'] == 400
+
+    # Limpar
+    producer_repo.delete(producer.id)
+
+
+def test_unit_of_work_commits_once(producer_repo, session):
+    """Testa a unidade de trabalho: um commit ao final, rollback em caso de erro."""
+    commits = []
+    count_commit = commits.append
+    event.listen(session, "after_commit", count_commit)
+    try:
+        with unit_of_work(session) as uow:
+            producer = uow.producers.create(name="Lia Castro", email="lia.castro@email.com", phone="(11) 94444-4444")
+            crop = uow.crops.create(name="Soja", type="Grão", start_date=date(2024, 3, 1), producer_id=producer.id)
+            sensor = uow.components.create(name="Sensor UoW", type="Sensor", crop_id=crop.id)
+            uow.sensor_records.create_many([{
+                'sensor_id': sensor.id,
+                'soil_moisture': 20.0,
+                'phosphorus_present': True,
+                'potassium_present': True,
+                'soil_ph': 6.5
+            }])
+        assert len(commits) == 1
+
+        # Exceção no bloco: nada é gravado
+        with pytest.raises(RuntimeError):
+            with unit_of_work(session) as uow:
+                uow.producers.update(producer.id, name="Nome Descartado")
+                raise RuntimeError("falha no meio da operação")
+        assert len(commits) == 1
+        assert producer_repo.get_by_id(producer.id).name == "Lia Castro"
+    finally:
+        event.remove(session, "after_commit", count_commit)
+
+    # Limpar
+    producer_repo.delete(producer.id)
+
+
+def test_producer_tree_constant_queries(producer_repo, crop_repo, component_repo, application_repo, session):
+    """Testa a árvore produtor -> culturas -> componentes/aplicações sem N+1."""
+    producers = []
+    for p in range(2):
+        producer = producer_repo.create(name=f"Produtor Árvore {p}", email=f"arvore{p}@email.com", phone="(11) 95555-5555")
+        producers.append(producer)
+        for c in range(3):
+            crop = crop_repo.create(name=f"Cultura {c}", type="Grão", start_date=date(2024, 3, 1), producer_id=producer.id)
+            component_repo.create(name="Sensor", type="Sensor", crop_id=crop.id)
+            application_repo.create(crop_id=crop.id, type="Fertilizante", quantity=1.0 + c)
+    session.expire_all()
+
+    with track_calls('arvore') as statements:
+        tree = producer_repo.get_producer_tree()
+    assert sum(statements.values()) == 4
+    mine = [producer for producer in tree if producer['name'].startswith("Produtor Árvore")]
+    assert len(mine) == 2
+    assert all(len(producer['crops']) == 3 for producer in mine)
+    assert all(len(crop['components']) == 1 and len(crop['applications']) == 1
+               for producer in mine for crop in producer['crops'])
+
+    with track_calls('culturas') as statements:
+        crops = crop_repo.get_crops_with_applications()
+    assert sum(statements.values()) == 2
+    assert sum(len(crop['applications']) for crop in crops) >= 6
+
+    with track_calls('culturas do produtor') as statements:
+        assert len(producer_repo.get_crops_by_producer(producers[0].id)) == 3
+    assert sum(statements.values()) == 1
+
+    # Limpar
+    for producer in producers:
+        producer_repo.delete(producer.id)
+
+
+def test_row_projections(sensor_record_repo, component_repo, crop_repo, producer_repo, session):
+    """Testa as listagens em linhas compactas, dicionários e formato colunar."""
+    producer = producer_repo.create(name="Clara Nunes", email="clara.nunes@email.com", phone="(11) 93333-3333")
+    crop = crop_repo.create(name="Trigo", type="Grão", start_date=date(2024, 3, 1), producer_id=producer.id)
+    sensor = component_repo.create(name="Sensor Projeção", type="Sensor", crop_id=crop.id)
+    sensor_record_repo.create_many([
+        {
+            'sensor_id': sensor.id,
+            'soil_moisture': float(i),
+            'phosphorus_present': True,
+            'potassium_present': False,
+            'soil_ph': 6.0,
+            'timestamp': datetime(2024, 3, 1, 12, i)
+        } for i in range(5)
+    ])
+    only_sensor = [SensorRecord.sensor_id == sensor.id]
+
+    rows = sensor_record_repo.list_rows(filters=only_sensor)
+    assert [type(row) for row in rows] == [SensorRecordRow] * 5
+    assert [row.soil_moisture for row in rows] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert not hasattr(rows[0], '__dict__')
+
+    dicts = sensor_record_repo.list_dicts(filters=only_sensor)
+    assert set(dicts[0]) == set(SensorRecordRow.__slots__)
+    assert dicts[0]['id'] == rows[0].id
+
+    columns = sensor_record_repo.list_columns(filters=only_sensor)
+    assert columns['soil_moisture'] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert columns['id'] == [row.id for row in rows]
+    assert sensor_record_repo.list_columns(filters=[SensorRecord.sensor_id == "inexistente"])['id'] == []
+
+    # Leituras dos serviços: dicionários, nunca entidades ORM
+    crops = CropService(session).get_crops_by_producer(producer.id)
+    assert [type(item) for item in crops] == [dict]
+    assert crops[0]['id'] == crop.id and crops[0]['name'] == "Trigo"
+
+    # Dicionário de um objeto ORM: só colunas, sem o estado interno do SQLAlchemy
+    assert entity_dict(producer) == {
+        'id': producer.id, 'name': "Clara Nunes", 'email': "clara.nunes@email.com", 'phone': "(11) 93333-3333"
+    }
+
+    # Limpar
+    producer_repo.delete(producer.id)
+
+
+def test_sensor_latest_state(sensor_record_repo, component_repo, crop_repo, producer_repo, session):
+    """Testa o estado atual por sensor mantido a cada escrita e as consultas O(sensores)."""
+    producer = producer_repo.create(name="Davi Rocha", email="davi.rocha@email.com", phone="(11) 92222-2222")
+    crop = crop_repo.create(name="Sorgo", type="Grão", start_date=date(2024, 3, 1), producer_id=producer.id)
+    sensors = [component_repo.create(name=f"Sensor Estado {i}", type="Sensor", crop_id=crop.id) for i in range(2)]
+    base_time = datetime(2024, 3, 1, 12, 0)
+    reading = lambda sensor, minutes, moisture: {
+        'sensor_id': sensor.id,
+        'soil_moisture': moisture,
+        'phosphorus_present': True,
+        'potassium_present': True,
+        'soil_ph': 6.5,
+        'irrigation_status': "ATIVADA" if moisture < 30 else "DESLIGADA",
+        'timestamp': base_time + timedelta(minutes=minutes)
+    }
+    # Lote fora de ordem: vale a leitura mais recente de cada sensor
+    sensor_record_repo.create_many([
+        reading(sensors[0], 5, 25.0), reading(sensors[0], 10, 40.0), reading(sensors[0], 1, 50.0),
+        reading(sensors[1], 3, 20.0)
+    ])
+    # Leitura atrasada não substitui o estado
+    sensor_record_repo.create_many([reading(sensors[0], 7, 99.0)])
+
+    states = sensor_record_repo.states
+    assert states.get(sensors[0].id).soil_moisture == 40.0
+    latest = sensor_record_repo.get_latest_by_sensor(sensors[0].id)
+    assert latest.soil_moisture == 40.0
+
+    crop_id = crop.id
+    with track_calls('estado atual') as statements:
+        mine = [state for state in states.get_all_states() if state['crop_id'] == crop_id]
+        crop_state = [state for state in states.get_crop_states() if state['crop_id'] == crop_id]
+    assert sum(statements.values()) == 2
+    assert {state['sensor_id']: state['soil_moisture'] for state in mine} == {sensors[0].id: 40.0, sensors[1].id: 20.0}
+    assert crop_state[0]['sensor_count'] == 2
+    assert crop_state[0]['soil_moisture_avg'] == pytest.approx(30.0)
+    assert crop_state[0]['irrigating_sensors'] == 1
+
+    # Excluir a leitura mais recente recalcula o estado a partir do histórico
+    sensor_record_repo.delete(latest.id)
+    assert states.get(sensors[0].id).soil_moisture == 99.0
+    # Alterar a leitura mais recente atualiza o estado na mesma transação
+    sensor_record_repo.update(states.get(sensors[1].id).record_id, soil_moisture=22.0)
+    assert states.get(sensors[1].id).soil_moisture == 22.0
+
+    # Reconstrução a partir do histórico
+    session.query(SensorRecord).filter(SensorRecord.sensor_id == sensors[1].id).delete()
+    session.commit()
+    states.rebuild()
+    assert states.get(sensors[1].id) is None
+    assert states.get(sensors[0].id).soil_moisture == 99.0
+
+    # Limpar
+    producer_repo.delete(producer.id)
@@ -0,0 +1,129 @@
+import pytest
+from datetime import date, datetime, timedelta
+
+from database import get_session, close_session
+from database.repositories import ProducerRepository, CropRepository, ComponentRepository, SensorRollupRepository
+from services.sensor_service import SensorRecordService
+
+
+@pytest.fixture
+def sensor():
+    """Fixture que fornece um sensor associado a uma cultura (removidos ao final)."""
+    session = get_session()
+    producer = ProducerRepository(session).create(name="Rita Soares", email="rita.soares@email.com", phone="(11) 95555-5555")
+    producer_id = producer.id
+    crop = CropRepository(session).create(name="Alface", type="Hortaliça", start_date=date(2024, 3, 1), producer_id=producer_id)
+    sensor = ComponentRepository(session).create(name="Sensor Serviço", type="Sensor", crop_id=crop.id)
+    try:
+        yield sensor
+    finally:
+        ProducerRepository(get_session()).delete(producer_id)
+        close_session()
+
+
+def test_ingest_batch_evaluates_irrigation_per_reading(sensor):
+    service = SensorRecordService(get_session())
+    base_time = datetime(2024, 3, 1, 8, 0)
+    reading = lambda minutes, moisture, ph=6.5, phosphorus=True, potassium=True: {
+        'sensor_id': sensor.id,
+        'soil_moisture': moisture,
+        'phosphorus_present': phosphorus,
+        'potassium_present': potassium,
+        'soil_ph': ph,
+        'timestamp': base_time + timedelta(minutes=minutes)
+    }
+    expected = {
+        0: "ATIVADA",    # Umidade baixa
+        1: "DESLIGADA",  # Leitura normal
+        2: "ATIVADA",    # pH ácido
+        3: "ATIVADA",    # pH alcalino
+        4: "ATIVADA",    # Sem fósforo
+        5: "ATIVADA",    # Sem potássio
+        6: "DESLIGADA"   # Limites: umidade 30% e pH 5.0 não acionam a irrigação
+    }
+    readings = [
+        reading(0, 12.0), reading(1, 55.0), reading(2, 55.0, ph=4.5), reading(3, 55.0, ph=8.5),
+        reading(4, 55.0, phosphorus=False), reading(5, 55.0, potassium=False), reading(6, 30.0, ph=5.0)
+    ]
+    assert service.ingest_batch(readings) == len(readings)
+
+    stored = {
+        int((record.timestamp - base_time).total_seconds() // 60): record.irrigation_status
+        for record in service.repo.get_by_sensor(sensor.id)
+    }
+    assert stored == expected
+
+
+def test_averages_follow_writes_to_rolled_up_records(sensor):
+    """Edições, exclusões e cargas retroativas até a marca d'água refazem as agregações."""
+    session = get_session()
+    service = SensorRecordService(session)
+    base_time = datetime(2024, 3, 1, 8, 0)
+    service.ingest_batch([
+        {
+            'sensor_id': sensor.id,
+            'soil_moisture': 10.0,
+            'phosphorus_present': True,
+            'potassium_present': True,
+            'soil_ph': 6.0,
+            'timestamp': base_time + timedelta(minutes=20 * i)
+        } for i in range(10)
+    ])
+    SensorRollupRepository(session).rebuild(lag=timedelta(0), now=base_time + timedelta(days=1))
+    assert service.get_average_values_by_sensor(sensor.id)['soil_moisture'] == pytest.approx(10.0)
+
+    records = sorted(service.repo.get_by_sensor(sensor.id), key=lambda record: record.timestamp)
+    service.repo.update(records[0].id, soil_moisture=1000.0)
+    for record in records[1:]:
+        service.repo.delete(record.id)
+    averages = service.get_average_values_by_sensor(sensor.id)
+    assert averages['soil_moisture'] == pytest.approx(1000.0)
+    assert averages == pytest.approx(service.repo.get_average_values_by_sensor(sensor.id))
+
+    # Mover a leitura para outro dia e incluir uma leitura retroativa
+    service.repo.update(records[0].id, timestamp=base_time + timedelta(hours=20))
+    service.ingest_batch([{
+        'sensor_id': sensor.id, 'soil_moisture': 20.0, 'phosphorus_present': False,
+        'potassium_present': True, 'soil_ph': 7.0, 'timestamp': base_time - timedelta(hours=2)
+    }])
+    assert service.get_sensor_summary(sensor.id)['sample_count'] == 2
+    for start, end in [(None, None), (base_time - timedelta(days=1), base_time + timedelta(days=1)),
+                       (base_time, base_time + timedelta(days=1))]:
+        assert service.get_average_values_by_sensor(sensor.id, start, end) == pytest.approx(
+            service.repo.get_average_values_by_sensor(sensor.id, start, end))
+    hourly = service.get_sensor_series(sensor.id, base_time - timedelta(days=1), base_time + timedelta(days=1),
+                                       timedelta(hours=1))
+    assert [(bucket['bucket_start'], bucket['sample_count']) for bucket in hourly] == [
+        (base_time - timedelta(hours=2), 1), (base_time + timedelta(hours=20), 1)
+    ]
+
+
+def test_update_reevaluates_irrigation_before_refreshing_rollups(sensor):
+    """O status reavaliado na edição chega às agregações e ao estado atual."""
+    session = get_session()
+    service = SensorRecordService(session)
+    base_time = datetime(2024, 3, 1, 8, 0)
+    service.ingest_batch([
+        {
+            'sensor_id': sensor.id,
+            'soil_moisture': 60.0,
+            'phosphorus_present': True,
+            'potassium_present': True,
+            'soil_ph': 6.5,
+            'timestamp': base_time + timedelta(minutes=10 * i)
+        } for i in range(4)
+    ])
+    SensorRollupRepository(session).rebuild(lag=timedelta(0), now=base_time + timedelta(days=1))
+    assert service.get_sensor_summary(sensor.id)['irrigation_on_ratio'] == pytest.approx(0.0)
+
+    records = sorted(service.repo.get_by_sensor(sensor.id), key=lambda record: record.timestamp)
+    updated = service.update_sensor_record(records[-1].id, {'soil_moisture': 10.0})
+    assert updated['irrigation_status'] == "ATIVADA"
+    assert service.update_sensor_record("inexistente", {'soil_moisture': 10.0}) is None
+
+    assert service.get_sensor_summary(sensor.id)['irrigation_on_ratio'] == pytest.approx(0.25)
+    for resolution in (timedelta(hours=1), timedelta(days=1)):
+        series = service.get_sensor_series(sensor.id, base_time, base_time + timedelta(days=1), resolution)
+        assert [bucket['irrigation_on_ratio'] for bucket in series] == pytest.approx([0.25])
+    state = service.repo.states.get(sensor.id)
+    assert (state.record_id, state.irrigation_status) == (records[-1].id, "ATIVADA")
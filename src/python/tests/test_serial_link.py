@@ -0,0 +1,59 @@
+import os
+import pty
+import select
+
+from services.serial_link import SerialLink
+
+
+def read_available(fd, timeout=2.0) -> bytes:
+    data = b""
+    while select.select([fd], [], [], timeout)[0]:
+        data += os.read(fd, 4096)
+        timeout = 0.1
+    return data
+
+
+def test_serial_link_coalesces_payloads_into_one_write():
+    master, slave = pty.openpty()
+    link = SerialLink(os.ttyname(slave), settle_time=0)
+    try:
+        link.enqueue('{"temperature": 22.5}')
+        link.enqueue('{"temperature": 23.0}')
+        assert link.send('{"temperature": 23.5}') == 3
+
+        lines = read_available(master).decode().split()
+        assert lines == ['{"temperature":', '22.5}', '{"temperature":', '23.0}', '{"temperature":', '23.5}']
+
+        stats = link.stats()
+        assert stats['opens'] == 1
+        assert stats['writes'] == 1
+        assert stats['payloads'] == 3
+        assert stats['samples'] == 1
+        assert stats['max_ms'] >= 0
+    finally:
+        link.close()
+        os.close(master)
+        os.close(slave)
+
+
+def test_serial_link_reuses_connection_and_reconnects_lazily():
+    master, slave = pty.openpty()
+    link = SerialLink(os.ttyname(slave), settle_time=0)
+    try:
+        link.send("primeiro")
+        link.send("segundo")
+        assert link.stats()['opens'] == 1
+
+        # Simula a perda da porta: a escrita falha e a conexão é reaberta
+        os.close(link.connection.fd)
+        link.send("terceiro")
+
+        assert read_available(master).split() == [b"primeiro", b"segundo", b"terceiro"]
+        stats = link.stats()
+        assert stats['opens'] == 2
+        assert stats['errors'] == 1
+        assert stats['pending'] == 0
+    finally:
+        link.close()
+        os.close(master)
+        os.close(slave)
@@ -0,0 +1,78 @@
+import os
+import pty
+import time
+from datetime import datetime
+
+from services.telemetry_ingestion import parse_line, ReadingAssembler, TelemetryIngestionDaemon
+
+
+def test_parse_human_line():
+    parsed = parse_line("Umidade: 45.20% | Fosforo: Presente | Potassio: Ausente | pH: 6.5")
+    assert parsed == {
+        'kind': 'reading',
+        'soil_moisture': 45.2,
+        'phosphorus_present': True,
+        'potassium_present': False,
+        'soil_ph': 6.5
+    }
+
+
+def test_parse_plotter_and_status_lines():
+    assert parse_line("Umidade:45.20,pH:6.50,Irrigacao:100") == {
+        'kind': 'plotter',
+        'soil_moisture': 45.2,
+        'soil_ph': 6.5,
+        'irrigation_status': "ATIVADA"
+    }
+    assert parse_line("Irrigação: DESLIGADA") == {'kind': 'status', 'irrigation_status': "DESLIGADA"}
+
+
+def test_parse_ignores_unknown_and_nan_lines():
+    assert parse_line("Display LCD I2C conectado") is None
+    assert parse_line("Umidade: nan% | Fosforo: Presente | Potassio: Presente | pH: 7.0") is None
+    assert parse_line("") is None
+
+
+def test_assembler_merges_cycle_into_one_reading():
+    assembler = ReadingAssembler("sensor-1")
+    now = datetime.now()
+    assert assembler.feed(parse_line("Umidade: 35.00% | Fosforo: Presente | Potassio: Presente | pH: 6.0"), now) == []
+    assert assembler.feed(parse_line("Umidade:35.00,pH:6.00,Irrigacao:0"), now) == []
+    readings = assembler.feed(parse_line("Irrigação: ATIVADA"), now)
+
+    assert len(readings) == 1
+    assert readings[0]['sensor_id'] == "sensor-1"
+    assert readings[0]['soil_moisture'] == 35.0
+    assert readings[0]['irrigation_status'] == "ATIVADA"
+    assert assembler.flush() == []
+
+
+def test_daemon_reads_pty_and_writes_micro_batches():
+    """Usa um par pty no lugar de /dev/ttyUSB0."""
+    master, slave = pty.openpty()
+    port = os.ttyname(slave)
+    batches = []
+
+    daemon = TelemetryIngestionDaemon({port: "sensor-1"}, sink=batches.append, batch_size=3, flush_interval=0.2)
+    daemon.start()
+    try:
+        cycle = (
+            "Umidade: 25.00% | Fosforo: Presente | Potassio: Ausente | pH: 6.1\r\n"
+            "Umidade:25.00,pH:6.10,Irrigacao:100\r\n"
+            "Irrigação: ATIVADA\r\n"
+        )
+        os.write(master, (cycle * 5).encode("utf-8"))
+
+        deadline = time.monotonic() + 5
+        while sum(len(batch) for batch in batches) < 5 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        daemon.stop()
+        os.close(master)
+        os.close(slave)
+
+    readings = [reading for batch in batches for reading in batch]
+    assert len(readings) == 5
+    assert max(len(batch) for batch in batches) <= 3
+    assert all(reading['irrigation_status'] == "ATIVADA" for reading in readings)
+    assert daemon.stats['written'] == 5
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+from training_data import (
+    FEATURES,
+    TARGET,
+    sensor_frame,
+    climate_frame,
+    join_nearest_climate,
+    iter_joined_chunks
+)
+
+
+def make_frames(n_sensor=300, n_climate=40, seed=7):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2024-03-01", tz="UTC")
+    sensor_times = start + pd.to_timedelta(np.sort(rng.integers(0, 3 * 24 * 3600, n_sensor)), unit="s")
+    climate_times = start + pd.to_timedelta(np.sort(rng.integers(0, 3 * 24 * 3600, n_climate)), unit="s")
+    sensor_df = sensor_frame(zip(
+        sensor_times,
+        rng.uniform(0, 100, n_sensor),
+        rng.random(n_sensor) > 0.5,
+        rng.random(n_sensor) > 0.5,
+        rng.uniform(3, 10, n_sensor),
+        np.where(rng.random(n_sensor) > 0.5, "ATIVADA", "DESLIGADA")
+    ))
+    climate_df = climate_frame(zip(
+        climate_times,
+        rng.uniform(10, 35, n_climate),
+        rng.uniform(20, 90, n_climate),
+        rng.random(n_climate) > 0.5
+    ))
+    return sensor_df, climate_df
+
+
+def naive_join(sensor_df, climate_df):
+    """Implementação original (O(N x M)), usada como referência."""
+    rows = []
+    for _, sensor_row in sensor_df.iterrows():
+        closest = min(climate_df.iterrows(), key=lambda x: abs((x[1]['timestamp'] - sensor_row['timestamp']).total_seconds()))
+        if abs((closest[1]['timestamp'] - sensor_row['timestamp']).total_seconds()) <= 3600:
+            rows.append({**{f: sensor_row[f] for f in FEATURES[:4]},
+                         'temperature': closest[1]['temperature'],
+                         'air_humidity': closest[1]['air_humidity'],
+                         'rain_forecast': closest[1]['rain_forecast'],
+                         TARGET: sensor_row[TARGET]})
+    return pd.DataFrame(rows, columns=FEATURES + [TARGET])
+
+
+def test_join_matches_naive_nearest_within_tolerance():
+    sensor_df, climate_df = make_frames()
+    expected = naive_join(sensor_df, climate_df)
+    joined = join_nearest_climate(sensor_df, climate_df)
+
+    assert 0 < len(joined) < len(sensor_df)
+    np.testing.assert_allclose(joined[FEATURES + [TARGET]].to_numpy(float), expected.to_numpy(float))
+
+
+def test_join_accepts_naive_timestamps_and_empty_frames():
+    sensor_df, climate_df = make_frames(n_sensor=20, n_climate=5)
+    naive_sensor = sensor_df.assign(timestamp=sensor_df['timestamp'].dt.tz_localize(None))
+
+    assert len(join_nearest_climate(naive_sensor, climate_df)) == len(join_nearest_climate(sensor_df, climate_df))
+    assert join_nearest_climate(sensor_df, climate_df.iloc[0:0]).empty
+
+
+def test_chunked_join_matches_full_join():
+    sensor_df, climate_df = make_frames()
+
+    def climate_lookup(start, end):
+        return climate_df[(climate_df['timestamp'] >= start) & (climate_df['timestamp'] <= end)]
+
+    chunks = [sensor_df.iloc[i:i + 37] for i in range(0, len(sensor_df), 37)]
+    chunked = pd.concat(iter_joined_chunks(chunks, climate_lookup), ignore_index=True)
+
+    pd.testing.assert_frame_equal(chunked, join_nearest_climate(sensor_df, climate_df))
@@ -0,0 +1,56 @@
+import json
+import os
+
+import numpy as np
+
+from training_pipeline import RESULTS_FILE, CrossValidationRun, evaluate, _open_shared
+
+
+def synthetic_run(run_dir):
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, (300, 7))
+    y = (X[:, 0] < 40).astype(int)
+    grid = {'n_estimators': [5, 10], 'max_depth': [None, 3]}
+    return CrossValidationRun.create(str(run_dir), X, y, grid=grid, n_splits=3)
+
+
+def test_time_series_folds_never_train_on_the_future(tmp_path):
+    run = synthetic_run(tmp_path)
+    _open_shared(run.run_dir)
+    # Matriz já no formato da floresta: as fatias das dobras não são convertidas nem copiadas
+    X = np.load(os.path.join(run.run_dir, 'X.npy'), mmap_mode='r')
+    assert X.dtype == np.float32 and X.flags['C_CONTIGUOUS']
+    results = [evaluate({'n_estimators': 5}, fold, run.n_splits) for fold in range(run.n_splits)]
+    # Dobras crescentes: o treino de cada dobra é todo o período anterior ao teste
+    assert [result['train_rows'] for result in results] == [75, 150, 225]
+    assert all(result['test_rows'] == 75 for result in results)
+    assert all(result['fit_seconds'] > 0 and result['single_predict_ms'] > 0 for result in results)
+
+
+def test_run_is_parallel_resumable_and_ranked(tmp_path):
+    run = synthetic_run(tmp_path)
+    assert len(run.pending()) == 12
+    assert run.execute(workers=2) == 12
+    assert run.execute(workers=2) == 0
+
+    # Execução interrompida: resultados parciais e uma última linha incompleta
+    path = os.path.join(run.run_dir, RESULTS_FILE)
+    with open(path, encoding='utf-8') as f:
+        lines = f.readlines()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(lines[:5])
+        f.write(lines[5][:20])
+    resumed = CrossValidationRun(run.run_dir)
+    assert len(resumed.pending()) == 7
+    assert resumed.execute(workers=2) == 7
+
+    report = resumed.report()
+    assert len(report) == 4
+    assert all(row['folds'] == 3 for row in report)
+    assert [row['rank'] for row in report] == [1, 2, 3, 4]
+    accuracy = [row['accuracy_mean'] for row in report]
+    assert accuracy == sorted(accuracy, reverse=True)
+    assert any(row['pareto'] for row in report)
+    assert resumed.best_params() == report[0]['params']
+    with open(os.path.join(run.run_dir, 'report.json'), encoding='utf-8') as f:
+        assert json.load(f) == report
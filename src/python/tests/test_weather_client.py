@@ -0,0 +1,120 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+from database import ClimateData, get_session, close_session
+from services import weather_service
+from services.weather_client import WeatherClient
+
+
+class WeatherStubHandler(BaseHTTPRequestHandler):
+    """Servidor local que imita a resposta da OpenWeatherMap."""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        city = parse_qs(urlparse(self.path).query)['q'][0]
+        self.server.requests.append(city)
+        self.server.clients.add(self.client_address)
+        if city == "Inexistente":
+            body = json.dumps({"cod": "404", "message": "city not found"}).encode()
+            self.send_response(404)
+        else:
+            payload = {"main": {"temp": 20.0 + len(city), "humidity": 60}}
+            if city == "Belém":
+                payload["rain"] = {"1h": 2.5}
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def weather_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), WeatherStubHandler)
+    server.requests = []
+    server.clients = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(weather_server):
+    host, port = weather_server.server_address
+    client = WeatherClient("chave", base_url=f"http://{host}:{port}/weather", ttl=60, max_workers=4, retries=0)
+    yield client
+    client.close()
+
+
+def test_fetch_parses_response_and_caches_per_location(client, weather_server):
+    first = client.fetch("Belém")
+    second = client.fetch("belém ")
+
+    assert first == {"temperature": 25.0, "air_humidity": 60, "rain_forecast": True}
+    assert second == first
+    assert weather_server.requests == ["Belém"]
+    assert (client.hits, client.misses) == (1, 1)
+
+
+def test_fetch_refreshes_after_ttl_and_invalidate(client, weather_server):
+    client.fetch("Campinas")
+    client.invalidate("Campinas")
+    client.fetch("Campinas")
+
+    client.ttl = 0
+    client.fetch("Santos")
+    client.fetch("Santos")
+
+    assert weather_server.requests == ["Campinas", "Campinas", "Santos", "Santos"]
+
+
+def test_fetch_returns_none_on_http_error(client):
+    assert client.fetch("Inexistente") is None
+
+
+def test_fetch_many_runs_concurrently_and_reuses_connections(client, weather_server):
+    cities = ["São Paulo", "Campinas", "Santos", "Sorocaba", "Jundiaí", "Bauru", "Marília", "Franca"]
+
+    results = client.fetch_many(cities + ["Campinas"])
+    assert list(results) == cities
+    assert all(results[city]["air_humidity"] == 60 for city in cities)
+
+    client.invalidate()
+    client.fetch_many(cities)
+
+    assert len(weather_server.requests) == 2 * len(cities)
+    # Conexões keep-alive do pool: menos conexões do que requisições
+    assert len(weather_server.clients) <= client.max_workers
+
+
+def test_integration_stores_only_the_primary_location(client, weather_server, monkeypatch):
+    sent = []
+    monkeypatch.setattr(weather_service, "API_KEY", "chave")
+    monkeypatch.setattr(weather_service, "_weather_client", client)
+    monkeypatch.setattr(weather_service, "send_to_serial", sent.append)
+    session = get_session()
+    before = {climate.id for climate in session.query(ClimateData)}
+    try:
+        weather_service.run_weather_integration(["São Paulo", "Campinas", "Inexistente"])
+
+        # Uma única série climática: só a localidade principal é gravada e enviada ao ESP32
+        created = [climate for climate in session.query(ClimateData) if climate.id not in before]
+        assert [climate.temperature for climate in created] == [29.0]
+        assert [json.loads(payload)["temperature"] for payload in sent] == [29.0]
+        # As demais localidades ficam no cache do cliente
+        client.fetch("Campinas")
+        assert sorted(weather_server.requests) == ["Campinas", "Inexistente", "São Paulo"]
+    finally:
+        session.query(ClimateData).filter(ClimateData.id.notin_(before)).delete(synchronize_session=False)
+        session.commit()
+        close_session()
@@ -0,0 +1,97 @@
+"""
+Preparação dos dados de treinamento do modelo de irrigação: junção de cada leitura de
+sensor com o registro climático mais próximo no tempo.
+"""
+from typing import Callable, Iterable, Iterator
+
+import pandas as pd
+
+FEATURES = [
+    'soil_moisture',
+    'phosphorus_present',
+    'potassium_present',
+    'soil_ph',
+    'temperature',
+    'air_humidity',
+    'rain_forecast'
+]
+TARGET = 'irrigation_status'
+SENSOR_COLUMNS = ['timestamp', 'soil_moisture', 'phosphorus_present', 'potassium_present', 'soil_ph', TARGET]
+CLIMATE_COLUMNS = ['timestamp', 'temperature', 'air_humidity', 'rain_forecast']
+
+# Diferença máxima entre a leitura do sensor e o registro climático associado
+CLIMATE_TOLERANCE = pd.Timedelta(seconds=3600)
+
+
+def _utc(timestamps: pd.Series) -> pd.Series:
+    return pd.to_datetime(timestamps, utc=True)
+
+
+def sensor_frame(rows) -> pd.DataFrame:
+    """
+    Monta o DataFrame de sensores a partir de linhas (timestamp, umidade, fósforo,
+    potássio, pH, status), com os booleanos e o status convertidos para 0/1.
+    """
+    df = pd.DataFrame(rows, columns=SENSOR_COLUMNS)
+    df['timestamp'] = _utc(df['timestamp'])
+    df['phosphorus_present'] = df['phosphorus_present'].astype(int)
+    df['potassium_present'] = df['potassium_present'].astype(int)
+    df[TARGET] = (df[TARGET] == "ATIVADA").astype(int)
+    return df
+
+
+def climate_frame(rows) -> pd.DataFrame:
+    """
+    Monta o DataFrame climático a partir de linhas (timestamp, temperatura, umidade, chuva).
+    """
+    df = pd.DataFrame(rows, columns=CLIMATE_COLUMNS)
+    df['timestamp'] = _utc(df['timestamp'])
+    df['rain_forecast'] = df['rain_forecast'].astype(int)
+    return df
+
+
+def join_nearest_climate(sensor_df: pd.DataFrame, climate_df: pd.DataFrame,
+                         tolerance: pd.Timedelta = CLIMATE_TOLERANCE) -> pd.DataFrame:
+    """
+    Associa cada leitura ao registro climático mais próximo no tempo (antes ou depois),
+    descartando leituras sem registro climático dentro da tolerância.
+
+    Junção as-of ordenada (`merge_asof`): O((N + M) log(N + M)) em vez de comparar
+    cada leitura com todos os registros climáticos.
+    """
+    if sensor_df.empty or climate_df.empty:
+        return pd.DataFrame(columns=['timestamp'] + FEATURES + [TARGET])
+
+    sensor_df = sensor_df.assign(timestamp=_utc(sensor_df['timestamp'])).sort_values('timestamp', kind='mergesort')
+    climate_df = climate_df.assign(timestamp=_utc(climate_df['timestamp'])).sort_values('timestamp', kind='mergesort')
+
+    merged = pd.merge_asof(
+        sensor_df,
+        climate_df[CLIMATE_COLUMNS],
+        on='timestamp',
+        direction='nearest',
+        tolerance=tolerance
+    )
+    merged = merged.dropna(subset=['temperature'])
+    merged['rain_forecast'] = merged['rain_forecast'].astype(int)
+    return merged[['timestamp'] + FEATURES + [TARGET]].reset_index(drop=True)
+
+
+def iter_joined_chunks(sensor_chunks: Iterable[pd.DataFrame],
+                       climate_lookup: Callable[[pd.Timestamp, pd.Timestamp], pd.DataFrame],
+                       tolerance: pd.Timedelta = CLIMATE_TOLERANCE) -> Iterator[pd.DataFrame]:
+    """
+    Versão em blocos de `join_nearest_climate`, para históricos que não cabem em memória.
+
+    Para cada bloco de leituras, `climate_lookup(inicio, fim)` deve retornar os registros
+    climáticos do intervalo; o intervalo já inclui a tolerância nas duas pontas, então o
+    resultado é idêntico ao da junção sobre o histórico completo.
+    """
+    for chunk in sensor_chunks:
+        if chunk.empty:
+            continue
+        timestamps = _utc(chunk['timestamp'])
+        climate_df = climate_lookup(timestamps.min() - tolerance, timestamps.max() + tolerance)
+        joined = join_nearest_climate(chunk, climate_df, tolerance)
+        if not joined.empty:
+            yield joined
@@ -0,0 +1,290 @@
+"""
+Validação cruzada temporal e busca de hiperparâmetros do modelo de irrigação.
+
+Cada combinação da grade é avaliada em dobras do `TimeSeriesSplit`: o teste de cada dobra
+é sempre posterior ao treino, sem leituras futuras vazando para o treino. As tarefas
+(combinação, dobra) executam em paralelo em um pool de processos.
+
+Os dados de uma execução ficam no diretório da execução:
+- `X.npy` / `y.npy`: matriz de features (float32, contígua) e alvo, salvos uma vez e abertos
+  pelos processos com memory-map (somente leitura). As dobras do `TimeSeriesSplit` são
+  intervalos contíguos: cada tarefa treina e avalia sobre fatias (views) do memory-map, sem
+  copiar a matriz, e a floresta recebe os dados já em float32, sem nova conversão;
+- `run.json`: grade, número de dobras e marca d'água dos dados;
+- `results.jsonl`: uma linha por tarefa concluída. Reexecutar sobre o mesmo diretório
+  retoma a execução, pulando as tarefas já registradas;
+- `report.json`: ranking das combinações por acurácia média, com o tempo de treino e a
+  latência de predição (em lote, por linha, e de uma única linha).
+
+Uso (na pasta src/python):
+    python training_pipeline.py --run-dir cv_runs/2024-06-01          # executa ou retoma
+    python training_pipeline.py --run-dir cv_runs/2024-06-01 --register  # treina a melhor combinação
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import TimeSeriesSplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPLITS = 5
+PARAM_GRID = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [None, 8, 16],
+    'min_samples_leaf': [1, 5]
+}
+# Chamadas de uma linha por tarefa para medir a latência de uma predição isolada (dashboard)
+SINGLE_PREDICTIONS = 20
+
+RUN_FILE = 'run.json'
+RESULTS_FILE = 'results.jsonl'
+REPORT_FILE = 'report.json'
+
+
+def param_combinations(grid: Dict[str, list]) -> List[dict]:
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def params_key(params: dict) -> str:
+    return json.dumps(params, sort_keys=True)
+
+
+# Dados compartilhados por cada processo do pool (abertos uma vez, no initializer)
+_shared: Dict[str, np.ndarray] = {}
+
+
+def _open_shared(run_dir: str):
+    _shared['X'] = np.load(os.path.join(run_dir, 'X.npy'), mmap_mode='r')
+    _shared['y'] = np.load(os.path.join(run_dir, 'y.npy'), mmap_mode='r')
+
+
+def evaluate(params: dict, fold: int, n_splits: int) -> dict:
+    """
+    Treina e avalia uma combinação em uma dobra, sobre a matriz compartilhada do processo.
+    Sem scaler: as árvores escolhem os mesmos cortes com ou sem padronização das features.
+    """
+    X, y = _shared['X'], _shared['y']
+    train, test = list(TimeSeriesSplit(n_splits=n_splits).split(X))[fold]
+    # Dobras contíguas: fatias com `:` são views do memory-map (indexar com o vetor copiaria)
+    train, test = slice(train[0], train[-1] + 1), slice(test[0], test[-1] + 1)
+    X_train, X_test = X[train], X[test]
+
+    model = RandomForestClassifier(random_state=42, n_jobs=1, **params)
+    started = time.perf_counter()
+    model.fit(X_train, y[train])
+    fit_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    predicted = model.classes_[model.predict_proba(X_test).argmax(axis=1)]
+    batch_seconds = time.perf_counter() - started
+
+    single = []
+    for row in X_test[:SINGLE_PREDICTIONS]:
+        started = time.perf_counter()
+        model.predict_proba(row.reshape(1, -1))
+        single.append(time.perf_counter() - started)
+
+    return {
+        'key': params_key(params),
+        'params': params,
+        'fold': fold,
+        'train_rows': len(X_train),
+        'test_rows': len(X_test),
+        'accuracy': float(accuracy_score(y[test], predicted)),
+        'fit_seconds': fit_seconds,
+        'predict_us_per_row': batch_seconds / len(X_test) * 1e6,
+        'single_predict_ms': float(np.median(single)) * 1e3
+    }
+
+
+class CrossValidationRun:
+    """
+    Uma execução da busca, persistida em `run_dir` (ver o docstring do módulo).
+    """
+    def __init__(self, run_dir: str):
+        self.run_dir = run_dir
+        with open(os.path.join(run_dir, RUN_FILE), encoding='utf-8') as f:
+            config = json.load(f)
+        self.grid: Dict[str, list] = config['grid']
+        self.n_splits: int = config['n_splits']
+        self.watermark: Optional[str] = config.get('watermark')
+
+    @classmethod
+    def create(cls, run_dir: str, X, y, grid: Dict[str, list] = PARAM_GRID, n_splits: int = DEFAULT_SPLITS,
+               watermark: Optional[datetime] = None) -> 'CrossValidationRun':
+        """
+        Grava a matriz (em ordem cronológica) e a configuração de uma nova execução.
+        """
+        os.makedirs(run_dir, exist_ok=True)
+        np.save(os.path.join(run_dir, 'X.npy'), np.ascontiguousarray(X, dtype=np.float32))
+        np.save(os.path.join(run_dir, 'y.npy'), np.asarray(y, dtype=np.int64))
+        config = {
+            'grid': grid,
+            'n_splits': n_splits,
+            'watermark': watermark.isoformat() if watermark is not None else None,
+            'created_at': datetime.now().isoformat()
+        }
+        with open(os.path.join(run_dir, RUN_FILE), 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=2)
+        return cls(run_dir)
+
+    @staticmethod
+    def exists(run_dir: str) -> bool:
+        return os.path.isfile(os.path.join(run_dir, RUN_FILE))
+
+    def tasks(self) -> Iterator[Tuple[dict, int]]:
+        for params in param_combinations(self.grid):
+            for fold in range(self.n_splits):
+                yield params, fold
+
+    def results(self) -> List[dict]:
+        """
+        Tarefas concluídas. Uma última linha incompleta (execução interrompida) é ignorada.
+        """
+        path = os.path.join(self.run_dir, RESULTS_FILE)
+        if not os.path.exists(path):
+            return []
+        results = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    results.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return results
+
+    def pending(self) -> List[Tuple[dict, int]]:
+        done = {(result['key'], result['fold']) for result in self.results()}
+        return [(params, fold) for params, fold in self.tasks() if (params_key(params), fold) not in done]
+
+    def execute(self, workers: Optional[int] = None) -> int:
+        """
+        Executa as tarefas pendentes em `workers` processos (padrão: todos os núcleos).
+        Cada resultado é gravado assim que termina. Retorna a quantidade executada.
+        """
+        pending = self.pending()
+        if not pending:
+            return 0
+        workers = workers or os.cpu_count() or 1
+        logger.info(f"{len(pending)} tarefas pendentes em {workers} processos")
+        path = os.path.join(self.run_dir, RESULTS_FILE)
+        _end_partial_line(path)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_open_shared, initargs=(self.run_dir,)) as pool, \
+                open(path, 'a', encoding='utf-8') as results:
+            futures = [pool.submit(evaluate, params, fold, self.n_splits) for params, fold in pending]
+            for done, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                results.write(json.dumps(result) + '\n')
+                results.flush()
+                logger.info(f"[{done}/{len(pending)}] {result['key']} dobra {result['fold']}: "
+                            f"acurácia {result['accuracy']:.4f}")
+        return len(pending)
+
+    def report(self) -> List[dict]:
+        """
+        Combinações ordenadas por acurácia média (e, no empate, pelo tempo de treino).
+        `pareto` marca as combinações que nenhuma outra supera ao mesmo tempo em acurácia,
+        tempo de treino e latência de predição.
+        """
+        by_key: Dict[str, List[dict]] = {}
+        for result in self.results():
+            by_key.setdefault(result['key'], []).append(result)
+        rows = []
+        for results in by_key.values():
+            accuracy = [result['accuracy'] for result in results]
+            rows.append({
+                'params': results[0]['params'],
+                'folds': len(results),
+                'accuracy_mean': float(np.mean(accuracy)),
+                'accuracy_std': float(np.std(accuracy)),
+                'fit_seconds': float(np.mean([result['fit_seconds'] for result in results])),
+                'predict_us_per_row': float(np.mean([result['predict_us_per_row'] for result in results])),
+                'single_predict_ms': float(np.mean([result['single_predict_ms'] for result in results]))
+            })
+        for row in rows:
+            row['pareto'] = not any(_dominates(other, row) for other in rows)
+        rows.sort(key=lambda row: (-row['accuracy_mean'], row['fit_seconds']))
+        for rank, row in enumerate(rows, start=1):
+            row['rank'] = rank
+        with open(os.path.join(self.run_dir, REPORT_FILE), 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=2)
+        return rows
+
+    def best_params(self) -> Optional[dict]:
+        """
+        Melhor combinação entre as avaliadas em todas as dobras.
+        """
+        complete = [row for row in self.report() if row['folds'] == self.n_splits]
+        return complete[0]['params'] if complete else None
+
+
+def _end_partial_line(path: str):
+    # Uma execução interrompida pode deixar a última linha incompleta: os novos resultados
+    # começam na linha seguinte, e a incompleta é ignorada na leitura
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb+') as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b'\n':
+            f.write(b'\n')
+
+
+def _dominates(a: dict, b: dict) -> bool:
+    metrics = (('accuracy_mean', 1), ('fit_seconds', -1), ('single_predict_ms', -1))
+    at_least = all(a[name] * sign >= b[name] * sign for name, sign in metrics)
+    better = any(a[name] * sign > b[name] * sign for name, sign in metrics)
+    return at_least and better
+
+
+def main():
+    from prediction_model import IrrigationPredictor
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--run-dir', default=os.path.join('cv_runs', datetime.now().strftime('%Y%m%dT%H%M%S')),
+                        help='Diretório da execução; um diretório existente é retomado')
+    parser.add_argument('--splits', type=int, default=DEFAULT_SPLITS, help='Dobras do TimeSeriesSplit')
+    parser.add_argument('--workers', type=int, default=None, help='Processos (padrão: todos os núcleos)')
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help='Lê o histórico em blocos desse tamanho (históricos grandes)')
+    parser.add_argument('--register', action='store_true',
+                        help='Ao final, treina e registra um modelo com a melhor combinação')
+    args = parser.parse_args()
+
+    if CrossValidationRun.exists(args.run_dir):
+        run = CrossValidationRun(args.run_dir)
+        logger.info(f"Retomando a execução em {args.run_dir}")
+    else:
+        X, y, watermark = IrrigationPredictor().training_data(args.chunk_size)
+        if X is None:
+            parser.exit(1, "Dados insuficientes para treinamento\n")
+        run = CrossValidationRun.create(args.run_dir, X, y, n_splits=args.splits, watermark=watermark)
+
+    run.execute(args.workers)
+    report = run.report()
+    print(f"{'#':>3} {'acurácia':>14} {'treino (s)':>11} {'µs/linha':>9} {'1 linha (ms)':>13}  parâmetros")
+    for row in report:
+        print(f"{row['rank']:>3} {row['accuracy_mean']:.4f}±{row['accuracy_std']:.4f} {row['fit_seconds']:>11.3f} "
+              f"{row['predict_us_per_row']:>9.2f} {row['single_predict_ms']:>13.2f}  "
+              f"{row['params']}{' *' if row['pareto'] else ''}")
+    print(f"Relatório: {os.path.join(args.run_dir, REPORT_FILE)} (* = fronteira de Pareto)")
+
+    if args.register:
+        best = run.best_params()
+        success = best is not None and IrrigationPredictor().train(args.chunk_size, params=best)
+        print(f"Modelo treinado com {best}: {success}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()